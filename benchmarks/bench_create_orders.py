@@ -0,0 +1,40 @@
+"""
+Compares placing a ladder of limit orders one create_limit_order call at a time against create_limit_orders, against a
+local stub server with a fixed round-trip latency.
+
+    python -m benchmarks.bench_create_orders [n_orders] [latency_ms]
+"""
+import sys
+import time
+
+import numpy as np
+
+from pybitx.api import BitX
+from benchmarks.stub_server import StubServer
+
+
+def run(n_orders=100, latency=0.02):
+    prices = np.linspace(4000, 5000, n_orders)
+    ladder = [('buy', 0.01, round(price, 2)) for price in prices]
+    with StubServer({'postorder': {'order_id': 'BXMC2CJ7HNB88U4'}}, latency) as server:
+        options = server.options()
+        options['max_workers'] = 20
+        api = BitX('key', 'secret', options)
+        start = time.perf_counter()
+        for order in ladder:
+            api.create_limit_order(*order)
+        serial = time.perf_counter() - start
+        start = time.perf_counter()
+        result = api.create_limit_orders(ladder)
+        bulk = time.perf_counter() - start
+        api.close()
+    assert result.error.isnull().all()
+    print('orders=%d latency=%.0fms' % (n_orders, latency * 1e3))
+    print('serial: %8.3f s' % (serial,))
+    print('bulk:   %8.3f s (%d workers, %.1fx faster)' % (bulk, options['max_workers'], serial / bulk))
+
+
+if __name__ == '__main__':
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 100
+    latency = float(sys.argv[2]) * 1e-3 if len(sys.argv) > 2 else 0.02
+    run(n, latency)
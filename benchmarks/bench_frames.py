@@ -0,0 +1,111 @@
+"""
+Compares the *_frame builders against the previous pandas-based implementations on synthetic payloads, reporting the
+time and the peak memory allocated (tracemalloc) for each.
+
+    python -m benchmarks.bench_frames [rows ...]
+"""
+import io
+import json
+import random
+import sys
+import time
+import tracemalloc
+
+import pandas as pd
+
+from pybitx import frames
+
+
+# ---------------- previous implementations, for comparison ----------------
+
+def legacy_order_book_frame(q):
+    asks = pd.DataFrame(q['asks'])
+    bids = pd.DataFrame(q['bids'])
+    index = pd.MultiIndex.from_product([('asks', 'bids'), ('price', 'volume')])
+    return pd.DataFrame(pd.concat([asks, bids], axis=1).values, columns=index)
+
+
+def legacy_trades_frame(trades):
+    df = pd.DataFrame(trades['trades'])
+    df.index = pd.to_datetime(df.timestamp * 1e-3, unit='s')
+    df.drop('timestamp', axis=1, inplace=True)
+    return df
+
+
+def legacy_orders_frame(q):
+    tj = json.dumps(q['orders'])
+    df = pd.read_json(io.StringIO(tj), convert_dates=['creation_timestamp', 'expiration_timestamp'])
+    df.index = df.creation_timestamp
+    return df
+
+
+def legacy_transactions_frame(tx):
+    df = pd.DataFrame(tx['transactions'])
+    df.index = pd.to_datetime(df.timestamp, unit='ms')
+    df.drop('timestamp', axis=1, inplace=True)
+    return df
+
+
+# ---------------- synthetic payloads ----------------
+
+def order_book(n, rng):
+    return {'timestamp': 1366305398592,
+            'bids': [{'volume': '%.6f' % rng.random(), 'price': '%.2f' % (5000 - i * 0.01)} for i in range(n)],
+            'asks': [{'volume': '%.6f' % rng.random(), 'price': '%.2f' % (5001 + i * 0.01)} for i in range(n)]}
+
+
+def trades(n, rng):
+    return {'trades': [{'volume': '%.6f' % rng.random(), 'timestamp': 1366052621774 - i * 1000,
+                        'price': '%.2f' % rng.uniform(4900, 5100), 'is_buy': rng.random() < 0.5} for i in range(n)]}
+
+
+def orders(n, rng):
+    return {'orders': [{'base': '%.6f' % rng.random(), 'counter': '%.2f' % rng.uniform(0, 5000),
+                        'creation_timestamp': 1423990327333 + i, 'expiration_timestamp': 0, 'fee_base': '0.00',
+                        'fee_counter': '0.00', 'limit_price': '%.2f' % rng.uniform(4900, 5100),
+                        'limit_volume': '%.6f' % rng.random(), 'order_id': 'BX%013d' % (i,), 'pair': 'XBTZAR',
+                        'state': 'COMPLETE', 'type': 'ASK'} for i in range(n)]}
+
+
+def transactions(n, rng):
+    return {'id': '319232323', 'transactions': [
+        {'row_index': n - i, 'timestamp': 1429908835000 - i * 1000, 'balance': rng.random(),
+         'available': rng.random(), 'balance_delta': rng.random(), 'available_delta': rng.random(),
+         'currency': 'XBT', 'description': 'Sold 0.02 BTC'} for i in range(n)]}
+
+
+CASES = [
+    ('order_book_frame', order_book, legacy_order_book_frame, frames.order_book_frame),
+    ('trades_frame', trades, legacy_trades_frame, frames.trades_frame),
+    ('orders_frame', orders, legacy_orders_frame, frames.orders_frame),
+    ('transactions_frame', transactions, legacy_transactions_frame, frames.transactions_frame),
+]
+
+
+def measure(fn, payload, repeat=3):
+    best = float('inf')
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn(payload)
+        best = min(best, time.perf_counter() - start)
+    tracemalloc.start()
+    fn(payload)
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return best, peak
+
+
+def run(sizes=(10000, 100000)):
+    rng = random.Random(1)
+    print('%-20s %8s %12s %12s %12s %12s' % ('builder', 'rows', 'legacy ms', 'new ms', 'legacy MB', 'new MB'))
+    for name, make, legacy, new in CASES:
+        for n in sizes:
+            payload = make(n, rng)
+            legacy_time, legacy_peak = measure(legacy, payload)
+            new_time, new_peak = measure(new, payload)
+            print('%-20s %8d %12.1f %12.1f %12.1f %12.1f' % (
+                name, n, legacy_time * 1e3, new_time * 1e3, legacy_peak / 1e6, new_peak / 1e6))
+
+
+if __name__ == '__main__':
+    run([int(n) for n in sys.argv[1:]] or (10000, 100000))
@@ -0,0 +1,79 @@
+"""
+Compares the ways a response body can be decoded into a frame: requests' response.json() (the previous path), the
+json module on the raw bytes, and orjson when it is installed -- plus, in 'exact' numeric mode, the Decimal decode that
+single responses use against the plain decode that the *_frame methods now use. Reports the best decode time, the
+best decode-and-build time and the peak memory allocated (tracemalloc) for each.
+
+    python -m benchmarks.bench_json [rows ...]
+"""
+import json
+import random
+import sys
+import time
+import tracemalloc
+
+import requests
+
+from pybitx import frames
+from pybitx.decoding import orjson, json_loads, exact_loads
+from pybitx.numeric import to_exact
+from benchmarks.bench_frames import order_book, trades
+
+
+DECIMALS = {'price': 2, 'volume': 8}
+
+
+def response_json(body):
+    response = requests.Response()
+    response._content = body
+    response.status_code = 200
+    return response.json()
+
+
+def decoders():
+    yield 'response.json', response_json, None
+    yield 'json (bytes)', json_loads, None
+    if orjson is not None:
+        yield 'orjson', orjson.loads, None
+    yield 'exact Decimal', lambda body: to_exact(exact_loads(body)), DECIMALS
+    yield 'exact plain', orjson.loads if orjson is not None else json_loads, DECIMALS
+
+
+CASES = [
+    ('order_book', order_book, frames.order_book_frame),
+    ('trades', trades, frames.trades_frame),
+]
+
+
+def best_time(fn, repeat=3):
+    best = float('inf')
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def peak_memory(fn):
+    tracemalloc.start()
+    fn()
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return peak
+
+
+def run(sizes=(10000, 100000)):
+    rng = random.Random(1)
+    print('%-12s %8s %-14s %10s %10s %10s' % ('payload', 'rows', 'decoder', 'decode ms', 'frame ms', 'peak MB'))
+    for name, make, build in CASES:
+        for n in sizes:
+            body = json.dumps(make(n, rng)).encode('utf-8')
+            for label, loads, decimals in decoders():
+                decode = lambda: loads(body)
+                both = lambda: build(loads(body), decimals)
+                print('%-12s %8d %-14s %10.1f %10.1f %10.1f' % (
+                    name, n, label, best_time(decode) * 1e3, best_time(both) * 1e3, peak_memory(both) / 1e6))
+
+
+if __name__ == '__main__':
+    run([int(n) for n in sys.argv[1:]] or (10000, 100000))
@@ -0,0 +1,63 @@
+"""
+Compares the memory held by a trade history kept as decoded dicts against the same history as pybitx.models objects
+(float and Decimal), and as a trades frame for reference. Reports the bytes retained per trade (tracemalloc, after the
+raw body is released) and the time to build each representation.
+
+    python -m benchmarks.bench_models [rows ...]
+"""
+import gc
+import json
+import random
+import sys
+import time
+import tracemalloc
+
+from pybitx import frames
+from pybitx.decoding import json_loads
+from pybitx.models import parse_trades
+from benchmarks.bench_frames import trades
+
+
+CASES = [
+    ('dicts', lambda body: json_loads(body)['trades']),
+    ('Trade (float)', lambda body: parse_trades(json_loads(body)).materialize()),
+    ('Trade (Decimal)', lambda body: parse_trades(json_loads(body), exact=True).materialize()),
+    ('trades_frame', lambda body: frames.trades_frame(json_loads(body))),
+]
+
+
+def retained(build, body):
+    """
+    :return: (bytes still allocated once build's result is all that is left, seconds to build). The build is timed
+    separately, as tracing slows allocation down
+    """
+    gc.collect()
+    start = time.perf_counter()
+    result = build(body)
+    elapsed = time.perf_counter() - start
+    del result
+    gc.collect()
+    tracemalloc.start()
+    result = build(body)
+    gc.collect()
+    size = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    del result
+    return size, elapsed
+
+
+def run(sizes=(1000000,)):
+    rng = random.Random(1)
+    print('%8s %-16s %12s %10s %10s' % ('rows', 'representation', 'bytes/trade', 'MB', 'build s'))
+    for n in sizes:
+        body = json.dumps(trades(n, rng)).encode('utf-8')
+        baseline = None
+        for label, build in CASES:
+            size, elapsed = retained(build, body)
+            baseline = baseline or size
+            print('%8d %-16s %12.1f %10.1f %10.2f   (%.0f%% of dicts)' % (
+                n, label, float(size) / n, size / 1e6, elapsed, 100.0 * size / baseline))
+
+
+if __name__ == '__main__':
+    run([int(n) for n in sys.argv[1:]] or (1000000,))
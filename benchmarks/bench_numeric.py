@@ -0,0 +1,70 @@
+"""
+Compares exact arithmetic on int64 fixed-point frame columns against the same workload on Decimal object columns:
+total volume, notional (price x volume) and VWAP over a trade history.
+
+    python -m benchmarks.bench_numeric [rows ...]
+"""
+import random
+import sys
+import time
+from decimal import Decimal
+
+import numpy as np
+
+from pybitx.frames import trades_frame
+
+
+DECIMALS = {'price': 2, 'volume': 8}
+
+
+def payload(n, rng):
+    return {'trades': [{'volume': '%.8f' % rng.random(), 'timestamp': 1366052621774 + i,
+                        'price': '%.2f' % rng.uniform(4900, 5100)} for i in range(n)]}
+
+
+def fixed_workload(df):
+    price = df.price.to_numpy()
+    volume = df.volume.to_numpy()
+    total_volume = int(volume.sum())
+    # Each price x volume product (10 decimals) fits in an int64, but a million of them summed may not, so sum in
+    # chunks and combine the partial sums as Python ints
+    products = price * volume
+    chunks = np.array_split(products, max(1, len(products) // 10000))
+    notional = sum(int(chunk.sum()) for chunk in chunks)
+    return total_volume, notional, Decimal(notional).scaleb(-2) / total_volume
+
+
+def decimal_workload(prices, volumes):
+    total_volume = sum(volumes)
+    notional = sum(p * v for p, v in zip(prices, volumes))
+    return total_volume, notional, notional / total_volume
+
+
+def timed(fn, *args):
+    best = float('inf')
+    for _ in range(3):
+        start = time.perf_counter()
+        result = fn(*args)
+        best = min(best, time.perf_counter() - start)
+    return best, result
+
+
+def run(sizes=(10000, 100000, 1000000)):
+    rng = random.Random(1)
+    print('%8s %14s %14s %14s %14s' % ('rows', 'int64 parse', 'Decimal parse', 'int64 calc', 'Decimal calc'))
+    for n in sizes:
+        trades = payload(n, rng)
+        fixed_parse, df = timed(trades_frame, trades, DECIMALS)
+        decimal_parse, (prices, volumes) = timed(
+            lambda t: (np.array([Decimal(r['price']) for r in t['trades']], dtype=object),
+                       np.array([Decimal(r['volume']) for r in t['trades']], dtype=object)), trades)
+        fixed_calc, (fixed_volume, _, fixed_vwap) = timed(fixed_workload, df)
+        decimal_calc, (decimal_volume, _, decimal_vwap) = timed(decimal_workload, prices, volumes)
+        assert Decimal(fixed_volume).scaleb(-8) == decimal_volume
+        assert abs(fixed_vwap - decimal_vwap) < Decimal('1e-9')
+        print('%8d %12.1fms %12.1fms %12.2fms %12.2fms' % (
+            n, fixed_parse * 1e3, decimal_parse * 1e3, fixed_calc * 1e3, decimal_calc * 1e3))
+
+
+if __name__ == '__main__':
+    run([int(n) for n in sys.argv[1:]] or (10000, 100000, 1000000))
@@ -0,0 +1,72 @@
+"""
+Measures cold-start cost: the time for a fresh interpreter to import pybitx and create a client, and the extra time
+taken by the first *_frame call, which is when NumPy and pandas are imported. Each case runs in new processes, and the
+median is reported along with the heavy modules that each case loaded.
+
+    python -m benchmarks.bench_startup [--runs 10] [--output startup.json] [--max-ms 250]
+
+With --max-ms, the exit status is 1 if creating a client takes longer than that, or if it loads NumPy or pandas.
+"""
+import argparse
+import json
+import statistics
+import subprocess
+import sys
+
+
+HEAVY = ('numpy', 'pandas', 'aiohttp', 'orjson')
+
+CASES = [
+    ('import', 'import pybitx'),
+    ('client', "import pybitx; pybitx.BitX('key', 'secret')"),
+    ('first_frame', "import pybitx; from pybitx.frames import trades_frame; "
+                    "trades_frame({'trades': [{'price': '1', 'volume': '1', 'timestamp': 0}]})"),
+]
+
+SCRIPT = '''
+import sys, time, json
+start = time.perf_counter()
+%s
+elapsed = time.perf_counter() - start
+print(json.dumps({'ms': elapsed * 1e3, 'modules': [m for m in %r if m in sys.modules]}))
+'''
+
+
+def measure(code, runs):
+    times = []
+    modules = None
+    for _ in range(runs):
+        output = subprocess.check_output([sys.executable, '-c', SCRIPT % (code, HEAVY)])
+        result = json.loads(output.decode('utf-8').strip().splitlines()[-1])
+        times.append(result['ms'])
+        modules = result['modules']
+    return {'median_ms': statistics.median(times), 'min_ms': min(times), 'max_ms': max(times), 'modules': modules}
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Measure pybitx cold-start time')
+    parser.add_argument('--runs', type=int, default=10)
+    parser.add_argument('--output', help='also write the results to this JSON file')
+    parser.add_argument('--max-ms', type=float, help='fail if creating a client takes longer than this')
+    args = parser.parse_args(argv)
+    results = {}
+    for name, code in CASES:
+        results[name] = measure(code, args.runs)
+        print('%-12s median %7.1f ms  min %7.1f ms  loads %s' % (
+            name, results[name]['median_ms'], results[name]['min_ms'], ', '.join(results[name]['modules']) or '-'))
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump({'python': sys.version.split()[0], 'runs': args.runs, 'results': results}, f, indent=2,
+                      sort_keys=True)
+    if args.max_ms is not None:
+        client = results['client']
+        heavy = set(client['modules']) & set(['numpy', 'pandas'])
+        if client['median_ms'] > args.max_ms or heavy:
+            print('Cold start regressed: %.1f ms, loads %s' % (client['median_ms'], ', '.join(sorted(heavy)) or '-'),
+                  file=sys.stderr)
+            return 1
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
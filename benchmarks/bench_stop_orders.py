@@ -0,0 +1,39 @@
+"""
+Compares the serial stop_all_orders against the concurrent mode, against a local stub server with a fixed round-trip
+latency.
+
+    python -m benchmarks.bench_stop_orders [n_orders] [latency_ms]
+"""
+import sys
+import time
+
+from pybitx.api import BitX
+from benchmarks.stub_server import StubServer
+
+
+def run(n_orders=100, latency=0.02):
+    responses = {
+        'listorders': {'orders': [{'order_id': 'BX%06d' % (i,)} for i in range(n_orders)]},
+        'stoporder': {'success': True},
+    }
+    with StubServer(responses, latency) as server:
+        options = server.options()
+        options['max_workers'] = 20
+        api = BitX('key', 'secret', options)
+        start = time.perf_counter()
+        api.stop_all_orders()
+        serial = time.perf_counter() - start
+        start = time.perf_counter()
+        result = api.stop_all_orders(parallel=True)
+        parallel = time.perf_counter() - start
+        api.close()
+    assert all(outcome['success'] for outcome in result.values())
+    print('orders=%d latency=%.0fms' % (n_orders, latency * 1e3))
+    print('serial:   %8.3f s' % (serial,))
+    print('parallel: %8.3f s (%d workers, %.1fx faster)' % (parallel, options['max_workers'], serial / parallel))
+
+
+if __name__ == '__main__':
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 100
+    latency = float(sys.argv[2]) * 1e-3 if len(sys.argv) > 2 else 0.02
+    run(n, latency)
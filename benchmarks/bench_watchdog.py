@@ -0,0 +1,53 @@
+"""
+Measures how quickly the Watchdog cancels resting orders once the network degrades, against a local stub server. Orders
+are placed, then one request is stalled past the latency bound; the time from the stall to the last order being
+stopped is reported along with the sweep itself, for several sweep concurrencies.
+
+    python -m benchmarks.bench_watchdog [n_orders] [latency_ms] [max_latency_ms]
+"""
+import itertools
+import sys
+import threading
+import time
+
+from pybitx.api import BitX
+from pybitx.watchdog import Watchdog
+from benchmarks.stub_server import StubServer
+
+
+def run(n_orders=200, latency=0.02, max_latency=0.1, concurrencies=(1, 5, 20, 50)):
+    ids = itertools.count()
+    responses = {
+        'ticker': {'bid': '100'},
+        'postorder': lambda query: {'order_id': 'BX%d' % (next(ids),)},
+        'stoporder': {'success': True},
+    }
+    print('orders=%d latency=%.0fms max_latency=%.0fms' % (n_orders, latency * 1e3, max_latency * 1e3))
+    print('%12s %14s %14s' % ('concurrency', 'sweep s', 'stall->done s'))
+    for concurrency in concurrencies:
+        with StubServer(responses, latency) as server:
+            options = server.options()
+            options['max_workers'] = 20
+            api = BitX('key', 'secret', options)
+            done = threading.Event()
+            watchdog = Watchdog(api, max_latency=max_latency, check_interval=0.005, concurrency=concurrency,
+                                on_sweep=lambda sweep: done.set())
+            with watchdog:
+                api.create_limit_orders([('buy', 0.01, 900)] * n_orders, concurrency=20)
+                server.delays['ticker'] = max_latency * 10
+                start = time.perf_counter()
+                threading.Thread(target=api.get_ticker, daemon=True).start()
+                done.wait(60)
+                total = time.perf_counter() - start
+            sweep = watchdog.sweeps[0]
+            assert all(outcome['success'] for outcome in sweep.results.values())
+            assert len(sweep.results) == n_orders
+            api.close()
+        print('%12d %14.3f %14.3f' % (concurrency, sweep.elapsed, total))
+
+
+if __name__ == '__main__':
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 200
+    latency = float(sys.argv[2]) * 1e-3 if len(sys.argv) > 2 else 0.02
+    max_latency = float(sys.argv[3]) * 1e-3 if len(sys.argv) > 3 else 0.1
+    run(n, latency, max_latency)
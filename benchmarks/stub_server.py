@@ -0,0 +1,86 @@
+"""
+A local stand-in for the BitX /api/1/* endpoints, for benchmarks that need real sockets and real latency. Each
+response is delayed by `latency` seconds to mimic the round-trip to the exchange (or by `delays[call]` for calls given
+their own delay), and a fraction `error_rate` of requests fail with HTTP 503. Both can be changed while the server is
+running, e.g. to degrade the network mid-test.
+
+Responses are registered per call (the path after /api/1/) as a JSON-serialisable object, as pre-encoded bytes for
+large payloads, or as a function of the request's query parameters returning either.
+"""
+import json
+import random
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qsl
+
+
+class StubHandler(BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'
+    # Headers and body are written separately, so without this delayed ACKs add ~40ms to each response
+    disable_nagle_algorithm = True
+
+    def log_message(self, format, *args):
+        pass
+
+    def _respond(self):
+        length = int(self.headers.get('Content-Length') or 0)
+        if length:
+            self.rfile.read(length)
+        path, _, query = self.path.partition('?')
+        call = path[len('/api/1/'):]
+        body = self.server.responses.get(call, {'error': 'Not found'})
+        if callable(body):
+            body = body(dict(parse_qsl(query)))
+        time.sleep(self.server.delays.get(call, self.server.latency))
+        if self.server.fail():
+            body = {'error': 'Service unavailable'}
+            status = 503
+        elif isinstance(body, bytes):
+            status = 200
+        else:
+            status = 200 if 'error' not in body else 404
+        payload = body if isinstance(body, bytes) else json.dumps(body).encode('utf-8')
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(payload)))
+        self.end_headers()
+        self.wfile.write(payload)
+
+    do_GET = _respond
+    do_POST = _respond
+
+
+class StubServer(ThreadingHTTPServer):
+    daemon_threads = True
+    # The default backlog of 5 drops bursts of new connections, which then wait a second to retry
+    request_queue_size = 128
+
+    def __init__(self, responses=None, latency=0.0, error_rate=0.0, seed=None, delays=None):
+        ThreadingHTTPServer.__init__(self, ('127.0.0.1', 0), StubHandler)
+        self.responses = responses or {}
+        self.latency = latency
+        self.delays = delays or {}
+        self.error_rate = error_rate
+        self._random = random.Random(seed)
+        self._lock = threading.Lock()
+        self._thread = None
+
+    def fail(self):
+        if not self.error_rate:
+            return False
+        with self._lock:
+            return self._random.random() < self.error_rate
+
+    def options(self):
+        return {'hostname': '127.0.0.1', 'port': self.server_address[1], 'scheme': 'http'}
+
+    def __enter__(self):
+        self._thread = threading.Thread(target=self.serve_forever)
+        self._thread.daemon = True
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc_info):
+        self.shutdown()
+        self.server_close()
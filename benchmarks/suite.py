@@ -0,0 +1,222 @@
+"""
+Benchmarks every public BitX method, the *_frame builders and the bulk operations against a local stub server, and
+writes the results as JSON so that runs can be compared between versions.
+
+For each case the suite reports the number of calls and failures, the throughput in calls per second and the mean,
+p50 and p99 latency in milliseconds. The frame builders are also timed on their own, with no network in the way.
+
+    python -m benchmarks.suite --output before.json
+    ... change things ...
+    python -m benchmarks.suite --output after.json --compare before.json
+
+With --compare, cases whose p50 latency rose, or whose throughput fell, by more than --threshold (default 20%) are
+listed and the exit status is 1.
+"""
+import argparse
+import json
+import platform
+import random
+import sys
+import time
+
+import numpy as np
+
+from pybitx import __version__, frames
+from pybitx.api import BitX, BitXAPIError
+from benchmarks.bench_frames import order_book, trades, orders, transactions
+from benchmarks.stub_server import StubServer
+
+
+ACCOUNT = '319232323'
+
+
+def responses(rows, rng):
+    """
+    :return: stub responses for every endpoint, with order books, trades, orders and transaction pages of `rows` rows
+    """
+    history = transactions(rows, rng)['transactions'][::-1]
+
+    def transaction_page(query):
+        first = int(query.get('min_row', 1))
+        last = int(query.get('max_row', first + 1000))
+        return {'id': ACCOUNT, 'transactions': history[first - 1:last - 1]}
+
+    encode = lambda obj: json.dumps(obj).encode('utf-8')
+    return {
+        'ticker': {'ask': '1050.00', 'timestamp': 1366224386716, 'bid': '924.00', 'rolling_24_hour_volume': '12.52',
+                   'last_trade': '950.00', 'pair': 'XBTZAR'},
+        'tickers': {'tickers': [{'ask': '1050.00', 'timestamp': 1366224386716, 'bid': '924.00', 'pair': pair,
+                                 'rolling_24_hour_volume': '12.52', 'last_trade': '950.00'}
+                                for pair in ('XBTZAR', 'ETHXBT', 'XBTNGN', 'XBTMYR')]},
+        'orderbook': encode(order_book(rows, rng)),
+        'trades': encode(trades(rows, rng)),
+        'listorders': encode(orders(rows, rng)),
+        'orders/BX0000000000001': orders(1, rng)['orders'][0],
+        'postorder': {'order_id': 'BXMC2CJ7HNB88U4'},
+        'stoporder': {'success': True},
+        'funding_address': {'asset': 'XBT', 'address': 'B1tC0InExAMPL3fundIN6AdDreS5t0Use',
+                            'total_received': '1.234567', 'total_unconfirmed': '0.00'},
+        'withdrawals': {'withdrawals': [{'status': 'PENDING', 'id': '2221'}, {'status': 'COMPLETED', 'id': '1121'}]},
+        'balance': {'balance': [{'account_id': ACCOUNT, 'asset': 'XBT', 'balance': '0.199', 'reserved': '0.01',
+                                 'unconfirmed': '0.421'}]},
+        'accounts/%s/transactions' % (ACCOUNT,): transaction_page,
+        'accounts/%s/pending' % (ACCOUNT,): {'id': ACCOUNT, 'pending': []},
+    }
+
+
+def network_cases(api, rows):
+    """
+    :return: (name, function, calls per run) for each method exercised over the network
+    """
+    ladder = [('buy', 0.01, 900 - i) for i in range(20)]
+    ids = ['BX%013d' % (i,) for i in range(20)]
+    pairs = ['XBTZAR', 'ETHXBT', 'XBTNGN', 'XBTMYR']
+    return [
+        ('get_ticker', api.get_ticker, 1),
+        ('get_all_tickers', api.get_all_tickers, 1),
+        ('get_order_book', api.get_order_book, 1),
+        ('get_order_book_frame', api.get_order_book_frame, 1),
+        ('get_trades', api.get_trades, 1),
+        ('get_trades_frame', api.get_trades_frame, 1),
+        ('get_orders', api.get_orders, 1),
+        ('get_orders_frame', api.get_orders_frame, 1),
+        ('get_order', lambda: api.get_order('BX0000000000001'), 1),
+        ('create_limit_order', lambda: api.create_limit_order('buy', 0.01, 900), 1),
+        ('stop_order', lambda: api.stop_order('BX0000000000001'), 1),
+        ('get_funding_address', lambda: api.get_funding_address('XBT'), 1),
+        ('get_withdrawals_status', api.get_withdrawals_status, 1),
+        ('get_balance', api.get_balance, 1),
+        ('get_transactions', lambda: api.get_transactions(ACCOUNT, 1, min(rows, 1000) + 1), 1),
+        ('get_transactions_frame', lambda: api.get_transactions_frame(ACCOUNT, 1, min(rows, 1000) + 1), 1),
+        ('get_pending_transactions', lambda: api.get_pending_transactions(ACCOUNT), 1),
+        ('get_tickers', lambda: api.get_tickers(pairs), len(pairs)),
+        ('get_order_books_frame', lambda: api.get_order_books_frame(pairs), len(pairs)),
+        ('iter_transactions', lambda: sum(1 for _ in api.iter_transactions(ACCOUNT, page_size=1000)),
+         rows // 1000 + 1),
+        ('stop_orders', lambda: api.stop_orders(ids), len(ids)),
+        ('create_limit_orders', lambda: api.create_limit_orders(ladder), len(ladder)),
+    ]
+
+
+def frame_cases(rows, rng):
+    """
+    :return: (name, function, calls per run) for each frame builder, on payloads already decoded
+    """
+    payloads = [
+        ('order_book_frame', frames.order_book_frame, order_book(rows, rng)),
+        ('trades_frame', frames.trades_frame, trades(rows, rng)),
+        ('orders_frame', frames.orders_frame, orders(rows, rng)),
+        ('transactions_frame', frames.transactions_frame, transactions(rows, rng)),
+    ]
+    return [(name, (lambda build=build, payload=payload: build(payload)), 1) for name, build, payload in payloads]
+
+
+def measure(fn, calls, repeat):
+    """
+    Runs fn `repeat` times
+    :return: a dict of the results. Failed runs count as errors and are left out of the latencies
+    """
+    latencies = []
+    errors = 0
+    start = time.perf_counter()
+    for _ in range(repeat):
+        t = time.perf_counter()
+        try:
+            fn()
+        except (BitXAPIError, IOError):
+            errors += 1
+            continue
+        latencies.append(time.perf_counter() - t)
+    elapsed = time.perf_counter() - start
+    result = {'runs': repeat, 'calls': repeat * calls, 'errors': errors, 'seconds': elapsed,
+              'throughput': repeat * calls / elapsed}
+    if latencies:
+        latencies = np.array(latencies) * 1e3
+        result.update({'mean_ms': float(latencies.mean()), 'p50_ms': float(np.percentile(latencies, 50)),
+                       'p99_ms': float(np.percentile(latencies, 99))})
+    return result
+
+
+def run(rows=1000, latency=0.005, error_rate=0.0, repeat=20, retries=0, seed=1, only=None):
+    rng = random.Random(seed)
+    results = {}
+    with StubServer(responses(rows, rng), latency, error_rate, seed) as server:
+        options = server.options()
+        options['max_workers'] = 10
+        options['retries'] = retries
+        options['backoff'] = 0.001
+        api = BitX('key', 'secret', options)
+        cases = [('network', case) for case in network_cases(api, rows)] + \
+            [('frame', case) for case in frame_cases(rows, rng)]
+        for group, (name, fn, calls) in cases:
+            if only and name not in only:
+                continue
+            measure(fn, calls, 1)  # warm up connections and caches
+            results[name] = dict(measure(fn, calls, repeat), group=group)
+            log_result(name, results[name])
+        api.close()
+    return {
+        'meta': {'pybitx': __version__, 'python': platform.python_version(), 'platform': platform.platform(),
+                 'time': time.strftime('%Y-%m-%dT%H:%M:%SZ', time.gmtime()), 'rows': rows, 'latency': latency,
+                 'error_rate': error_rate, 'repeat': repeat, 'retries': retries, 'seed': seed},
+        'results': results
+    }
+
+
+def log_result(name, result):
+    if 'p50_ms' not in result:
+        print('%-26s all %d runs failed' % (name, result['runs']), file=sys.stderr)
+        return
+    print('%-26s %10.1f calls/s  p50 %8.2f ms  p99 %8.2f ms  errors %d' % (
+        name, result['throughput'], result['p50_ms'], result['p99_ms'], result['errors']), file=sys.stderr)
+
+
+def compare(results, baseline, threshold=0.2):
+    """
+    :return: a list of (case, measure, baseline value, new value) for each regression larger than threshold
+    """
+    regressions = []
+    for name, new in results['results'].items():
+        old = baseline['results'].get(name)
+        if old is None or 'p50_ms' not in old or 'p50_ms' not in new:
+            continue
+        if new['p50_ms'] > old['p50_ms'] * (1 + threshold):
+            regressions.append((name, 'p50_ms', old['p50_ms'], new['p50_ms']))
+        if new['throughput'] < old['throughput'] / (1 + threshold):
+            regressions.append((name, 'throughput', old['throughput'], new['throughput']))
+    return regressions
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Benchmark pybitx against a local stub server')
+    parser.add_argument('--rows', type=int, default=1000, help='rows in order books, trade lists and histories')
+    parser.add_argument('--latency', type=float, default=5, help='stub server latency, in ms')
+    parser.add_argument('--error-rate', type=float, default=0.0, help='fraction of requests that fail with 503')
+    parser.add_argument('--repeat', type=int, default=20, help='runs of each case')
+    parser.add_argument('--retries', type=int, default=0, help="the client's 'retries' option")
+    parser.add_argument('--seed', type=int, default=1)
+    parser.add_argument('--only', nargs='*', help='run only these cases')
+    parser.add_argument('--output', help='write the results to this JSON file, rather than to stdout')
+    parser.add_argument('--compare', help='a previous results file to check for regressions')
+    parser.add_argument('--threshold', type=float, default=0.2, help='the relative change that counts as a regression')
+    args = parser.parse_args(argv)
+    results = run(args.rows, args.latency * 1e-3, args.error_rate, args.repeat, args.retries, args.seed, args.only)
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(results, f, indent=2, sort_keys=True)
+    else:
+        json.dump(results, sys.stdout, indent=2, sort_keys=True)
+        print()
+    if args.compare:
+        with open(args.compare) as f:
+            baseline = json.load(f)
+        regressions = compare(results, baseline, args.threshold)
+        for name, measure_name, old, new in regressions:
+            print('REGRESSION %-26s %-10s %10.2f -> %10.2f' % (name, measure_name, old, new), file=sys.stderr)
+        if regressions:
+            return 1
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -1,4 +1,4 @@
 __version__ = "0.1.10"
 
 
-from api import BitX
\ No newline at end of file
+from pybitx.api import BitX
\ No newline at end of file
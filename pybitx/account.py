@@ -0,0 +1,272 @@
+"""
+An in-memory view of account balances, reserved funds and open orders, for pre-trade checks.
+
+Checking funds with get_balance, get_orders and get_pending_transactions before each order costs several round-trips.
+An AccountState fetches all three together, on a schedule in a background thread, and adjusts its view locally when
+orders are placed or stopped through it, so checks are answered from memory. Every answer comes with the age of the
+data behind it, and checks can refuse to answer from data older than a bound.
+
+Funds leaving in pending transactions, such as withdrawals awaiting confirmation, are not available either; funds
+arriving in them are only counted once confirmed. Fills are only seen at the next refresh, so between refreshes the view
+errs on the side of funds being reserved.
+"""
+import logging
+import threading
+import time
+
+from pybitx.api import order_data
+from pybitx.numeric import to_decimal
+
+
+log = logging.getLogger(__name__)
+
+
+class StaleAccountState(Exception):
+    def __init__(self, age, max_age):
+        self.age = age
+        self.max_age = max_age
+
+    def __str__(self):
+        return "Account state is %.3fs old, older than the %.3fs allowed" % (self.age, self.max_age)
+
+
+def split_pair(pair, assets=None):
+    """
+    :param assets: a dict of pair to (base, counter), for pairs whose assets aren't both three letters
+    :return: the (base, counter) assets of a pair
+    """
+    if assets and pair in assets:
+        return assets[pair]
+    if len(pair) != 6:
+        raise ValueError('Cannot tell the assets of pair %s' % (pair,))
+    return pair[:3], pair[3:]
+
+
+class AccountState:
+    """
+    Balances, reserved funds and open orders of an account, refreshed in the background by a BitX client.
+
+        account = AccountState(api, interval=5, max_age=15)
+        account.start()
+        if account.check('buy', 0.1, 900):
+            account.create_limit_order('buy', 0.1, 900)
+        account.stop()
+
+    A refresh replaces the whole view with the exchange's. Orders placed or stopped through the AccountState while a
+    refresh is in flight are applied again on top of it, as the exchange may have answered before seeing them.
+    """
+    def __init__(self, api, pair=None, interval=5.0, max_age=None, pending_accounts=None, assets=None,
+                 clock=time.monotonic):
+        """
+        :param api: a BitX client
+        :param pair: the default market for orders, if not the client's pair
+        :param interval: the seconds between background refreshes
+        :param max_age: the default staleness bound, in seconds, for checks, or None for no bound
+        :param pending_accounts: the account IDs whose pending transactions are fetched, or None for every account in
+        the balance listing
+        :param assets: a dict of pair to (base, counter), for pairs whose assets aren't both three letters
+        """
+        self.api = api
+        self.pair = pair or api.pair
+        self.interval = interval
+        self.max_age = max_age
+        self.pending_accounts = pending_accounts
+        self.assets = assets
+        self._clock = clock
+        self.balances = {}
+        self.orders = {}
+        self.pending = {}
+        self.outgoing = {}
+        self.updated = None
+        self.refreshes = 0
+        self.last_error = None
+        self._account_ids = []
+        self._journal = []
+        self._lock = threading.Lock()
+        self._refresh_lock = threading.Lock()
+        self._stopping = threading.Event()
+        self._thread = None
+
+    def __enter__(self):
+        self.start()
+        return self
+
+    def __exit__(self, *exc_info):
+        self.stop()
+
+    def age(self):
+        """
+        :return: the seconds since the data was fetched, or infinity before the first refresh
+        """
+        if self.updated is None:
+            return float('inf')
+        return self._clock() - self.updated
+
+    def _check_age(self, max_age):
+        max_age = self.max_age if max_age is None else max_age
+        if max_age is not None:
+            age = self.age()
+            if age > max_age:
+                raise StaleAccountState(age, max_age)
+
+    def refresh(self):
+        """
+        Fetches the balances, pending orders and pending transactions, concurrently, and replaces the view with them
+        """
+        with self._refresh_lock:
+            started = self._clock()
+            balance = self.api.submit(self.api.get_balance)
+            listing = self.api.submit(self.api.get_orders, state='PENDING')
+            # The accounts seen by the last refresh are fetched alongside the balance; only the first refresh waits
+            # for the balance listing to find them
+            accounts = self.pending_accounts if self.pending_accounts is not None else self._account_ids
+            pending = [self.api.submit(self.api.get_pending_transactions, account_id) for account_id in accounts]
+            balance = balance.result()
+            if self.pending_accounts is None and not accounts:
+                accounts = [row['account_id'] for row in balance['balance']]
+                pending = [self.api.submit(self.api.get_pending_transactions, account_id) for account_id in accounts]
+            listing = listing.result()
+            pending = dict((account_id, f.result()['pending'] or []) for account_id, f in zip(accounts, pending))
+            self._apply(started, balance, listing, pending)
+
+    def _apply(self, started, balance, listing, pending):
+        balances = {}
+        for row in balance['balance']:
+            totals = balances.setdefault(row['asset'], {'balance': 0, 'reserved': 0, 'unconfirmed': 0})
+            for field in totals:
+                totals[field] += to_decimal(row[field])
+        orders = dict((order['order_id'], order) for order in listing['orders'] or [])
+        assets = dict((row['account_id'], row['asset']) for row in balance['balance'])
+        outgoing = {}
+        for account_id, transactions in pending.items():
+            for tx in transactions:
+                delta = to_decimal(tx['available_delta'])
+                if delta < 0:
+                    asset = tx.get('currency') or assets.get(account_id)
+                    outgoing[asset] = outgoing.get(asset, 0) - delta
+        with self._lock:
+            self._account_ids = [row['account_id'] for row in balance['balance']]
+            self.balances = balances
+            self.orders = orders
+            self.pending = pending
+            self.outgoing = outgoing
+            # Local changes made since the refresh started may be missing from what was fetched
+            self._journal = [entry for entry in self._journal if entry[0] >= started]
+            for _, placed, order in self._journal:
+                if placed and order['order_id'] not in orders:
+                    self._reserve(order, 1)
+                elif not placed and order['order_id'] in orders:
+                    self._reserve(orders[order['order_id']], -1)
+            self.updated = started
+            self.refreshes += 1
+
+    def _reservation(self, order):
+        """
+        :return: the asset and amount an open order reserves
+        """
+        base, counter = split_pair(order.get('pair') or self.pair, self.assets)
+        remaining = to_decimal(order['limit_volume']) - to_decimal(order['base'])
+        if order['type'] == 'BID':
+            return counter, remaining * to_decimal(order['limit_price'])
+        return base, remaining
+
+    def _reserve(self, order, sign):
+        """
+        Adds an open order to the view (sign 1) or removes it (sign -1), moving its funds into or out of reserve
+        """
+        asset, amount = self._reservation(order)
+        totals = self.balances.setdefault(asset, {'balance': 0, 'reserved': 0, 'unconfirmed': 0})
+        totals['reserved'] += sign * amount
+        if sign > 0:
+            self.orders[order['order_id']] = order
+        else:
+            self.orders.pop(order['order_id'], None)
+
+    def available(self, asset, max_age=None):
+        """
+        :param max_age: raise StaleAccountState if the data is older than this many seconds. Defaults to the max_age
+        the AccountState was created with
+        :return: the balance of an asset less its reserved funds and what is leaving in pending transactions, as a
+        Decimal
+        """
+        self._check_age(max_age)
+        with self._lock:
+            totals = self.balances.get(asset)
+            if not totals:
+                return to_decimal(0)
+            return totals['balance'] - totals['reserved'] - self.outgoing.get(asset, 0)
+
+    def open_orders(self, pair=None, max_age=None):
+        """
+        :return: the open orders, of a pair if one is given
+        """
+        self._check_age(max_age)
+        with self._lock:
+            return [order for order in self.orders.values()
+                    if pair is None or (order.get('pair') or self.pair) == pair]
+
+    def check(self, order_type, volume, price, pair=None, max_age=None):
+        """
+        Checks whether there are enough available funds for a limit order, rounded as create_limit_order rounds it.
+        Fees are not included
+        :return: True if the order can be funded
+        """
+        data = order_data(pair or self.pair, order_type, volume, price, self.api.tick_size, self.api.lot_size)
+        asset, amount = self._reservation(dict(data, limit_volume=data['volume'], limit_price=data['price'], base=0))
+        return self.available(asset, max_age) >= amount
+
+    def create_limit_order(self, order_type, volume, price, pair=None):
+        """
+        Places a limit order with the client and reserves its funds in the view
+        :return: the order id
+        """
+        pair = pair or self.pair
+        result = self.api.create_limit_order(order_type, volume, price, pair=pair)
+        data = order_data(pair, order_type, volume, price, self.api.tick_size, self.api.lot_size)
+        order = {'order_id': result['order_id'], 'pair': pair, 'type': data['type'], 'state': 'PENDING',
+                 'limit_price': data['price'], 'limit_volume': data['volume'], 'base': '0', 'counter': '0'}
+        with self._lock:
+            self._reserve(order, 1)
+            self._journal.append((self._clock(), True, order))
+        return result
+
+    def stop_order(self, order_id):
+        """
+        Stops an order with the client and releases the rest of its reserved funds in the view
+        :return: a success flag
+        """
+        result = self.api.stop_order(order_id)
+        with self._lock:
+            if order_id in self.orders:
+                self._reserve(self.orders[order_id], -1)
+            self._journal.append((self._clock(), False, {'order_id': order_id}))
+        return result
+
+    def start(self):
+        """
+        Refreshes in a background thread every `interval` seconds until stop is called. A failed refresh is logged and
+        kept in `last_error`, and the view keeps ageing until a refresh succeeds
+        """
+        if self._thread is not None:
+            return
+        self._stopping.clear()
+        self._thread = threading.Thread(target=self._run, name='pybitx-account', daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        if self._thread is None:
+            return
+        self._stopping.set()
+        self._thread.join()
+        self._thread = None
+
+    def _run(self):
+        while not self._stopping.is_set():
+            started = time.monotonic()
+            try:
+                self.refresh()
+                self.last_error = None
+            except Exception as e:
+                self.last_error = e
+                log.warning('Account refresh failed: %s', e)
+            self._stopping.wait(max(0.0, self.interval - (time.monotonic() - started)))
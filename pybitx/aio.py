@@ -0,0 +1,266 @@
+import asyncio
+import base64
+import logging
+from collections import namedtuple
+
+import aiohttp
+
+from pybitx import __version__
+from pybitx.api import BitXAPIError, order_data
+from pybitx.numeric import to_exact
+from pybitx.decoding import get_decoder, exact_loads
+
+
+log = logging.getLogger(__name__)
+
+# Stand-in for a requests.Response, carrying just what BitXAPIError reads
+_ResponseInfo = namedtuple('_ResponseInfo', ['url', 'status_code', 'text'])
+
+
+class AsyncBitX:
+    """
+    asyncio counterpart to BitX. Every public method is a coroutine with the same name, arguments and return value as
+    its BitX equivalent. All requests share one aiohttp session whose connection pool is bounded by the 'pool_size'
+    option, so hundreds of requests can be in flight from a single thread while reusing keep-alive connections.
+    """
+    def __init__(self, key, secret, options={}):
+        self.options = options
+        self.auth = (key, secret)
+        if 'hostname' in options:
+            self.hostname = options['hostname']
+        else:
+            self.hostname = 'api.mybitx.com'
+        self.port = options['port'] if 'port' in options else 443
+        self.scheme = options['scheme'] if 'scheme' in options else 'https'
+        self.pair = options['pair'] if 'pair' in options else 'XBTZAR'
+        self.ca = options['ca'] if 'ca' in options else None
+        self.timeout = options['timeout'] if 'timeout' in options else 30
+        self.pool_size = options['pool_size'] if 'pool_size' in options else 100
+        self.numeric = options['numeric'] if 'numeric' in options else 'float'
+        if self.numeric not in ('float', 'exact'):
+            raise ValueError('Invalid numeric option: %s' % (self.numeric,))
+        self.decimals = None
+        if self.numeric == 'exact':
+            self.decimals = {
+                'price': options['price_decimals'] if 'price_decimals' in options else 8,
+                'volume': options['volume_decimals'] if 'volume_decimals' in options else 8
+            }
+        self.tick_size = options['tick_size'] if 'tick_size' in options else None
+        self.lot_size = options['lot_size'] if 'lot_size' in options else None
+        self.loads = get_decoder(options['json'] if 'json' in options else 'auto')
+        token = base64.b64encode(('%s:%s' % (key, secret)).encode('latin1')).decode('ascii')
+        self._auth_headers = {'Authorization': 'Basic %s' % (token,)}
+        # The session is created lazily, since aiohttp wants it built inside a running event loop
+        self._session = None
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc_info):
+        await self.close()
+
+    def _get_session(self):
+        if self._session is None or self._session.closed:
+            connector = aiohttp.TCPConnector(limit=self.pool_size, ssl=self._ssl_context())
+            self._session = aiohttp.ClientSession(
+                connector=connector,
+                timeout=aiohttp.ClientTimeout(total=self.timeout),
+                headers={
+                    'Accept': 'application/json',
+                    'Accept-Charset': 'utf-8',
+                    'User-Agent': 'py-bitx v' + __version__
+                })
+        return self._session
+
+    def _ssl_context(self):
+        if self.ca is None:
+            return True
+        import ssl
+        return ssl.create_default_context(cafile=self.ca)
+
+    async def close(self):
+        if self._session is not None:
+            await self._session.close()
+            self._session = None
+            log.info('AsyncBitX session closed')
+
+    def construct_url(self, call):
+        base = self.hostname
+        if self.port != 443:
+            base += ':%d' % (self.port,)
+        return "%s://%s/api/1/%s" % (self.scheme, base, call)
+
+    async def api_request(self, call, params, kind='auth', http_call='get'):
+        """
+        General API request. Generally, use the convenience functions below
+        :param kind: the type of request to make. 'auth' makes an authenticated call; 'basic' is unauthenticated
+        :param call: the API call to make
+        :param params: a dict of query parameters
+        :return: a json response, a BitXAPIError is thrown if the api returns with an error
+        """
+        url = self.construct_url(call)
+        headers = self._auth_headers if kind == 'auth' else None
+        session = self._get_session()
+        if http_call == 'get':
+            request = session.get(url, params=params, headers=headers)
+        elif http_call == 'post':
+            request = session.post(url, data=params, headers=headers)
+        else:
+            raise ValueError('Invalid http_call parameter')
+        async with request as response:
+            content = await response.read()
+            try:
+                if self.numeric == 'exact':
+                    result = to_exact(exact_loads(content))
+                else:
+                    result = self.loads(content)
+            except ValueError:
+                result = None
+            if result is None:
+                result = {'error': 'No JSON content returned'}
+            if response.status != 200 or 'error' in result:
+                text = content.decode('utf-8', 'replace')
+                raise BitXAPIError(_ResponseInfo(str(response.url), response.status, text))
+            return result
+
+    async def get_ticker(self, kind='auth', pair=None):
+        params = {'pair': pair or self.pair}
+        return await self.api_request('ticker', params, kind=kind)
+
+    async def get_all_tickers(self, kind='auth'):
+        return await self.api_request('tickers', None, kind=kind)
+
+    async def get_order_book(self, limit=None, kind='auth', pair=None):
+        params = {'pair': pair or self.pair}
+        orders = await self.api_request('orderbook', params, kind=kind)
+        if limit is not None:
+            orders['bids'] = orders['bids'][:limit]
+            orders['asks'] = orders['asks'][:limit]
+        return orders
+
+    async def get_order_book_frame(self, limit=None, kind='auth', pair=None):
+        q = await self.get_order_book(limit, kind, pair)
+        from pybitx.frames import order_book_frame
+        return order_book_frame(q, self.decimals)
+
+    async def get_trades(self, limit=None, kind='auth', since=None, pair=None):
+        """
+        :param since: if given, only trades after this time, in Unix milliseconds, are returned
+        """
+        params = {'pair': pair or self.pair}
+        if since is not None:
+            params['since'] = since
+        trades = await self.api_request('trades', params, kind=kind)
+        if limit is not None:
+            trades['trades'] = trades['trades'][:limit]
+        return trades
+
+    async def get_trades_frame(self, limit=None, kind='auth', since=None, pair=None):
+        trades = await self.get_trades(limit, kind, since, pair)
+        from pybitx.frames import trades_frame
+        return trades_frame(trades, self.decimals)
+
+    async def get_tickers(self, pairs, kind='auth'):
+        """
+        Fetches the tickers of several pairs concurrently
+        :return: a dict of {pair: ticker}
+        """
+        pairs = list(pairs)
+        tickers = await asyncio.gather(*[self.get_ticker(kind, pair) for pair in pairs])
+        return dict(zip(pairs, tickers))
+
+    async def get_order_books_frame(self, pairs, limit=None, kind='auth'):
+        """
+        Fetches the order books of several pairs concurrently
+        :return: one frame of all the books, indexed by (pair, level)
+        """
+        pairs = list(pairs)
+        frames = await asyncio.gather(*[self.get_order_book_frame(limit, kind, pair) for pair in pairs])
+        from pybitx.frames import pairs_frame
+        return pairs_frame(frames, pairs)
+
+    async def get_trades_frames(self, pairs, limit=None, kind='auth', since=None):
+        """
+        Fetches the recent trades of several pairs concurrently
+        :return: one frame of all the trades, indexed by (pair, timestamp)
+        """
+        pairs = list(pairs)
+        frames = await asyncio.gather(*[self.get_trades_frame(limit, kind, since, pair) for pair in pairs])
+        from pybitx.frames import pairs_frame
+        return pairs_frame(frames, pairs)
+
+    async def get_orders(self, state=None, kind='auth', pair=None):
+        """
+        See BitX.get_orders
+        """
+        params = {'pair': pair or self.pair}
+        if state is not None:
+            params['state'] = state
+        return await self.api_request('listorders', params, kind=kind)
+
+    async def get_order(self, order_id):
+        return await self.api_request('orders/%s' % (order_id,), None)
+
+    async def get_orders_frame(self, state=None, kind='auth', pair=None):
+        q = await self.get_orders(state, kind, pair)
+        from pybitx.frames import orders_frame
+        return orders_frame(q, self.decimals)
+
+    async def create_limit_order(self, order_type, volume, price, pair=None):
+        """
+        Create a new limit order, rounded to the tick_size and lot_size options like BitX.create_limit_order
+        :param order_type: 'buy' or 'sell'
+        :param volume: the volume, in BTC
+        :param price: the ZAR price per bitcoin
+        :param pair: the market to trade in, if not the client's pair
+        :return: the order id
+        """
+        data = order_data(pair or self.pair, order_type, volume, price, self.tick_size, self.lot_size)
+        return await self.api_request('postorder', params=data, http_call='post')
+
+    async def stop_order(self, order_id):
+        data = {
+            'order_id': order_id,
+        }
+        return await self.api_request('stoporder', params=data, http_call='post')
+
+    async def stop_all_orders(self):
+        """
+        Stops all pending orders, both sell and buy. The stop requests are issued concurrently.
+        :return: dict of Boolean -- whether request succeeded or not for each order_id that was pending
+        """
+        pending = (await self.get_orders('PENDING'))['orders']
+        ids = [order['order_id'] for order in pending]
+        statuses = await asyncio.gather(*[self.stop_order(order_id) for order_id in ids])
+        return dict((order_id, status['success']) for order_id, status in zip(ids, statuses))
+
+    async def get_funding_address(self, asset):
+        """
+        See BitX.get_funding_address
+        """
+        return await self.api_request('funding_address', {'asset': asset})
+
+    async def get_withdrawals_status(self, wid=None):
+        call = 'withdrawals'
+        if wid is not None:
+            call += '/%s' % (wid,)
+        return await self.api_request(call, None)
+
+    async def get_balance(self):
+        return await self.api_request('balance', None)
+
+    async def get_transactions(self, account_id, min_row=None, max_row=None):
+        params = {}
+        if min_row is not None:
+            params['min_row'] = min_row
+        if max_row is not None:
+            params['max_row'] = max_row
+        return await self.api_request('accounts/%s/transactions' % (account_id,), params)
+
+    async def get_transactions_frame(self, account_id, min_row=None, max_row=None):
+        tx = await self.get_transactions(account_id, min_row, max_row)
+        from pybitx.frames import transactions_frame
+        return transactions_frame(tx, self.decimals)
+
+    async def get_pending_transactions(self, account_id):
+        return await self.api_request('accounts/%s/pending' % (account_id,), None)
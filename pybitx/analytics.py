@@ -0,0 +1,225 @@
+"""
+Vectorised order book analytics: mid, spread, imbalance, depth, and the average and marginal execution prices of
+market orders walking the book.
+
+Every function takes a Book of four float64 arrays whose last axis is the price level, best price first. A single
+snapshot has shape (levels,), and a history of snapshots stacked with stack() has shape (snapshots, levels), so one
+call computes a whole series. Shorter books are padded with NaN prices and zero volumes.
+
+    book = to_book(api.get_order_book_frame())
+    vwap(book, [0.1, 1, 10], side='buy')      # the average price of buying each size
+
+    history = stack([api.get_order_book() for _ in range(100)])
+    imbalance(history, levels=10)             # one value per snapshot
+"""
+from collections import namedtuple
+
+import numpy as np
+import pandas as pd
+
+from pybitx.numeric import from_fixed
+
+
+Book = namedtuple('Book', ['ask_price', 'ask_volume', 'bid_price', 'bid_volume'])
+Book.__doc__ = """
+An order book as float64 arrays of shape (levels,) or (snapshots, levels), best price first
+"""
+
+
+def _pad(values, levels, fill):
+    values = np.asarray(values, dtype=np.float64)[:levels]
+    if len(values) == levels:
+        return values
+    column = np.full(levels, fill, dtype=np.float64)
+    column[:len(values)] = values
+    return column
+
+
+def _sides(book):
+    """
+    :return: ((ask prices, ask volumes), (bid prices, bid volumes)) of a frame, an API response or a LocalOrderBook
+    """
+    if isinstance(book, Book):
+        return (book.ask_price, book.ask_volume), (book.bid_price, book.bid_volume)
+    if isinstance(book, pd.DataFrame):
+        decimals = book.attrs.get('decimals')
+        sides = []
+        for side in ('asks', 'bids'):
+            prices, volumes = book[(side, 'price')].to_numpy(), book[(side, 'volume')].to_numpy()
+            if decimals:
+                # Fixed-point frames pad with 0 rather than NaN
+                empty = volumes == 0
+                prices = from_fixed(prices, decimals['price'])
+                volumes = from_fixed(volumes, decimals['volume'])
+                prices[empty] = np.nan
+            sides.append((prices, volumes))
+        return tuple(sides)
+    if isinstance(book, dict):
+        sides = []
+        for side in ('asks', 'bids'):
+            levels = book[side]
+            n = len(levels)
+            sides.append((np.fromiter((level['price'] for level in levels), np.float64, n),
+                          np.fromiter((level['volume'] for level in levels), np.float64, n)))
+        return tuple(sides)
+    if hasattr(book, 'depth'):
+        return book.depth('asks'), book.depth('bids')
+    raise TypeError('Not an order book: %r' % (type(book),))
+
+
+def to_book(book, levels=None):
+    """
+    :param book: an order_book_frame (float or fixed-point), an `orderbook` API response, a LocalOrderBook or a Book
+    :param levels: keep only this many levels per side, padding shorter sides
+    :return: a Book
+    """
+    (ask_price, ask_volume), (bid_price, bid_volume) = _sides(book)
+    if levels is None:
+        levels = max(len(ask_price), len(bid_price))
+    return Book(_pad(ask_price, levels, np.nan), np.nan_to_num(_pad(ask_volume, levels, 0.0)),
+                _pad(bid_price, levels, np.nan), np.nan_to_num(_pad(bid_volume, levels, 0.0)))
+
+
+def stack(books, levels=None):
+    """
+    :param books: a sequence of snapshots in any form to_book accepts
+    :param levels: the depth to keep; by default, that of the deepest snapshot
+    :return: a Book of (snapshots, levels) arrays
+    """
+    books = [book if isinstance(book, Book) else to_book(book) for book in books]
+    if levels is None:
+        levels = max([len(book.ask_price) for book in books] + [len(book.bid_price) for book in books] + [0])
+    padded = [to_book(book, levels) for book in books]
+    return Book(*[np.stack([getattr(book, field) for book in padded]) if padded else np.empty((0, levels))
+                  for field in Book._fields])
+
+
+def _buying(side):
+    if side in ('buy', 'asks'):
+        return True
+    if side in ('sell', 'bids'):
+        return False
+    raise ValueError('Invalid side: %s' % (side,))
+
+
+def _side(book, side):
+    """
+    :return: the (prices, volumes) a market order on `side` executes against
+    """
+    if _buying(side):
+        return book.ask_price, book.ask_volume
+    return book.bid_price, book.bid_volume
+
+
+def best_bid(book):
+    return book.bid_price[..., 0] if book.bid_price.shape[-1] else np.full(book.bid_price.shape[:-1], np.nan)
+
+
+def best_ask(book):
+    return book.ask_price[..., 0] if book.ask_price.shape[-1] else np.full(book.ask_price.shape[:-1], np.nan)
+
+
+def mid(book):
+    return (best_bid(book) + best_ask(book)) / 2
+
+
+def spread(book):
+    return best_ask(book) - best_bid(book)
+
+
+def imbalance(book, levels=None):
+    """
+    :return: (bid volume - ask volume) / (bid volume + ask volume) over the top `levels` levels, from -1 (all asks) to
+    1 (all bids)
+    """
+    bids = book.bid_volume[..., :levels].sum(axis=-1)
+    asks = book.ask_volume[..., :levels].sum(axis=-1)
+    with np.errstate(invalid='ignore', divide='ignore'):
+        return (bids - asks) / (bids + asks)
+
+
+def cumulative_depth(book, side):
+    """
+    :param side: 'buy' for the asks a buy order walks, or 'sell' for the bids
+    :return: (prices, cumulative volume, cumulative counter amount) arrays, best price first
+    """
+    prices, volumes = _side(book, side)
+    notional = np.where(volumes > 0, prices * volumes, 0.0)
+    return prices, np.cumsum(volumes, axis=-1), np.cumsum(notional, axis=-1)
+
+
+def depth_within(book, fraction):
+    """
+    :param fraction: the distance from the mid price, e.g. 0.01 for 1%
+    :return: (bid volume, ask volume) priced within that distance of the mid
+    """
+    m = np.expand_dims(mid(book), -1)
+    with np.errstate(invalid='ignore'):
+        bids = np.where(book.bid_price >= m * (1 - fraction), book.bid_volume, 0.0).sum(axis=-1)
+        asks = np.where(book.ask_price <= m * (1 + fraction), book.ask_volume, 0.0).sum(axis=-1)
+    return bids, asks
+
+
+def _fill_levels(cum_volume, sizes):
+    """
+    :return: the index of the level at which each size is filled, per snapshot, of shape (..., sizes). A size larger
+    than the side's total volume gets the number of levels
+    """
+    rows = cum_volume.reshape(-1, cum_volume.shape[-1])
+    found = np.empty((len(rows), len(sizes)), dtype=np.intp)
+    for i, row in enumerate(rows):
+        found[i] = np.searchsorted(row, sizes, side='left')
+    return found.reshape(cum_volume.shape[:-1] + (len(sizes),))
+
+
+def _walk(book, sizes, side):
+    prices, cum_volume, cum_notional = cumulative_depth(book, side)
+    sizes = np.atleast_1d(np.asarray(sizes, dtype=np.float64))
+    levels = prices.shape[-1]
+    if levels == 0:
+        missing = np.full(prices.shape[:-1] + (len(sizes),), np.nan)
+        return missing, missing.copy()
+    k = _fill_levels(cum_volume, sizes)
+    unfilled = k >= levels
+    k = np.minimum(k, levels - 1)
+    # With a leading zero, index k of the cumulative sums is the total over the levels before level k
+    zero = np.zeros(prices.shape[:-1] + (1,))
+    volume_before = np.take_along_axis(np.concatenate([zero, cum_volume], axis=-1), k, axis=-1)
+    notional_before = np.take_along_axis(np.concatenate([zero, cum_notional], axis=-1), k, axis=-1)
+    marginal = np.take_along_axis(prices, k, axis=-1)
+    with np.errstate(invalid='ignore', divide='ignore'):
+        average = (notional_before + (sizes - volume_before) * marginal) / sizes
+    average[unfilled] = np.nan
+    marginal[unfilled] = np.nan
+    return average, marginal
+
+
+def vwap(book, sizes, side='buy'):
+    """
+    The volume-weighted average price of a market order of each size, for every snapshot at once
+    :param sizes: order sizes in the base currency
+    :param side: 'buy' (walking the asks) or 'sell' (walking the bids)
+    :return: an array of shape (..., len(sizes)), NaN where a size exceeds the book's depth
+    """
+    return _walk(book, sizes, side)[0]
+
+
+def slippage(book, sizes, side='buy'):
+    """
+    :return: the fraction by which the average price of each size is worse than the best price, of shape
+    (..., len(sizes))
+    """
+    buying = _buying(side)
+    best = np.expand_dims(best_ask(book) if buying else best_bid(book), -1)
+    average = vwap(book, sizes, side)
+    return (average - best) / best if buying else (best - average) / best
+
+
+def impact(book, sizes, side='buy'):
+    """
+    :return: the fraction by which the last price touched by each size lies away from the mid, i.e. where the best
+    price would be after the order, of shape (..., len(sizes))
+    """
+    m = np.expand_dims(mid(book), -1)
+    marginal = _walk(book, sizes, side)[1]
+    return (marginal - m) / m if _buying(side) else (m - marginal) / m
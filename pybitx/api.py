@@ -1,26 +1,124 @@
 import requests
+from requests.adapters import HTTPAdapter
 import logging
-from concurrent.futures import ThreadPoolExecutor
+import random
+import time
+from collections import deque
+from operator import itemgetter
+from decimal import ROUND_DOWN, ROUND_FLOOR, ROUND_CEILING
+from concurrent.futures import ThreadPoolExecutor, FIRST_COMPLETED, wait, as_completed
 from pybitx import __version__
-import pandas as pd
-import json
+from pybitx.ratelimit import RateLimiter
+from pybitx.cache import ResponseCache
+from pybitx.numeric import format_number, to_exact
+from pybitx.decoding import get_decoder, exact_loads
+from pybitx.metrics import Metrics
 
 
 log = logging.getLogger(__name__)
 
 # --------------------------- constants -----------------------
 
+# Seconds for which each public call's response is reused when the 'cache' option is True
+DEFAULT_CACHE_TTLS = {
+    'ticker': 0.5,
+    'tickers': 0.5,
+    'orderbook': 0.5,
+    'trades': 1.0
+}
+
+# Requests per second for each budget when the 'rate_limits' option is True
+DEFAULT_RATE_LIMITS = {
+    'auth_get': 5.0,
+    'auth_post': 5.0,
+    'public_get': 5.0,
+    'public_post': 5.0
+}
+
 class BitXAPIError(ValueError):
     def __init__(self, response):
         self.url = response.url
         self.code = response.status_code
         self.message = response.text
+        self.headers = getattr(response, 'headers', None) or {}
+
+    def retry_after(self):
+        """
+        :return: the seconds the server asked us to wait in a Retry-After header, or None
+        """
+        try:
+            return float(self.headers.get('Retry-After'))
+        except (TypeError, ValueError):
+            return None
 
     def __str__(self):
         return "BitX request %s failed with %d: %s" % (self.url, self.code, self.message)
 
 
+def is_transient(error):
+    """
+    Whether a failed request is worth retrying: rate limiting, server errors and network failures are; anything the
+    exchange rejected outright is not
+    """
+    if isinstance(error, BitXAPIError):
+        return error.code == 429 or error.code >= 500
+    return isinstance(error, (requests.ConnectionError, requests.Timeout))
+
+
+def order_data(pair, order_type, volume, price, tick_size=None, lot_size=None):
+    """
+    :return: the postorder request parameters, with the price and volume formatted exactly
+    """
+    buy = order_type == 'buy'
+    return {
+        'pair': pair,
+        'type': 'BID' if buy else 'ASK',
+        'volume': format_number(volume, lot_size, ROUND_DOWN),
+        'price': format_number(price, tick_size, ROUND_FLOOR if buy else ROUND_CEILING)
+    }
+
+
+def new_session(max_workers):
+    """
+    A Requests session, so that headers and connections are kept across API requests. The connection pool is sized to
+    match the worker pool, so that calls submitted to the executor don't wait on, or throw away, connections
+    :return: (session, adapter)
+    """
+    session = requests.Session()
+    adapter = HTTPAdapter(pool_connections=1, pool_maxsize=max_workers)
+    session.mount('https://', adapter)
+    session.mount('http://', adapter)
+    session.headers.update({
+        'Accept': 'application/json',
+        'Accept-Charset': 'utf-8',
+        'User-Agent': 'py-bitx v' + __version__
+    })
+    return session, adapter
+
+
+def map_concurrently(executor, fn, items, concurrency):
+    """
+    Calls fn on each item on an executor, keeping at most `concurrency` calls in flight
+    :return: the results, in the same order as items
+    """
+    items = list(items)
+    results = [None] * len(items)
+    in_flight = {}
+    for i, item in enumerate(items):
+        in_flight[executor.submit(fn, item)] = i
+        if len(in_flight) < concurrency:
+            continue
+        done, _ = wait(in_flight, return_when=FIRST_COMPLETED)
+        for f in done:
+            results[in_flight.pop(f)] = f.result()
+    for f in as_completed(in_flight):
+        results[in_flight[f]] = f.result()
+    return results
+
+
 class BitX:
+    RATE_BUDGETS = (('auth', 'get'), ('auth', 'post'), ('public', 'get'), ('public', 'post'))
+
     def __init__(self, key, secret, options={}):
         self.options = options
         self.auth = (key, secret)
@@ -29,95 +127,278 @@ class BitX:
         else:
             self.hostname = 'api.mybitx.com'
         self.port = options['port'] if 'port' in options else 443
+        self.scheme = options['scheme'] if 'scheme' in options else 'https'
         self.pair = options['pair'] if 'pair' in options else 'XBTZAR'
         self.ca = options['ca'] if 'ca' in options else None
         self.timeout = options['timeout'] if 'timeout' in options else 30
-        # Use a Requests session so that we can keep headers and connections
-        # across API requests
-        self._requests_session = requests.Session()
-        self._requests_session.headers.update({
-            'Accept': 'application/json',
-            'Accept-Charset': 'utf-8',
-            'User-Agent': 'py-bitx v' + __version__
-        })
-        self._executor = ThreadPoolExecutor(max_workers=5)
+        # Optional pybitx.pool.ClientPool whose connection and worker pools this client shares with others
+        self.pool = options['pool'] if 'pool' in options else None
+        if self.pool is not None:
+            self.max_workers = self.pool.max_workers
+        else:
+            self.max_workers = options['max_workers'] if 'max_workers' in options else 5
+        self.numeric = options['numeric'] if 'numeric' in options else 'float'
+        if self.numeric not in ('float', 'exact'):
+            raise ValueError('Invalid numeric option: %s' % (self.numeric,))
+        # Fixed-point scales of the frame columns in exact mode; None selects float64 columns
+        self.decimals = None
+        if self.numeric == 'exact':
+            self.decimals = {
+                'price': options['price_decimals'] if 'price_decimals' in options else 8,
+                'volume': options['volume_decimals'] if 'volume_decimals' in options else 8
+            }
+        self.tick_size = options['tick_size'] if 'tick_size' in options else None
+        self.lot_size = options['lot_size'] if 'lot_size' in options else None
+        # Decodes response bodies: orjson when it is installed, unless the 'json' option picks another decoder
+        self.loads = get_decoder(options['json'] if 'json' in options else 'auto')
+        # Opt-in response cache for public GET calls: True for the default TTLs, or a dict of {call: TTL in seconds}
+        cache = options['cache'] if 'cache' in options else None
+        self.cache_ttls = DEFAULT_CACHE_TTLS if cache is True else cache
+        cache_size = options['cache_size'] if 'cache_size' in options else 256
+        self._cache = ResponseCache(cache_size) if self.cache_ttls else None
+        # Opt-in client-side rate limits: True for the defaults, or a dict of {'auth_get': requests per second, ...}
+        # with separate budgets for auth/public and get/post calls. Omitted budgets are unlimited. Clients in a pool
+        # share their public budgets, which the exchange counts per address rather than per key
+        rate_limits = options['rate_limits'] if 'rate_limits' in options else None
+        if rate_limits is True:
+            rate_limits = DEFAULT_RATE_LIMITS
+        self._limiters = {}
+        for name, rate in (rate_limits or {}).items():
+            budget = tuple(name.split('_'))
+            if budget not in self.RATE_BUDGETS:
+                raise ValueError('Invalid rate limit: %s' % (name,))
+            if self.pool is not None and budget[0] == 'public':
+                self._limiters[budget] = self.pool.shared_limiter(budget, rate)
+            else:
+                self._limiters[budget] = RateLimiter(rate)
+        self.retries = options['retries'] if 'retries' in options else 0
+        self.backoff = options['backoff'] if 'backoff' in options else 0.25
+        self.max_backoff = options['max_backoff'] if 'max_backoff' in options else 10
+        # Optional stand-in for the network, e.g. a pybitx.replay Recorder or Replayer
+        self.transport = options['transport'] if 'transport' in options else None
+        if self.pool is not None:
+            self._requests_session, self._executor = self.pool.session, self.pool.executor
+        else:
+            self._requests_session, adapter = new_session(self.max_workers)
+            self._executor = ThreadPoolExecutor(max_workers=self.max_workers)
+        # Opt-in request metrics: True for a new Metrics, or a Metrics instance shared with other clients
+        metrics = options['metrics'] if 'metrics' in options else None
+        self.metrics = Metrics() if metrics is True else metrics
+        if self.metrics is not None and self.pool is None:
+            self.metrics.add_connection_source(lambda: self._connection_counts(adapter))
 
     def close(self):
+        if self.pool is not None:
+            # The pool's executor outlives its clients
+            return
         log.info('Asking MultiThreadPool to shutdown')
         self._executor.shutdown(wait=True)
         log.info('MultiThreadPool has shutdown')
 
+    @staticmethod
+    def _connection_counts(adapter):
+        pools = adapter.poolmanager.pools
+        counts = [(pool.num_connections, pool.num_requests) for pool in (pools[key] for key in pools.keys())]
+        return sum(c for c, _ in counts), sum(r for _, r in counts)
+
+    def submit(self, method, *args, **kwargs):
+        """
+        Run an API call on the client's thread pool instead of blocking the caller, e.g.
+            ticker = api.submit(api.get_ticker)
+            book = api.submit('get_order_book', 10)
+        :param method: a BitX method, or its name
+        :return: a concurrent.futures.Future that resolves to the call's result, or raises its BitXAPIError
+        """
+        if not callable(method):
+            method = getattr(self, method)
+        return self._executor.submit(method, *args, **kwargs)
+
     def construct_url(self, call):
         base = self.hostname
         if self.port != 443:
             base += ':%d' % (self.port,)
-        return "https://%s/api/1/%s" % (base, call)
+        return "%s://%s/api/1/%s" % (self.scheme, base, call)
 
-    def api_request(self, call, params, kind='auth', http_call='get'):
+    def api_request(self, call, params, kind='auth', http_call='get', plain=False):
         """
         General API request. Generally, use the convenience functions below
         :param kind: the type of request to make. 'auth' makes an authenticated call; 'basic' is unauthenticated
         :param call: the API call to make
         :param params: a dict of query parameters
+        :param plain: decode the response with the fast decoder only, leaving values as the API sent them even in
+        'exact' numeric mode. This is the path for responses that are parsed straight into frame columns
         :return: a json response, a BitXAPIError is thrown if the api returns with an error
         """
+        if self._cache is not None and http_call == 'get' and call in self.cache_ttls:
+            key = (call, kind, plain, tuple(sorted((params or {}).items())))
+            result = self._cache.get(key, self.cache_ttls[call],
+                                     lambda: self._request(call, params, kind, http_call, plain))
+            # The cached response is shared, so give each caller its own top-level dict to modify
+            return dict(result)
+        return self._request(call, params, kind, http_call, plain)
+
+    def _request(self, call, params, kind, http_call, plain=False):
+        """
+        Makes a request within its rate limit. Rate-limited (HTTP 429) responses slow the limiter down, and transient
+        failures of GET requests, which are safe to repeat, are retried up to the 'retries' option
+        """
+        limiter = self._limiters.get(('auth' if kind == 'auth' else 'public', http_call))
+        attempts = 0
+        while True:
+            if limiter is not None:
+                limiter.acquire()
+            try:
+                result = self._send(call, params, kind, http_call, plain)
+            except (BitXAPIError, requests.ConnectionError, requests.Timeout) as e:
+                if limiter is not None and isinstance(e, BitXAPIError) and e.code == 429:
+                    limiter.slow_down(pause=e.retry_after())
+                if http_call != 'get' or attempts >= self.retries or not is_transient(e):
+                    raise
+            else:
+                if limiter is not None:
+                    limiter.speed_up()
+                return result
+            attempts += 1
+            if self.metrics is not None:
+                self.metrics.record_retry(call)
+            delay = self.backoff_delay(attempts)
+            log.info('Retrying %s in %.3fs after attempt %d failed', call, delay, attempts)
+            time.sleep(delay)
+
+    def backoff_delay(self, attempt):
+        """
+        :return: the delay before a retry -- random, up to a cap that doubles with each attempt (full jitter)
+        """
+        return random.uniform(0, min(self.max_backoff, self.backoff * 2 ** (attempt - 1)))
+
+    def fetch(self, call, params, kind, http_call):
+        """
+        Makes the HTTP request for an API call
+        :return: the requests.Response
+        """
         url = self.construct_url(call)
         auth = self.auth if kind == 'auth' else None
         if http_call == 'get':
-            response = self._requests_session.get(
+            return self._requests_session.get(
                 url, params = params, auth = auth, timeout = self.timeout)
         elif http_call == 'post':
-            response = self._requests_session.post(
+            return self._requests_session.post(
                 url, data = params, auth = auth, timeout = self.timeout)
         else:
             raise ValueError('Invalid http_call parameter')
+
+    def _send(self, call, params, kind, http_call, plain=False):
+        start = time.perf_counter()
+        try:
+            if self.transport is not None:
+                response = self.transport.send(self, call, params, kind, http_call)
+            else:
+                response = self.fetch(call, params, kind, http_call)
+        except requests.RequestException:
+            if self.metrics is not None:
+                self.metrics.record(call, http_call, None, time.perf_counter() - start, error=True)
+            raise
+        received = time.perf_counter()
         try:
-            result = response.json()
+            if self.numeric == 'exact' and not plain:
+                result = to_exact(exact_loads(response.content))
+            else:
+                result = self.loads(response.content)
         except ValueError:
             result = {'error': 'No JSON content returned'}
-        if response.status_code != 200 or 'error' in result:
+        failed = response.status_code != 200 or 'error' in result
+        if self.metrics is not None:
+            end = time.perf_counter()
+            self.metrics.record(call, http_call, response.status_code, end - start,
+                                server=response.elapsed.total_seconds(), decode=end - received,
+                                size=len(response.content), error=failed)
+        if failed:
             raise BitXAPIError(response)
         else:
             return result
 
-    def get_ticker(self, kind='auth'):
-        params = {'pair': self.pair}
+    def _build_frame(self, call, build, data):
+        """
+        Builds a frame from a response with the named pybitx.frames builder, timing it if metrics are enabled. pandas is
+        first imported here, so that clients which never build a frame start without it
+        """
+        from pybitx import frames
+        build = getattr(frames, build)
+        if self.metrics is None:
+            return build(data, self.decimals)
+        start = time.perf_counter()
+        df = build(data, self.decimals)
+        self.metrics.record_frame(call, time.perf_counter() - start)
+        return df
+
+    def get_ticker(self, kind='auth', pair=None):
+        params = {'pair': pair or self.pair}
         return self.api_request('ticker', params, kind=kind)
 
     def get_all_tickers(self, kind='auth'):
         return self.api_request('tickers', None, kind=kind)
 
-    def get_order_book(self, limit=None, kind='auth'):
-        params = {'pair': self.pair}
-        orders = self.api_request('orderbook', params, kind=kind)
+    def get_order_book(self, limit=None, kind='auth', pair=None, plain=False):
+        params = {'pair': pair or self.pair}
+        orders = self.api_request('orderbook', params, kind=kind, plain=plain)
         if limit is not None:
             orders['bids'] = orders['bids'][:limit]
             orders['asks'] = orders['asks'][:limit]
         return orders
 
-    def get_order_book_frame(self, limit=None, kind='auth'):
-        q = self.get_order_book(limit, kind)
-        asks = pd.DataFrame(q['asks'])
-        bids = pd.DataFrame(q['bids'])
-        index = pd.MultiIndex.from_product([('asks', 'bids'),('price', 'volume')])
-        df = pd.DataFrame(pd.concat([asks, bids], axis=1).values, columns=index)
-        return df
+    def get_order_book_frame(self, limit=None, kind='auth', pair=None):
+        q = self.get_order_book(limit, kind, pair, plain=True)
+        return self._build_frame('orderbook', 'order_book_frame', q)
 
-    def get_trades(self, limit=None, kind='auth'):
-        params = {'pair': self.pair}
-        trades = self.api_request('trades', params, kind=kind)
+    def get_trades(self, limit=None, kind='auth', since=None, pair=None, plain=False):
+        """
+        :param since: if given, only trades after this time, in Unix milliseconds, are returned
+        """
+        params = {'pair': pair or self.pair}
+        if since is not None:
+            params['since'] = since
+        trades = self.api_request('trades', params, kind=kind, plain=plain)
         if limit is not None:
             trades['trades'] = trades['trades'][:limit]
         return trades
 
-    def get_trades_frame(self, limit=None, kind='auth'):
-        trades = self.get_trades(limit, kind)
-        df = pd.DataFrame(trades['trades'])
-        df.index = pd.to_datetime(df.timestamp * 1e-3, unit='s')
-        df.drop('timestamp', axis=1, inplace=True)
-        return df
+    def get_trades_frame(self, limit=None, kind='auth', since=None, pair=None):
+        trades = self.get_trades(limit, kind, since, pair, plain=True)
+        return self._build_frame('trades', 'trades_frame', trades)
+
+    def get_tickers(self, pairs, kind='auth', concurrency=None):
+        """
+        Fetches the tickers of several pairs concurrently
+        :return: a dict of {pair: ticker}
+        """
+        pairs = list(pairs)
+        tickers = self._map_concurrently(lambda pair: self.get_ticker(kind, pair), pairs, concurrency)
+        return dict(zip(pairs, tickers))
+
+    def get_order_books_frame(self, pairs, limit=None, kind='auth', concurrency=None):
+        """
+        Fetches the order books of several pairs concurrently, over the client's shared connection pool
+        :param concurrency: the maximum number of requests in flight. Defaults to, and is capped at, max_workers
+        :return: one frame of all the books, indexed by (pair, level)
+        """
+        pairs = list(pairs)
+        frames = self._map_concurrently(lambda pair: self.get_order_book_frame(limit, kind, pair), pairs, concurrency)
+        from pybitx.frames import pairs_frame
+        return pairs_frame(frames, pairs)
 
-    def get_orders(self, state=None, kind='auth'):
+    def get_trades_frames(self, pairs, limit=None, kind='auth', since=None, concurrency=None):
+        """
+        Fetches the recent trades of several pairs concurrently, over the client's shared connection pool
+        :param since: if given, only trades after this time, in Unix milliseconds, are returned
+        :return: one frame of all the trades, indexed by (pair, timestamp)
+        """
+        pairs = list(pairs)
+        frames = self._map_concurrently(lambda pair: self.get_trades_frame(limit, kind, since, pair), pairs,
+                                        concurrency)
+        from pybitx.frames import pairs_frame
+        return pairs_frame(frames, pairs)
+
+    def get_orders(self, state=None, kind='auth', pair=None):
         """
         Returns a list of the most recently placed orders. You can specify an optional state='PENDING' parameter to
         restrict the results to only open orders. You can also specify the market by using the optional pair parameter.
@@ -126,7 +407,7 @@ class BitX:
         :param state: String optional 'COMPLETE', 'PENDING', or None (default)
         :return:
         """
-        params = {'pair': self.pair}
+        params = {'pair': pair or self.pair}
         if state is not None:
             params['state'] = state
         return self.api_request('listorders', params, kind=kind)
@@ -139,28 +420,21 @@ class BitX:
         """
         return self.api_request('orders/%s' % (order_id,), None)
 
-    def get_orders_frame(self, state=None, kind='auth'):
-        q = self.get_orders(state, kind)
-        tj = json.dumps(q['orders'])
-        df = pd.read_json(tj, convert_dates=['creation_timestamp', 'expiration_timestamp'])
-        df.index = df.creation_timestamp
-        return df
+    def get_orders_frame(self, state=None, kind='auth', pair=None):
+        q = self.get_orders(state, kind, pair)
+        return self._build_frame('listorders', 'orders_frame', q)
 
-    def create_limit_order(self, order_type, volume, price):
+    def create_limit_order(self, order_type, volume, price, pair=None):
         """
-        Create a new limit order
+        Create a new limit order. If the tick_size and lot_size options are set, the price is rounded to a whole tick
+        in the order's favour (down for buys, up for sells) and the volume is rounded down to a whole lot.
         :param order_type: 'buy' or 'sell'
         :param volume: the volume, in BTC
         :param price: the ZAR price per bitcoin
+        :param pair: the market to trade in, if not the client's pair
         :return: the order id
         """
-        data = {
-            'pair': self.pair,
-            'type': 'BID' if order_type == 'buy' else 'ASK',
-            'volume': str(volume),
-            'price': str(price)
-
-        }
+        data = order_data(pair or self.pair, order_type, volume, price, self.tick_size, self.lot_size)
         result = self.api_request('postorder', params=data, http_call='post')
         return result
 
@@ -175,19 +449,107 @@ class BitX:
         }
         return self.api_request('stoporder', params=data, http_call='post')
 
-    def stop_all_orders(self):
+    def stop_all_orders(self, parallel=False, **kwargs):
         """
         Stops all pending orders, both sell and buy
-        :return: dict of Boolean -- whether request succeeded or not for each order_id that was pending
+        :param parallel: if True, stop the orders concurrently via stop_orders, which also accepts the keyword args
+        :return: dict of Boolean -- whether request succeeded or not for each order_id that was pending. In parallel
+        mode, the per-order outcome dicts from stop_orders are returned instead
         """
         pending = self.get_orders('PENDING')['orders']
         ids = [order['order_id'] for order in pending]
+        if parallel:
+            return self.stop_orders(ids, **kwargs)
         result = {}
         for order_id in ids:
             status = self.stop_order(order_id)
             result[order_id] = status['success']
         return result
 
+    def stop_orders(self, order_ids, concurrency=None, rate=None, retries=2, backoff=0.1, executor=None):
+        """
+        Stops several orders concurrently on the client's thread pool. Failures don't abort the batch: transient ones
+        (HTTP 429/5xx, connection errors and timeouts) are retried with exponential backoff, and whatever is left is
+        reported against its order.
+        :param order_ids: the order IDs to stop
+        :param concurrency: the maximum number of requests in flight. Defaults to, and unless an executor is given is
+        capped at, max_workers
+        :param rate: the maximum number of requests per second, or None for no limit
+        :param retries: the number of times a transient failure is retried
+        :param backoff: the delay, in seconds, before the first retry. It doubles with each subsequent retry
+        :param executor: run the requests on this executor rather than the client's thread pool, e.g. one kept free
+        for cancelling while the client's workers are busy
+        :return: dict of {'success': Boolean, 'attempts': int, 'error': exception or None} for each order_id
+        """
+        limiter = RateLimiter(rate)
+
+        def stop(order_id):
+            status, attempts, error = self._call_with_retry(self.stop_order, (order_id,), limiter, retries, backoff)
+            if error is not None:
+                log.warning('Could not stop order %s: %s', order_id, error)
+                return {'success': False, 'attempts': attempts, 'error': error}
+            return {'success': status['success'], 'attempts': attempts, 'error': None}
+
+        if executor is None:
+            outcomes = self._map_concurrently(stop, order_ids, concurrency)
+        else:
+            outcomes = map_concurrently(executor, stop, order_ids, concurrency or self.max_workers)
+        return dict(zip(order_ids, outcomes))
+
+    def create_limit_orders(self, orders, concurrency=None, rate=None, retries=2, backoff=0.1):
+        """
+        Places a batch of limit orders concurrently on the client's thread pool, e.g. to lay down a ladder. A failed
+        order doesn't abort the batch. Only rate limiting (HTTP 429) is retried, since after any other failure the
+        order may well have been placed.
+        :param orders: the (order_type, volume, price) of each order, as a list of tuples or dicts, a 2-D NumPy array,
+        or a DataFrame with order_type (or type), volume and price columns
+        :param concurrency: the maximum number of requests in flight. Defaults to, and is capped at, max_workers
+        :param rate: the maximum number of requests per second, or None for no limit
+        :param retries: the number of times a rate-limited request is retried
+        :param backoff: the delay, in seconds, before the first retry. It doubles with each subsequent retry
+        :return: a DataFrame aligned with the input rows, adding order_id (null if the order failed), attempts and
+        error (the exception, or None) columns
+        """
+        from pybitx.frames import orders_table
+        df = orders_table(orders)
+        limiter = RateLimiter(rate)
+
+        def place(order):
+            return self._call_with_retry(self.create_limit_order, order, limiter, retries, backoff,
+                                         retry_on=lambda e: isinstance(e, BitXAPIError) and e.code == 429)
+
+        rows = list(zip(df.order_type, df.volume, df.price))
+        outcomes = self._map_concurrently(place, rows, concurrency)
+        df['order_id'] = [result['order_id'] if result is not None else None for result, _, _ in outcomes]
+        df['attempts'] = [attempts for _, attempts, _ in outcomes]
+        df['error'] = [error for _, _, error in outcomes]
+        return df
+
+    def _map_concurrently(self, fn, items, concurrency=None):
+        """
+        Calls fn on each item on the thread pool, keeping at most `concurrency` calls in flight
+        :return: the results, in the same order as items
+        """
+        concurrency = min(concurrency or self.max_workers, self.max_workers)
+        return map_concurrently(self._executor, fn, items, concurrency)
+
+    def _call_with_retry(self, fn, args, limiter, retries, backoff, retry_on=None):
+        """
+        Calls fn(*args) once the limiter allows it, retrying failures that retry_on (default: is_transient) accepts
+        :return: (result, attempts, error) -- exactly one of result and error is None
+        """
+        retry_on = retry_on or is_transient
+        attempts = 0
+        while True:
+            attempts += 1
+            limiter.acquire()
+            try:
+                return fn(*args), attempts, None
+            except (BitXAPIError, requests.RequestException) as e:
+                if attempts > retries or not retry_on(e):
+                    return None, attempts, e
+            time.sleep(backoff * 2 ** (attempts - 1))
+
 
     def get_funding_address(self, asset):
         """
@@ -213,6 +575,13 @@ class BitX:
     def get_balance(self):
         return self.api_request('balance', None)
 
+    def get_balance_frame(self):
+        """
+        :return: a frame with a row per account
+        """
+        balance = self.api_request('balance', None, plain=True)
+        return self._build_frame('balance', 'balance_frame', balance)
+
     def get_transactions(self, account_id, min_row=None, max_row=None):
         params = {}
         if min_row is not None:
@@ -222,11 +591,56 @@ class BitX:
         return self.api_request('accounts/%s/transactions' % (account_id,), params)
 
     def get_transactions_frame(self, account_id, min_row=None, max_row=None):
-        tx = self.get_transactions(account_id, min_row, max_row)['transactions']
-        df = pd.DataFrame(tx)
-        df.index = pd.to_datetime(df.timestamp, unit='ms')
-        df.drop('timestamp', axis=1, inplace=True)
-        return df
+        tx = self.get_transactions(account_id, min_row, max_row)
+        return self._build_frame('accounts/%s/transactions' % (account_id,), 'transactions_frame', tx)
+
+    def iter_transactions(self, account_id, min_row=1, max_row=None, page_size=1000, prefetch=4):
+        """
+        Lazily walks an account's transaction history, fetching it in pages of row ranges. While one page is being
+        consumed, up to `prefetch` following pages are fetched concurrently on the thread pool, so memory stays bounded
+        by prefetch x page_size rows however long the history. To resume an interrupted walk, pass the last row_index
+        seen plus one as min_row.
+        :param min_row: the first row to return (rows are numbered from 1)
+        :param max_row: the row to stop before, or None to read to the end of the history
+        :param page_size: rows per request. The API returns at most 1000
+        :param prefetch: the number of pages fetched ahead of the consumer
+        :return: a generator of transaction dicts, in row order
+        """
+        for page in self._transaction_pages(account_id, min_row, max_row, page_size, prefetch):
+            for row in page:
+                yield row
+
+    def iter_transactions_frames(self, account_id, min_row=1, max_row=None, page_size=1000, prefetch=4):
+        """
+        Like iter_transactions, but yields one transactions DataFrame per page
+        """
+        for page in self._transaction_pages(account_id, min_row, max_row, page_size, prefetch):
+            yield self._build_frame('accounts/%s/transactions' % (account_id,), 'transactions_frame',
+                                    {'transactions': page})
+
+    def _transaction_pages(self, account_id, min_row, max_row, page_size, prefetch):
+        in_flight = deque()
+        next_row = min_row
+        try:
+            while True:
+                while len(in_flight) < max(1, prefetch) and (max_row is None or next_row < max_row):
+                    end = next_row + page_size if max_row is None else min(next_row + page_size, max_row)
+                    f = self._executor.submit(self.get_transactions, account_id, next_row, end)
+                    in_flight.append((next_row, end, f))
+                    next_row = end
+                if not in_flight:
+                    return
+                start, end, f = in_flight.popleft()
+                rows = f.result()['transactions'] or []
+                rows.sort(key=itemgetter('row_index'))
+                if rows:
+                    yield rows
+                if len(rows) < end - start:
+                    # A short page is the end of the history; anything after it is empty
+                    return
+        finally:
+            for _, _, f in in_flight:
+                f.cancel()
 
     def get_pending_transactions(self, account_id):
         return self.api_request('accounts/%s/pending' % (account_id,), None)
@@ -0,0 +1,242 @@
+"""
+OHLCV candles built incrementally from trades.
+
+A CandleEngine keeps the most recent bars of several intervals in fixed-size ring buffers. Each batch of new trades is
+aggregated in vectorised passes: the shortest interval is built from the trades, and each longer interval that is a
+multiple of a shorter one is built from that interval's bars rather than from the trades again. The resulting bars are
+merged into the open bar of each ring, so earlier bars are never recomputed.
+
+Bars are only created for intervals that contain trades, as on the exchange's own charts.
+"""
+import numpy as np
+import pandas as pd
+
+from pybitx.numeric import from_fixed
+
+
+FIELDS = ('open', 'high', 'low', 'close', 'volume', 'trades')
+
+_UNITS = {'s': 1, 'm': 60, 'h': 3600, 'd': 86400}
+
+
+def interval_seconds(interval):
+    """
+    :param interval: seconds, or a string such as '30s', '5m', '1h' or '1d'
+    """
+    if isinstance(interval, str):
+        return int(interval[:-1]) * _UNITS[interval[-1]]
+    return int(interval)
+
+
+def _aggregate(starts, bars, interval):
+    """
+    Combines consecutive bars (or trades, as one-trade bars) into bars of `interval` milliseconds
+    :param starts: int64 millisecond timestamps, non-decreasing
+    :param bars: a dict of the FIELDS arrays aligned with starts
+    :return: (bar starts, dict of FIELDS arrays)
+    """
+    keys = starts - starts % interval
+    boundaries = np.flatnonzero(np.diff(keys)) + 1
+    first = np.concatenate(([0], boundaries))
+    last = np.concatenate((boundaries - 1, [len(keys) - 1]))
+    return keys[first], {
+        'open': bars['open'][first],
+        'high': np.maximum.reduceat(bars['high'], first),
+        'low': np.minimum.reduceat(bars['low'], first),
+        'close': bars['close'][last],
+        'volume': np.add.reduceat(bars['volume'], first),
+        'trades': np.add.reduceat(bars['trades'], first)
+    }
+
+
+class CandleRing:
+    """
+    The last `capacity` bars of one interval, oldest overwritten first. The newest bar is the open one
+    """
+    def __init__(self, interval, capacity):
+        self.interval = interval
+        self.capacity = capacity
+        self.start = np.zeros(capacity, dtype=np.int64)
+        self.columns = dict((field, np.zeros(capacity, dtype=np.int64 if field == 'trades' else np.float64))
+                            for field in FIELDS)
+        self.size = 0
+        self._end = 0
+
+    def __len__(self):
+        return self.size
+
+    def _last(self):
+        return (self._end - 1) % self.capacity
+
+    def merge(self, starts, bars):
+        """
+        Adds bars that start no earlier than the open bar, merging the first into it if they share a start
+        """
+        if self.size and len(starts) and starts[0] == self.start[self._last()]:
+            i = self._last()
+            columns = self.columns
+            columns['high'][i] = max(columns['high'][i], bars['high'][0])
+            columns['low'][i] = min(columns['low'][i], bars['low'][0])
+            columns['close'][i] = bars['close'][0]
+            columns['volume'][i] += bars['volume'][0]
+            columns['trades'][i] += bars['trades'][0]
+            starts = starts[1:]
+            bars = dict((field, values[1:]) for field, values in bars.items())
+        n = len(starts)
+        if n == 0:
+            return
+        if n > self.capacity:
+            starts = starts[-self.capacity:]
+            bars = dict((field, values[-self.capacity:]) for field, values in bars.items())
+            n = self.capacity
+        slots = (self._end + np.arange(n)) % self.capacity
+        self.start[slots] = starts
+        for field in FIELDS:
+            self.columns[field][slots] = bars[field]
+        self._end = (self._end + n) % self.capacity
+        self.size = min(self.capacity, self.size + n)
+
+    def order(self):
+        """
+        :return: the slots holding bars, oldest first
+        """
+        return (self._end - self.size + np.arange(self.size)) % self.capacity
+
+
+class CandleEngine:
+    """
+    Builds OHLCV bars at several intervals from a stream of trades.
+
+        engine = CandleEngine(['1m', '5m', '1h'], capacity=1440)
+        engine.sync(api)              # fetch and add the trades since the last one seen
+        engine.candles('5m')          # a DataFrame of the last 1440 five-minute bars
+    """
+    def __init__(self, intervals=('1m', '5m', '15m', '1h'), capacity=1000):
+        """
+        :param intervals: bar lengths, in seconds or as strings such as '5m'
+        :param capacity: the number of bars kept per interval
+        """
+        seconds = sorted(set(interval_seconds(interval) for interval in intervals))
+        self.rings = dict((s, CandleRing(s * 1000, capacity)) for s in seconds)
+        self.last_timestamp = None
+        self.late = 0
+        # {(price, volume): count} of the trades added at last_timestamp, to recognise them when fetched again
+        self._at_last = {}
+
+    def add(self, timestamps, prices, volumes):
+        """
+        Adds trades. Trades older than the newest trade already added cannot be merged into closed bars, so they are
+        dropped and counted in `late`
+        :param timestamps: epoch milliseconds
+        :return: the number of trades added
+        """
+        timestamps = np.asarray(timestamps, dtype=np.int64)
+        prices = np.asarray(prices, dtype=np.float64)
+        volumes = np.asarray(volumes, dtype=np.float64)
+        if len(timestamps) > 1 and (np.diff(timestamps) < 0).any():
+            order = np.argsort(timestamps, kind='stable')
+            timestamps, prices, volumes = timestamps[order], prices[order], volumes[order]
+        if self.last_timestamp is not None:
+            keep = timestamps >= self.last_timestamp
+            self.late += int(len(keep) - keep.sum())
+            timestamps, prices, volumes = timestamps[keep], prices[keep], volumes[keep]
+        if len(timestamps) == 0:
+            return 0
+        trades = {'open': prices, 'high': prices, 'low': prices, 'close': prices, 'volume': volumes,
+                  'trades': np.ones(len(prices), dtype=np.int64)}
+        built = []
+        for seconds, ring in sorted(self.rings.items()):
+            # Build from the longest shorter interval that divides this one, or else from the trades
+            source = next(((starts, bars) for interval, starts, bars in reversed(built)
+                           if ring.interval % interval == 0), (timestamps, trades))
+            starts, bars = _aggregate(source[0], source[1], ring.interval)
+            ring.merge(starts, bars)
+            built.append((ring.interval, starts, bars))
+        last = int(timestamps[-1])
+        if last != self.last_timestamp:
+            self._at_last = {}
+        at_last = timestamps == last
+        for key in zip(prices[at_last].tolist(), volumes[at_last].tolist()):
+            self._at_last[key] = self._at_last.get(key, 0) + 1
+        self.last_timestamp = last
+        return len(timestamps)
+
+    def update(self, trades):
+        """
+        Adds the trades of a get_trades response or a trades frame (float or fixed-point)
+        :return: the number of trades added
+        """
+        if isinstance(trades, pd.DataFrame):
+            timestamps = np.asarray(trades.index.values, dtype='datetime64[ms]').view(np.int64)
+            prices, volumes = trades['price'].to_numpy(), trades['volume'].to_numpy()
+            decimals = trades.attrs.get('decimals')
+            if decimals:
+                prices = from_fixed(prices, decimals['price'])
+                volumes = from_fixed(volumes, decimals['volume'])
+            return self.add(timestamps, prices, volumes)
+        rows = trades['trades']
+        n = len(rows)
+        return self.add(np.fromiter((row['timestamp'] for row in rows), np.int64, n),
+                        np.fromiter((row['price'] for row in rows), np.float64, n),
+                        np.fromiter((row['volume'] for row in rows), np.float64, n))
+
+    def _unseen(self, rows):
+        """
+        :return: the trades not yet added: those after last_timestamp, and those at it beyond the ones already added
+        """
+        if self.last_timestamp is None:
+            return rows
+        seen = dict(self._at_last)
+        unseen = []
+        for row in rows:
+            if row['timestamp'] == self.last_timestamp:
+                key = (float(row['price']), float(row['volume']))
+                if seen.get(key):
+                    seen[key] -= 1
+                    continue
+            if row['timestamp'] >= self.last_timestamp:
+                unseen.append(row)
+        return unseen
+
+    def sync(self, api, pair=None, max_requests=100):
+        """
+        Fetches the trades since the newest one added, with a BitX client, and adds them. Each call returns a limited
+        number of trades, so this keeps asking from the newest trade added until no new trades come back
+        :param max_requests: the most calls to make
+        :return: the number of trades added
+        """
+        added = 0
+        for _ in range(max_requests):
+            trades = api.get_trades(since=self.last_timestamp, pair=pair, plain=True)
+            rows = self._unseen(trades['trades'])
+            if not rows:
+                break
+            added += self.update({'trades': rows})
+        return added
+
+    def _ring(self, interval):
+        seconds = interval_seconds(interval)
+        if seconds not in self.rings:
+            raise ValueError('No candles for interval %s' % (interval,))
+        return self.rings[seconds]
+
+    def candles(self, interval):
+        """
+        :return: a DataFrame of the bars held for an interval, indexed by bar start time, oldest first
+        """
+        ring = self._ring(interval)
+        order = ring.order()
+        index = pd.DatetimeIndex(ring.start[order].view('datetime64[ms]'), name='timestamp')
+        return pd.DataFrame(dict((field, ring.columns[field][order]) for field in FIELDS), index=index)
+
+    def current(self, interval):
+        """
+        :return: the open bar of an interval as a dict, or None if there have been no trades
+        """
+        ring = self._ring(interval)
+        if not ring.size:
+            return None
+        i = ring.order()[-1]
+        bar = dict((field, ring.columns[field][i].item()) for field in FIELDS)
+        bar['timestamp'] = ring.start[i].item()
+        return bar
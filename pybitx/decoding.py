@@ -0,0 +1,44 @@
+"""
+JSON decoders for API response bodies.
+
+Responses are decoded straight from the bytes on the wire. The decoder is pluggable: by default orjson is used when it
+is installed, since it decodes large order books and trade lists several times faster than the json module, and the
+standard library is used otherwise. Any function that takes bytes and returns the decoded object will do.
+"""
+import json
+from decimal import Decimal
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+
+def json_loads(content):
+    return json.loads(content)
+
+
+def exact_loads(content):
+    """
+    Decodes JSON numbers with a fractional part as Decimal, for the 'exact' numeric mode
+    """
+    return json.loads(content, parse_float=Decimal)
+
+
+def get_decoder(name='auto'):
+    """
+    :param name: 'auto' for orjson if it is installed and the json module otherwise, 'json', 'orjson', or a function
+    that decodes bytes
+    :return: a function that decodes a response body
+    """
+    if callable(name):
+        return name
+    if name == 'auto':
+        return orjson.loads if orjson is not None else json_loads
+    if name == 'json':
+        return json_loads
+    if name == 'orjson':
+        if orjson is None:
+            raise ValueError('The orjson decoder needs the orjson package: pip install orjson')
+        return orjson.loads
+    raise ValueError('Invalid json option: %s' % (name,))
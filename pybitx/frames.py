@@ -0,0 +1,181 @@
+"""
+DataFrame builders for API responses, shared by the blocking and asyncio clients.
+
+Each column is parsed straight from the list of JSON records into a single typed NumPy array -- float64 for prices,
+volumes and balances, int64 for counters and datetime64[ms] for timestamps -- and handed to pandas without a copy.
+
+Builders take an optional `decimals` dict of {'price': d, 'volume': d}. When it is given (the client's 'exact' numeric
+mode), monetary columns are int64 fixed-point counts of 10**-d units instead of float64, and the frame's
+attrs['decimals'] records the scale of each such column. Missing values are 0 rather than NaN in these columns.
+"""
+from operator import itemgetter
+
+import numpy as np
+import pandas as pd
+
+from pybitx.numeric import PRICE_KEYS, fixed_column
+
+
+TRADE_FLOATS = ('price', 'volume', 'base', 'counter')
+ORDER_FLOATS = ('base', 'counter', 'fee_base', 'fee_counter', 'limit_price', 'limit_volume')
+ORDER_TIMESTAMPS = ('creation_timestamp', 'expiration_timestamp', 'completed_timestamp')
+TRANSACTION_FLOATS = ('balance', 'available', 'balance_delta', 'available_delta')
+TRANSACTION_INTS = ('row_index',)
+BALANCE_FLOATS = ('balance', 'reserved', 'unconfirmed')
+
+# The int64 value of NaT, for timestamps missing from some records
+_NAT = np.iinfo(np.int64).min
+
+
+def _column(rows, key, dtype, homogeneous, missing):
+    """
+    Parses one key of every record into an array of dtype. NumPy converts numeric strings itself, so the fast path
+    runs entirely in C; records lacking the key, or holding null, take the slower path that substitutes `missing`
+    """
+    n = len(rows)
+    if homogeneous:
+        try:
+            return np.fromiter(map(itemgetter(key), rows), dtype, n)
+        except (TypeError, ValueError):
+            pass
+    values = (row.get(key) for row in rows)
+    return np.fromiter((v if v is not None else missing for v in values), dtype, n)
+
+
+def _fixed_decimals(keys, decimals):
+    """
+    :return: the fixed-point decimals of each monetary key, or an empty dict in float mode
+    """
+    if decimals is None:
+        return {}
+    return dict((key, decimals['price'] if key in PRICE_KEYS else decimals['volume']) for key in keys)
+
+
+def records_frame(rows, floats=(), ints=(), timestamps=(), index=None, fixed=None):
+    """
+    Builds a DataFrame from a list of JSON records with one allocation per column
+    :param floats: keys parsed into float64 columns (values may be numbers or numeric strings)
+    :param fixed: {key: decimals} for keys parsed into int64 fixed-point columns instead
+    :param ints: keys parsed into int64 columns
+    :param timestamps: keys holding epoch milliseconds, parsed into datetime64[ms] columns
+    :param index: a timestamp key to index the frame by. The column is dropped, but the index keeps its name
+    """
+    if rows:
+        first = rows[0].keys()
+        keys = list(first)
+        # Rows of the same length can still hold different keys, which itemgetter would fail on
+        homogeneous = all(row.keys() == first for row in rows)
+        if not homogeneous:
+            keys = list(dict.fromkeys(k for row in rows for k in row))
+    else:
+        keys, homogeneous = list(floats) + list(ints) + list(timestamps), True
+    fixed = fixed or {}
+    columns = {}
+    for key in keys:
+        if key in fixed:
+            get = itemgetter(key) if homogeneous else lambda row: row.get(key) or 0
+            columns[key] = fixed_column(map(get, rows), fixed[key], len(rows))
+        elif key in floats:
+            columns[key] = _column(rows, key, np.float64, homogeneous, np.nan)
+        elif key in ints:
+            columns[key] = _column(rows, key, np.int64, homogeneous, 0)
+        elif key in timestamps:
+            columns[key] = _column(rows, key, np.int64, homogeneous, _NAT).view('datetime64[ms]')
+        elif homogeneous:
+            columns[key] = list(map(itemgetter(key), rows))
+        else:
+            columns[key] = [row.get(key) for row in rows]
+    if index is None:
+        df = pd.DataFrame(columns, copy=False)
+    else:
+        stamps = columns.pop(index) if index in columns else np.empty(0, dtype='datetime64[ms]')
+        df = pd.DataFrame(columns, index=pd.DatetimeIndex(stamps, name=index), copy=False)
+    if fixed:
+        df.attrs['decimals'] = dict((key, d) for key, d in fixed.items() if key in df.columns)
+    return df
+
+
+def _levels(levels, key, n, decimals=None):
+    m = len(levels)
+    if decimals is None:
+        values = np.fromiter(map(itemgetter(key), levels), np.float64, m)
+    else:
+        values = fixed_column(map(itemgetter(key), levels), decimals, m)
+    if m == n:
+        return values
+    column = np.empty(n, dtype=values.dtype)
+    column[:m] = values
+    column[m:] = np.nan if decimals is None else 0
+    return column
+
+
+def order_book_frame(q, decimals=None):
+    """
+    :return: a frame with (asks|bids, price|volume) float64 columns, best price first. The shorter side is padded with
+    NaN (or 0 in fixed-point frames)
+    """
+    n = max(len(q['asks']), len(q['bids']))
+    fixed = _fixed_decimals(('price', 'volume'), decimals)
+    columns = {}
+    for side in ('asks', 'bids'):
+        for key in ('price', 'volume'):
+            columns[(side, key)] = _levels(q[side], key, n, fixed.get(key))
+    df = pd.DataFrame(columns, copy=False)
+    if fixed:
+        df.attrs['decimals'] = fixed
+    return df
+
+
+def trades_frame(trades, decimals=None):
+    return records_frame(trades['trades'], floats=TRADE_FLOATS, timestamps=('timestamp',), index='timestamp',
+                         fixed=_fixed_decimals(TRADE_FLOATS, decimals))
+
+
+def orders_frame(q, decimals=None):
+    df = records_frame(q['orders'] or [], floats=ORDER_FLOATS, timestamps=ORDER_TIMESTAMPS,
+                       fixed=_fixed_decimals(ORDER_FLOATS, decimals))
+    df.index = df.creation_timestamp
+    return df
+
+
+def transactions_frame(tx, decimals=None):
+    return records_frame(tx['transactions'], floats=TRANSACTION_FLOATS, ints=TRANSACTION_INTS,
+                         timestamps=('timestamp',), index='timestamp',
+                         fixed=_fixed_decimals(TRANSACTION_FLOATS, decimals))
+
+
+def balance_frame(balance, decimals=None):
+    return records_frame(balance['balance'], floats=BALANCE_FLOATS, fixed=_fixed_decimals(BALANCE_FLOATS, decimals))
+
+
+def pairs_frame(frames, pairs, name='pair'):
+    """
+    Stacks frames fetched for several currency pairs (or accounts, etc.) into one, with the pair as the outer level of
+    the index
+    """
+    df = pd.concat(frames, keys=pairs, names=[name])
+    decimals = frames[0].attrs.get('decimals') if frames else None
+    if decimals:
+        df.attrs['decimals'] = decimals
+    return df
+
+
+def orders_table(orders):
+    """
+    Normalises a batch of orders into a DataFrame with order_type, volume and price columns
+    :param orders: a list of (order_type, volume, price) tuples or of dicts, a 2-D NumPy array, or a DataFrame
+    """
+    columns = ['order_type', 'volume', 'price']
+    if isinstance(orders, pd.DataFrame):
+        df = orders.rename(columns={'type': 'order_type'})
+    elif isinstance(orders, np.ndarray) and orders.dtype.names is None:
+        df = pd.DataFrame(orders, columns=columns)
+    else:
+        df = pd.DataFrame(list(orders) if not isinstance(orders, np.ndarray) else orders)
+        if list(df.columns) == list(range(len(columns))):
+            df.columns = columns
+        df = df.rename(columns={'type': 'order_type'})
+    missing = set(columns) - set(df.columns)
+    if missing:
+        raise ValueError('Orders are missing %s' % (', '.join(sorted(missing)),))
+    return df[columns].copy()
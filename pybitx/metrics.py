@@ -0,0 +1,196 @@
+"""
+In-process request metrics for BitX clients.
+
+Every request records its latency, broken down into time to the response headers (connecting, if needed, plus server
+time), time to the full body and JSON decode time, along with the bytes received and whether it failed; the *_frame
+methods add the time spent building the frame. Latencies go into fixed, log-spaced histogram buckets, so recording is a
+few dictionary and list operations under a lock, cheap enough to leave on in production.
+
+Hooks receive a RequestEvent for every request, for exporting to other monitoring systems.
+"""
+import logging
+import threading
+from bisect import bisect_left
+from collections import namedtuple
+
+
+log = logging.getLogger(__name__)
+
+RequestEvent = namedtuple('RequestEvent', ['endpoint', 'http_call', 'status', 'elapsed', 'server', 'decode', 'size',
+                                           'error'])
+RequestEvent.__doc__ = """
+One completed request. Times are in seconds, and server and decode are None if the request failed before a response
+arrived. status is the HTTP status code, or None after a connection error; error is True for any failed request
+"""
+
+# Upper bounds of the latency buckets, in seconds: 100us doubling up to about 105s
+BUCKETS = tuple(0.0001 * 2 ** i for i in range(21))
+
+
+def endpoint_name(call):
+    """
+    :return: the call with its identifiers masked, e.g. 'accounts/:id/transactions', so that metrics group by endpoint
+    """
+    if '/' not in call:
+        return call
+    return '/'.join(':id' if any(c.isdigit() for c in part) else part for part in call.split('/'))
+
+
+class Histogram:
+    """
+    A latency histogram over BUCKETS. Percentiles are estimated as the upper bound of the bucket they fall in
+    """
+    def __init__(self):
+        self.counts = [0] * (len(BUCKETS) + 1)
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+
+    def add(self, value):
+        self.counts[bisect_left(BUCKETS, value)] += 1
+        self.count += 1
+        self.total += value
+        if value > self.max:
+            self.max = value
+
+    def percentile(self, q):
+        """
+        :param q: a percentile between 0 and 100
+        """
+        if self.count == 0:
+            return None
+        rank = q / 100.0 * self.count
+        seen = 0
+        for i, n in enumerate(self.counts):
+            seen += n
+            if seen >= rank and n:
+                return min(BUCKETS[i], self.max) if i < len(BUCKETS) else self.max
+        return self.max
+
+    def summary(self):
+        if self.count == 0:
+            return {'count': 0}
+        return {
+            'count': self.count,
+            'mean': self.total / self.count,
+            'p50': self.percentile(50),
+            'p90': self.percentile(90),
+            'p99': self.percentile(99),
+            'max': self.max
+        }
+
+
+class EndpointStats:
+    PHASES = ('elapsed', 'server', 'decode', 'frame')
+
+    def __init__(self):
+        self.requests = 0
+        self.errors = 0
+        self.retries = 0
+        self.bytes = 0
+        self.latency = dict((phase, Histogram()) for phase in self.PHASES)
+
+    def summary(self):
+        result = {'requests': self.requests, 'errors': self.errors, 'retries': self.retries, 'bytes': self.bytes}
+        for phase in self.PHASES:
+            if self.latency[phase].count:
+                result[phase] = self.latency[phase].summary()
+        return result
+
+
+class Metrics:
+    """
+    Collects request metrics for one or more BitX clients (pass the same instance in each client's 'metrics' option
+    to aggregate them).
+
+        api = BitX(key, secret, {'metrics': True})
+        api.metrics.add_hook(lambda event: statsd.timing(event.endpoint, event.elapsed * 1000))
+        ...
+        api.metrics.summary()
+    """
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._endpoints = {}
+        self._hooks = []
+        self._connection_sources = []
+
+    def add_hook(self, hook):
+        """
+        :param hook: a function called with a RequestEvent after every request, on the requesting thread. Exceptions it
+        raises are logged and otherwise ignored
+        """
+        self._hooks.append(hook)
+
+    def remove_hook(self, hook):
+        self._hooks.remove(hook)
+
+    def add_connection_source(self, source):
+        """
+        :param source: a function returning (connections opened, requests made) for a connection pool, so that the
+        summary can report how often connections are reused
+        """
+        self._connection_sources.append(source)
+
+    def _stats(self, endpoint):
+        stats = self._endpoints.get(endpoint)
+        if stats is None:
+            stats = self._endpoints[endpoint] = EndpointStats()
+        return stats
+
+    def record(self, call, http_call, status, elapsed, server=None, decode=None, size=0, error=False):
+        """
+        Records a completed request
+        """
+        endpoint = endpoint_name(call)
+        with self._lock:
+            stats = self._stats(endpoint)
+            stats.requests += 1
+            stats.bytes += size
+            if error:
+                stats.errors += 1
+            stats.latency['elapsed'].add(elapsed)
+            if server is not None:
+                stats.latency['server'].add(server)
+            if decode is not None:
+                stats.latency['decode'].add(decode)
+        if self._hooks:
+            event = RequestEvent(endpoint, http_call, status, elapsed, server, decode, size, error)
+            for hook in self._hooks:
+                try:
+                    hook(event)
+                except Exception:
+                    log.exception('Metrics hook %r failed', hook)
+
+    def record_retry(self, call):
+        with self._lock:
+            self._stats(endpoint_name(call)).retries += 1
+
+    def record_frame(self, call, elapsed):
+        with self._lock:
+            self._stats(endpoint_name(call)).latency['frame'].add(elapsed)
+
+    def connections(self):
+        """
+        :return: a dict of the connections opened, the requests made over them and the fraction of requests that
+        reused an open connection
+        """
+        opened = made = 0
+        for source in self._connection_sources:
+            o, m = source()
+            opened += o
+            made += m
+        return {'opened': opened, 'requests': made, 'reuse_rate': 1 - float(opened) / made if made else None}
+
+    def summary(self):
+        """
+        :return: a dict of {endpoint: {requests, errors, retries, bytes, and a latency summary of each phase}}, plus
+        a 'connections' entry with the connection reuse statistics
+        """
+        with self._lock:
+            result = dict((endpoint, stats.summary()) for endpoint, stats in self._endpoints.items())
+        result['connections'] = self.connections()
+        return result
+
+    def reset(self):
+        with self._lock:
+            self._endpoints.clear()
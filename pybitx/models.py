@@ -0,0 +1,186 @@
+"""
+Compact model objects for API responses.
+
+A decoded response holds each record as a dict of strings, which costs several hundred bytes per trade or order. The
+models here keep each record in `__slots__` instead: monetary fields are parsed once into floats (or Decimals, in exact
+mode), timestamps are ints, and repeated strings such as pairs and order states are interned, so that long-running
+processes can hold large histories. Keys that a model doesn't know are kept in its `extra` dict.
+
+The parse_* functions return a ModelList, which builds each model from its raw record when it is first accessed and
+then drops the record.
+
+    trades = parse_trades(api.get_trades(plain=True))
+    trades[0].price        # 4901.25
+"""
+import sys
+from collections.abc import Sequence
+
+from pybitx.numeric import MONETARY_KEYS, to_decimal
+
+
+# Fields whose values repeat across records, and so are interned
+INTERNED_KEYS = frozenset(['pair', 'type', 'state', 'currency', 'asset'])
+
+
+def _compile_parser(fields):
+    """
+    Generates a function that fills a model's slots from a record, with one straight-line statement per field, as
+    namedtuple and dataclasses do: a loop of getattr and setattr calls takes several times as long
+    :return: parse(obj, row, number) -> obj, where number parses a monetary value
+    """
+    lines = ['def parse(obj, row, number):', '    get = row.get']
+    for field in fields:
+        if field in MONETARY_KEYS:
+            lines.append('    v = get(%r)' % (field,))
+            lines.append('    obj.%s = None if v is None else number(v)' % (field,))
+        elif field in INTERNED_KEYS:
+            lines.append('    v = get(%r)' % (field,))
+            lines.append('    obj.%s = intern(v) if v.__class__ is str else v' % (field,))
+        else:
+            lines.append('    obj.%s = get(%r)' % (field, field))
+    lines.append('    obj.extra = None')
+    lines.append('    return obj')
+    namespace = {'intern': sys.intern}
+    exec('\n'.join(lines), namespace)
+    return namespace['parse']
+
+
+class Model:
+    """
+    A record of an API response, with one slot per field. Missing fields are None
+    """
+    __slots__ = ('extra',)
+    FIELDS = ()
+
+    def __init_subclass__(cls, **kwargs):
+        super().__init_subclass__(**kwargs)
+        cls._known = frozenset(cls.FIELDS)
+        cls._parse = _compile_parser(cls.FIELDS)
+
+    def __init__(self, *args, **kwargs):
+        for field, value in zip(self.FIELDS, args):
+            setattr(self, field, value)
+        for field in self.FIELDS[len(args):]:
+            setattr(self, field, kwargs.pop(field, None))
+        self.extra = kwargs or None
+
+    @classmethod
+    def from_dict(cls, row, exact=False):
+        """
+        :param row: a record of a decoded response
+        :param exact: parse monetary fields to Decimal rather than float
+        """
+        obj = cls._parse(cls.__new__(cls), row, to_decimal if exact else float)
+        if not cls._known.issuperset(row):
+            obj.extra = dict((key, value) for key, value in row.items() if key not in cls._known) or None
+        return obj
+
+    def to_dict(self):
+        d = dict((field, getattr(self, field)) for field in self.FIELDS)
+        if self.extra:
+            d.update(self.extra)
+        return d
+
+    def __eq__(self, other):
+        return type(self) is type(other) and self.to_dict() == other.to_dict()
+
+    def __repr__(self):
+        return '%s(%s)' % (type(self).__name__,
+                           ', '.join('%s=%r' % (field, getattr(self, field)) for field in self.FIELDS))
+
+
+class Ticker(Model):
+    FIELDS = ('pair', 'timestamp', 'bid', 'ask', 'last_trade', 'rolling_24_hour_volume')
+    __slots__ = FIELDS
+
+
+class OrderBookLevel(Model):
+    FIELDS = ('price', 'volume')
+    __slots__ = FIELDS
+
+
+class Trade(Model):
+    FIELDS = ('timestamp', 'price', 'volume', 'is_buy')
+    __slots__ = FIELDS
+
+
+class Order(Model):
+    FIELDS = ('order_id', 'pair', 'type', 'state', 'limit_price', 'limit_volume', 'base', 'counter', 'fee_base',
+              'fee_counter', 'creation_timestamp', 'expiration_timestamp', 'completed_timestamp')
+    __slots__ = FIELDS
+
+
+class Transaction(Model):
+    FIELDS = ('row_index', 'timestamp', 'balance', 'available', 'balance_delta', 'available_delta', 'currency',
+              'description')
+    __slots__ = FIELDS
+
+
+class ModelList(Sequence):
+    """
+    A list of models built lazily from raw records: each record is converted the first time it is accessed, and the
+    model replaces it
+    """
+    __slots__ = ('model', 'exact', '_items')
+
+    def __init__(self, model, rows, exact=False):
+        self.model = model
+        self.exact = exact
+        self._items = list(rows)
+
+    def __len__(self):
+        return len(self._items)
+
+    def _get(self, i):
+        item = self._items[i]
+        if isinstance(item, dict):
+            item = self._items[i] = self.model.from_dict(item, self.exact)
+        return item
+
+    def __getitem__(self, i):
+        if isinstance(i, slice):
+            return [self._get(j) for j in range(*i.indices(len(self._items)))]
+        return self._get(i)
+
+    def __iter__(self):
+        for i in range(len(self._items)):
+            yield self._get(i)
+
+    def materialize(self):
+        """
+        Converts every remaining record, e.g. before the raw response is released
+        :return: self
+        """
+        for i in range(len(self._items)):
+            self._get(i)
+        return self
+
+    def __repr__(self):
+        return 'ModelList(%s, %d items)' % (self.model.__name__, len(self._items))
+
+
+def parse_ticker(response, exact=False):
+    return Ticker.from_dict(response, exact)
+
+
+def parse_tickers(response, exact=False):
+    return ModelList(Ticker, response['tickers'], exact)
+
+
+def parse_order_book(response, exact=False):
+    """
+    :return: (bids, asks) ModelLists of OrderBookLevels, best price first
+    """
+    return ModelList(OrderBookLevel, response['bids'], exact), ModelList(OrderBookLevel, response['asks'], exact)
+
+
+def parse_trades(response, exact=False):
+    return ModelList(Trade, response['trades'], exact)
+
+
+def parse_orders(response, exact=False):
+    return ModelList(Order, response['orders'] or [], exact)
+
+
+def parse_transactions(response, exact=False):
+    return ModelList(Transaction, response['transactions'], exact)
@@ -0,0 +1,199 @@
+from bisect import bisect_left
+
+import numpy as np
+
+
+BIDS = 'bids'
+ASKS = 'asks'
+
+
+class BookSide:
+    """
+    One side of a price-aggregated order book. Prices are kept in a sorted list, so finding a level is a binary search
+    and the best price is always at one end of it; volumes are held in a dict keyed by price.
+
+    Changing the volume at an existing level only touches the dict. Adding or removing a level also shifts the list
+    behind it, which is O(n) in the number of levels. The shift is a single memmove of pointers, so for books a few
+    thousand levels deep it costs less than rebalancing a tree written in Python would.
+    """
+    def __init__(self, descending):
+        self.descending = descending
+        self._prices = []
+        self._volumes = {}
+
+    def __len__(self):
+        return len(self._prices)
+
+    def __contains__(self, price):
+        return price in self._volumes
+
+    def clear(self):
+        self._prices = []
+        self._volumes = {}
+
+    def volume(self, price):
+        return self._volumes.get(price, 0.0)
+
+    def set(self, price, volume):
+        """
+        Set the total volume at a price level. A volume of zero removes the level. O(1) for an existing level, O(n)
+        when a level is added or removed
+        """
+        if volume <= 0:
+            if price in self._volumes:
+                del self._volumes[price]
+                del self._prices[bisect_left(self._prices, price)]
+            return
+        if price not in self._volumes:
+            i = bisect_left(self._prices, price)
+            self._prices.insert(i, price)
+        self._volumes[price] = volume
+
+    def best(self):
+        if not self._prices:
+            return None
+        return self._prices[-1] if self.descending else self._prices[0]
+
+    def levels(self, limit=None):
+        """
+        :return: the price levels, best first, as a list of prices
+        """
+        prices = self._prices[::-1] if self.descending else self._prices
+        return prices[:limit] if limit is not None else list(prices)
+
+    def items(self):
+        return self._volumes.items()
+
+
+class LocalOrderBook:
+    """
+    A client-side copy of the order book for one pair. It is seeded from an `orderbook` snapshot and then kept current
+    by applying (side, price, volume) level updates, either from a streaming feed or from the difference between
+    successive snapshots, so depth, spread and cumulative volume can be queried without re-fetching or re-parsing.
+    """
+    def __init__(self, snapshot=None):
+        self.bids = BookSide(descending=True)
+        self.asks = BookSide(descending=False)
+        self.timestamp = None
+        if snapshot is not None:
+            self.reset(snapshot)
+
+    def side(self, side):
+        if side in (BIDS, 'bid', 'BID'):
+            return self.bids
+        if side in (ASKS, 'ask', 'ASK'):
+            return self.asks
+        raise ValueError('Invalid order book side: %s' % (side,))
+
+    @staticmethod
+    def aggregate(levels):
+        """
+        Sums the volume at each price of a list of {'price', 'volume'} dicts, as returned by the API
+        """
+        totals = {}
+        for level in levels:
+            price = float(level['price'])
+            totals[price] = totals.get(price, 0.0) + float(level['volume'])
+        return totals
+
+    def reset(self, snapshot):
+        """
+        Replace the book's contents with an `orderbook` API response
+        """
+        for name in (BIDS, ASKS):
+            side = self.side(name)
+            side.clear()
+            for price, volume in self.aggregate(snapshot[name]).items():
+                side.set(price, volume)
+        self.timestamp = snapshot.get('timestamp')
+
+    def update(self, side, price, volume):
+        """
+        Set the total volume at one price level; zero removes it
+        """
+        self.side(side).set(float(price), float(volume))
+
+    def apply(self, updates, timestamp=None):
+        """
+        Apply a sequence of (side, price, volume) level updates
+        """
+        for side, price, volume in updates:
+            self.update(side, price, volume)
+        if timestamp is not None:
+            self.timestamp = timestamp
+
+    def diff(self, snapshot):
+        """
+        :return: the (side, price, volume) updates that turn this book into the given `orderbook` snapshot
+        """
+        updates = []
+        for name in (BIDS, ASKS):
+            side = self.side(name)
+            target = self.aggregate(snapshot[name])
+            for price, volume in side.items():
+                if price not in target:
+                    updates.append((name, price, 0.0))
+            for price, volume in target.items():
+                if side.volume(price) != volume:
+                    updates.append((name, price, volume))
+        return updates
+
+    def sync(self, snapshot):
+        """
+        Bring the book up to date with a newer snapshot, touching only the levels that changed
+        :return: the updates that were applied
+        """
+        updates = self.diff(snapshot)
+        self.apply(updates, snapshot.get('timestamp'))
+        return updates
+
+    def refresh(self, api, kind='auth'):
+        """
+        Fetch the current order book from a BitX client and sync to it
+        """
+        return self.sync(api.get_order_book(kind=kind))
+
+    @property
+    def best_bid(self):
+        return self.bids.best()
+
+    @property
+    def best_ask(self):
+        return self.asks.best()
+
+    @property
+    def spread(self):
+        if self.best_bid is None or self.best_ask is None:
+            return None
+        return self.best_ask - self.best_bid
+
+    @property
+    def mid(self):
+        if self.best_bid is None or self.best_ask is None:
+            return None
+        return (self.best_ask + self.best_bid) / 2
+
+    def depth(self, side, limit=None):
+        """
+        :return: (prices, volumes) float64 arrays for the top `limit` levels of a side, best price first
+        """
+        book_side = self.side(side)
+        prices = book_side.levels(limit)
+        volumes = [book_side.volume(price) for price in prices]
+        return np.array(prices, dtype=np.float64), np.array(volumes, dtype=np.float64)
+
+    def cumulative_volume(self, side, limit=None):
+        """
+        :return: (prices, cumulative volumes) arrays, best price first
+        """
+        prices, volumes = self.depth(side, limit)
+        return prices, np.cumsum(volumes)
+
+    def volume_to(self, side, price):
+        """
+        :return: the total volume on a side from the best price up to and including `price`
+        """
+        prices, volumes = self.depth(side)
+        if self.side(side).descending:
+            return float(volumes[prices >= price].sum())
+        return float(volumes[prices <= price].sum())
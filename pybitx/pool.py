@@ -0,0 +1,129 @@
+"""
+Many sets of API credentials sharing one connection pool and one worker pool.
+
+Each BitX client has its own Requests session and thread pool, which is wasteful with one client per sub-account. The
+clients of a ClientPool share the pool's instead, while keeping their own credentials and their own rate limits for
+authenticated calls. Public calls, which the exchange limits per address rather than per key, share one budget.
+"""
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from pybitx.api import BitX, new_session, map_concurrently
+from pybitx.ratelimit import RateLimiter
+from pybitx.metrics import Metrics
+
+
+class ClientPool:
+    """
+    BitX clients for several credentials, e.g. one per sub-account, over shared connections and workers.
+
+        pool = ClientPool({'main': (key1, secret1), 'mm': (key2, secret2)}, {'rate_limits': True, 'max_workers': 20})
+        pool['mm'].create_limit_order('buy', 0.1, 900)
+        pool.get_balances_frame()        # every account's balances, indexed by (account, row)
+        pool.map('get_orders', kwargs={'state': 'PENDING'})
+    """
+    def __init__(self, credentials=None, options={}):
+        """
+        :param credentials: a dict of {name: (key, secret)}, or a list of (key, secret) pairs named by their keys
+        :param options: BitX options for every client. max_workers (default 10) sizes the shared worker and connection
+        pools, and metrics=True creates one Metrics for all the clients
+        """
+        self.options = dict(options)
+        self.max_workers = options['max_workers'] if 'max_workers' in options else 10
+        self.session, adapter = new_session(self.max_workers)
+        self.executor = ThreadPoolExecutor(max_workers=self.max_workers)
+        if self.options.get('metrics') is True:
+            self.options['metrics'] = Metrics()
+        self.metrics = self.options.get('metrics')
+        if self.metrics is not None:
+            self.metrics.add_connection_source(lambda: BitX._connection_counts(adapter))
+        self.options['pool'] = self
+        self.clients = {}
+        self._limiters = {}
+        self._lock = threading.Lock()
+        if isinstance(credentials, dict):
+            credentials = credentials.items()
+        else:
+            credentials = ((key, (key, secret)) for key, secret in credentials or ())
+        for name, (key, secret) in credentials:
+            self.add(name, key, secret)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def close(self):
+        self.executor.shutdown(wait=True)
+        self.session.close()
+
+    def __len__(self):
+        return len(self.clients)
+
+    def __iter__(self):
+        return iter(self.clients)
+
+    def __getitem__(self, name):
+        return self.clients[name]
+
+    def shared_limiter(self, budget, rate):
+        """
+        :return: the pool's RateLimiter for a budget, such as ('public', 'get'), created at `rate` on first use
+        """
+        with self._lock:
+            if budget not in self._limiters:
+                self._limiters[budget] = RateLimiter(rate)
+            return self._limiters[budget]
+
+    def add(self, name, key, secret, options=None):
+        """
+        Adds a client to the pool
+        :param options: options overriding the pool's for this client only, e.g. its pair or rate_limits
+        :return: the client
+        """
+        client_options = dict(self.options, **options) if options else self.options
+        client = self.clients[name] = BitX(key, secret, client_options)
+        return client
+
+    def remove(self, name):
+        return self.clients.pop(name)
+
+    def map(self, method, args=(), kwargs=None, names=None, concurrency=None, return_exceptions=False):
+        """
+        Makes the same call with several clients concurrently, on the shared worker pool. The call must not itself wait
+        on work submitted to the pool, as parallel stop_all_orders does, or it can starve the pool
+        :param method: the name of a BitX method
+        :param names: the clients to call, by default all of them
+        :param concurrency: the maximum number of calls in flight. Defaults to, and is capped at, max_workers
+        :param return_exceptions: return a failed call's exception as its result, rather than raising the first one
+        :return: a dict of {name: result}
+        """
+        names = list(self.clients if names is None else names)
+        kwargs = kwargs or {}
+
+        def call(name):
+            try:
+                return getattr(self.clients[name], method)(*args, **kwargs)
+            except Exception as e:
+                if not return_exceptions:
+                    raise
+                return e
+
+        concurrency = min(concurrency or self.max_workers, self.max_workers)
+        return dict(zip(names, map_concurrently(self.executor, call, names, concurrency)))
+
+    def frame(self, method, args=(), kwargs=None, names=None, concurrency=None):
+        """
+        Calls a *_frame method with several clients concurrently
+        :return: one frame of all the results, with the client's name as the outer level of the index
+        """
+        results = self.map(method, args, kwargs, names, concurrency)
+        from pybitx.frames import pairs_frame
+        return pairs_frame(list(results.values()), list(results), name='account')
+
+    def get_balances_frame(self, names=None, concurrency=None):
+        """
+        :return: the balances of every client's accounts, indexed by (account, row)
+        """
+        return self.frame('get_balance_frame', names=names, concurrency=concurrency)
@@ -0,0 +1,70 @@
+import threading
+import time
+
+
+class RateLimiter:
+    """
+    A thread-safe token bucket. Tokens accumulate at `rate` per second up to `burst`, and each acquire() takes one,
+    sleeping until one is available. A rate of None means unlimited.
+
+    The rate adapts to the server: slow_down() cuts it multiplicatively when the server pushes back, and each
+    speed_up() adds back a small fraction of the configured rate, so throughput settles just under what the server
+    tolerates instead of alternating between bursts and rejections.
+    """
+    def __init__(self, rate=None, burst=None, clock=time.monotonic, sleep=time.sleep):
+        self.rate = rate
+        self.max_rate = rate
+        self.min_rate = rate / 16.0 if rate is not None else None
+        self.burst = burst if burst is not None else max(1.0, rate or 1.0)
+        self._clock = clock
+        self._sleep = sleep
+        self._tokens = self.burst
+        self._last = clock()
+        self._lock = threading.Lock()
+
+    def _refill(self, now):
+        self._tokens = min(self.burst, self._tokens + (now - self._last) * self.rate)
+        self._last = now
+
+    def delay(self):
+        """
+        Take a token, returning how long the caller must wait before using it. Tokens can be borrowed from the future,
+        which is what lets concurrent callers queue up fairly behind each other.
+        """
+        if self.rate is None:
+            return 0.0
+        with self._lock:
+            self._refill(self._clock())
+            self._tokens -= 1
+            if self._tokens >= 0:
+                return 0.0
+            return -self._tokens / self.rate
+
+    def slow_down(self, factor=0.5, pause=None):
+        """
+        Reduce the rate, e.g. after an HTTP 429
+        :param pause: if given, also hold back the next request for this many seconds (e.g. the Retry-After)
+        """
+        if self.rate is None:
+            return
+        with self._lock:
+            self._refill(self._clock())
+            self.rate = max(self.min_rate, self.rate * factor)
+            if pause:
+                self._tokens = min(self._tokens, -pause * self.rate)
+
+    def speed_up(self, fraction=0.05):
+        """
+        Recover a fraction of the configured rate, up to the configured rate, e.g. after a successful request
+        """
+        if self.rate is None or self.rate >= self.max_rate:
+            return
+        with self._lock:
+            self._refill(self._clock())
+            self.rate = min(self.max_rate, self.rate + self.max_rate * fraction)
+
+    def acquire(self):
+        wait = self.delay()
+        if wait > 0:
+            self._sleep(wait)
+        return wait
@@ -0,0 +1,224 @@
+"""
+Recording BitX sessions and replaying them without a network.
+
+A Recorder, passed as a client's 'transport' option, makes every request as usual and appends the request and the raw
+response body to a log file. A Replayer, passed the same way, serves the recorded responses instead, so a strategy can
+be run, tested or benchmarked against a recorded session deterministically and at memory speed.
+
+The log is a magic header followed by one record per request: a fixed-size header of the time it was made, the HTTP
+status and the lengths of the request key and of the body, then the key (the HTTP method, call, kind and parameters,
+as JSON) and the body. The Replayer maps the file into memory and indexes the record headers, so bodies are only read
+when they are served. A Recorder opening an existing log first truncates any record cut short by a crash, so that what
+it appends can be read back.
+
+    with Recorder('session.log') as recorder:
+        api = BitX(key, secret, {'transport': recorder})
+        run_strategy(api)
+
+    api = BitX(key, secret, {'transport': Replayer('session.log')})
+    run_strategy(api)
+"""
+import datetime
+import json
+import mmap
+import os
+import struct
+import threading
+import time
+from bisect import bisect_right
+
+
+MAGIC = b'PYBITXR1'
+
+# time (Unix seconds), HTTP status, key length, body length
+RECORD = struct.Struct('<dHII')
+
+
+def request_key(call, params, kind, http_call):
+    """
+    :return: the bytes identifying a request. Parameter values are compared as strings, as they are sent
+    """
+    items = sorted((str(k), str(v)) for k, v in (params or {}).items())
+    return json.dumps([http_call, call, kind, items], separators=(',', ':')).encode('utf-8')
+
+
+def _records(data):
+    """
+    Yields (time, status, key_start, body_start, body_length) for each record in a log, stopping at one cut short while
+    it was being written
+    """
+    offset, end = len(MAGIC), len(data)
+    while offset + RECORD.size <= end:
+        recorded, status, key_length, body_length = RECORD.unpack_from(data, offset)
+        key_start = offset + RECORD.size
+        body_start = key_start + key_length
+        if body_start + body_length > end:
+            return
+        yield recorded, status, key_start, body_start, body_length
+        offset = body_start + body_length
+
+
+def _complete_length(path):
+    """
+    :return: the length of the log at path up to the end of its last complete record, or 0 if it has no header yet
+    """
+    if not os.path.exists(path):
+        return 0
+    with open(path, 'rb') as f:
+        magic = f.read(len(MAGIC))
+        if len(magic) < len(MAGIC) and MAGIC.startswith(magic):
+            return 0
+        if magic != MAGIC:
+            raise ValueError('%s is not a pybitx session log' % (path,))
+        end = len(MAGIC)
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as data:
+            for _, _, _, body_start, body_length in _records(data):
+                end = body_start + body_length
+        return end
+
+
+class ReplayMiss(LookupError):
+    def __init__(self, key, reason='was not recorded'):
+        self.key = key
+        self.reason = reason
+
+    def __str__(self):
+        return "Request %s %s" % (self.key.decode('utf-8'), self.reason)
+
+
+class RecordedResponse:
+    """
+    Stands in for a requests.Response, with what BitX and BitXAPIError read from one
+    """
+    def __init__(self, url, status_code, content):
+        self.url = url
+        self.status_code = status_code
+        self.content = content
+        self.headers = {}
+        self.elapsed = datetime.timedelta(0)
+
+    @property
+    def text(self):
+        return self.content.decode('utf-8', 'replace')
+
+
+class Recorder:
+    """
+    A transport that makes real requests and appends each one, with its response, to a log file
+    """
+    def __init__(self, path, clock=time.time):
+        self.path = path
+        self._clock = clock
+        self._lock = threading.Lock()
+        length = _complete_length(path)
+        self._file = open(path, 'ab')
+        # Drop any record left incomplete by an interrupted session before appending after it
+        self._file.truncate(length)
+        if length == 0:
+            self._file.write(MAGIC)
+            self._file.flush()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def close(self):
+        with self._lock:
+            self._file.close()
+
+    def send(self, api, call, params, kind, http_call):
+        response = api.fetch(call, params, kind, http_call)
+        key = request_key(call, params, kind, http_call)
+        body = response.content
+        with self._lock:
+            self._file.write(RECORD.pack(self._clock(), response.status_code, len(key), len(body)))
+            self._file.write(key)
+            self._file.write(body)
+            self._file.flush()
+        return response
+
+
+class Replayer:
+    """
+    A transport that serves responses from a log written by a Recorder.
+
+    By default the responses recorded for each request are served in the order they were recorded, and once they run
+    out the last one is served again, so polling loops see the market move as it did and then hold still. With `speed`,
+    replay follows the recorded timeline instead: a clock starts at the first recorded request and runs `speed` times
+    faster than real time, and each request is answered with the latest response recorded at or before that clock.
+    """
+    def __init__(self, path, speed=None, clock=time.monotonic):
+        """
+        :param speed: replay the recorded timeline this many times faster than real time, or None to serve responses
+        in order as fast as they are asked for
+        """
+        self.path = path
+        self.speed = speed
+        self._clock = clock
+        self._lock = threading.Lock()
+        self._file = open(path, 'rb')
+        self._map = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+        if self._map[:len(MAGIC)] != MAGIC:
+            raise ValueError('%s is not a pybitx session log' % (path,))
+        self._index = {}
+        self._cursors = {}
+        self._start = None
+        self.first_time = None
+        self.last_time = None
+        self.records = 0
+        self._scan()
+
+    def _scan(self):
+        for recorded, status, key_start, body_start, body_length in _records(self._map):
+            key = self._map[key_start:body_start]
+            times, entries = self._index.setdefault(key, ([], []))
+            times.append(recorded)
+            entries.append((status, body_start, body_length))
+            if self.first_time is None:
+                self.first_time = recorded
+            self.last_time = recorded
+            self.records += 1
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def close(self):
+        self._map.close()
+        self._file.close()
+
+    def __len__(self):
+        return self.records
+
+    def now(self):
+        """
+        :return: the replay clock, in Unix seconds of the recording, or None before the first request (and when not
+        replaying in time)
+        """
+        if self.speed is None or self._start is None:
+            return None
+        return self.first_time + (self._clock() - self._start) * self.speed
+
+    def _entry(self, key):
+        if key not in self._index:
+            raise ReplayMiss(key)
+        times, entries = self._index[key]
+        with self._lock:
+            if self.speed is None:
+                i = self._cursors.get(key, 0)
+                self._cursors[key] = min(i + 1, len(entries) - 1)
+                return entries[i]
+            if self._start is None:
+                self._start = self._clock()
+        i = bisect_right(times, self.now()) - 1
+        if i < 0:
+            raise ReplayMiss(key, 'was first recorded later in the session')
+        return entries[i]
+
+    def send(self, api, call, params, kind, http_call):
+        status, offset, length = self._entry(request_key(call, params, kind, http_call))
+        return RecordedResponse(api.construct_url(call), status, self._map[offset:offset + length])
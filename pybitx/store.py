@@ -0,0 +1,220 @@
+"""
+A local, append-only columnar cache of trade and transaction history.
+
+Each dataset lives in its own directory as one raw binary file per column plus a small meta.json holding the schema
+and the committed row count. Appends write the column data first and then replace meta.json atomically, so a crash
+mid-append leaves the previous rows intact; any partial tail is truncated by the next append. Reads map the column
+files into memory, so frames over years of history are available immediately, without copying or parsing.
+"""
+import json
+import os
+
+import numpy as np
+import pandas as pd
+
+from pybitx.frames import TRANSACTION_FLOATS
+
+
+class ColumnStore:
+    """
+    An append-only set of memory-mapped column files in one directory
+    """
+    META = 'meta.json'
+
+    def __init__(self, path, columns, attrs=None):
+        """
+        :param path: the directory holding the dataset. It is created if necessary
+        :param columns: a list of (name, numpy dtype string) pairs
+        :param attrs: extra metadata that must match the dataset on disk, e.g. its fixed-point decimals
+        """
+        self.path = path
+        self.columns = [(name, np.dtype(dtype).str) for name, dtype in columns]
+        self.attrs = attrs or {}
+        if not os.path.isdir(path):
+            os.makedirs(path)
+        meta_path = os.path.join(path, self.META)
+        if os.path.exists(meta_path):
+            with open(meta_path) as f:
+                meta = json.load(f)
+            if [tuple(c) for c in meta['columns']] != self.columns or meta.get('attrs', {}) != self.attrs:
+                raise ValueError('%s holds a different schema: %s' % (path, meta))
+            self.rows = meta['rows']
+        else:
+            self.rows = 0
+            self._commit()
+
+    def __len__(self):
+        return self.rows
+
+    def _file(self, name):
+        return os.path.join(self.path, name + '.col')
+
+    def _commit(self):
+        meta = {'columns': self.columns, 'attrs': self.attrs, 'rows': self.rows}
+        tmp = os.path.join(self.path, self.META + '.tmp')
+        with open(tmp, 'w') as f:
+            json.dump(meta, f)
+        os.replace(tmp, os.path.join(self.path, self.META))
+
+    def append(self, data):
+        """
+        Append rows
+        :param data: a dict or DataFrame of equal-length columns, including every column of the schema
+        :return: the number of rows appended
+        """
+        arrays = [np.ascontiguousarray(np.asarray(data[name]), dtype=dtype) for name, dtype in self.columns]
+        n = len(arrays[0]) if arrays else 0
+        if any(len(a) != n for a in arrays):
+            raise ValueError('Columns have different lengths')
+        if n == 0:
+            return 0
+        for (name, dtype), array in zip(self.columns, arrays):
+            with open(self._file(name), 'ab') as f:
+                # Drop any partial tail left by an interrupted append
+                f.truncate(self.rows * np.dtype(dtype).itemsize)
+                f.write(array.tobytes())
+        self.rows += n
+        self._commit()
+        return n
+
+    def column(self, name):
+        """
+        :return: a read-only memory-mapped array of the committed rows of a column
+        """
+        dtype = dict(self.columns)[name]
+        if self.rows == 0:
+            return np.empty(0, dtype=dtype)
+        return np.memmap(self._file(name), dtype=dtype, mode='r', shape=(self.rows,))
+
+    def last(self, name):
+        """
+        :return: the last committed value of a column, or None if the store is empty
+        """
+        if self.rows == 0:
+            return None
+        return self.column(name)[-1].item()
+
+    def frame(self, index=None):
+        """
+        :return: a DataFrame over the memory-mapped columns. The index column, if given, holds epoch milliseconds and
+        becomes a DatetimeIndex
+        """
+        columns = dict((name, self.column(name)) for name, _ in self.columns)
+        if index is None:
+            return pd.DataFrame(columns, copy=False)
+        stamps = columns.pop(index).view('datetime64[ms]')
+        return pd.DataFrame(columns, index=pd.DatetimeIndex(stamps, name=index, copy=False), copy=False)
+
+
+def _timestamps(index):
+    return np.asarray(index.values, dtype='datetime64[ms]').view(np.int64)
+
+
+def _unstored(store, timestamp, df):
+    """
+    Trades can share a millisecond, so the trades fetched at the last stored timestamp may include some not yet stored.
+    The trades aren't identified, so each stored (price, volume) at that timestamp accounts for one fetched trade
+    :return: a mask of the rows of df, all at `timestamp`, that are not in the store
+    """
+    stamps = store.column('timestamp')
+    start = np.searchsorted(stamps, timestamp)
+    stored = {}
+    for key in zip(store.column('price')[start:].tolist(), store.column('volume')[start:].tolist()):
+        stored[key] = stored.get(key, 0) + 1
+    mask = np.ones(len(df), dtype=bool)
+    for i, key in enumerate(zip(df['price'].tolist(), df['volume'].tolist())):
+        if stored.get(key):
+            stored[key] -= 1
+            mask[i] = False
+    return mask
+
+
+class LocalStore:
+    """
+    Keeps a local copy of trade and transaction history up to date for a BitX client, fetching only what is newer than
+    the last stored trade or transaction row.
+
+        store = LocalStore('~/.pybitx', api)
+        store.sync_trades()
+        df = store.trades_frame()
+    """
+    def __init__(self, root, api):
+        self.root = os.path.expanduser(root)
+        self.api = api
+        self.decimals = api.decimals
+
+    def _schema(self, floats):
+        dtype = 'i8' if self.decimals is not None else 'f8'
+        return [(name, dtype) for name in floats]
+
+    def _attrs(self):
+        return {'decimals': self.decimals} if self.decimals is not None else {}
+
+    def trades(self, pair=None):
+        columns = [('timestamp', 'i8')] + self._schema(('price', 'volume'))
+        return ColumnStore(os.path.join(self.root, 'trades', pair or self.api.pair), columns, self._attrs())
+
+    def transactions(self, account_id):
+        columns = [('row_index', 'i8'), ('timestamp', 'i8')] + self._schema(TRANSACTION_FLOATS)
+        return ColumnStore(os.path.join(self.root, 'transactions', str(account_id)), columns, self._attrs())
+
+    def sync_trades(self, max_requests=100):
+        """
+        Fetch and store the trades after the last stored one. The API returns a limited number of trades per call, so
+        this keeps asking until no newer trades come back
+        :return: the number of trades added
+        """
+        store = self.trades()
+        added = 0
+        for _ in range(max_requests):
+            since = store.last('timestamp')
+            df = self.api.get_trades_frame(since=since)
+            stamps = _timestamps(df.index)
+            new = np.ones(len(stamps), dtype=bool)
+            if since is not None:
+                new = stamps >= since
+                new[stamps == since] = _unstored(store, since, df[stamps == since])
+            if not new.any():
+                break
+            order = np.argsort(stamps[new], kind='stable')
+            data = {'timestamp': stamps[new][order]}
+            for name in ('price', 'volume'):
+                data[name] = df[name].to_numpy()[new][order]
+            added += store.append(data)
+        return added
+
+    def sync_transactions(self, account_id, page_size=1000, prefetch=4):
+        """
+        Fetch and store the transactions after the last stored row
+        :return: the number of rows added
+        """
+        store = self.transactions(account_id)
+        last = store.last('row_index')
+        added = 0
+        pages = self.api.iter_transactions_frames(account_id, min_row=(last or 0) + 1, page_size=page_size,
+                                                  prefetch=prefetch)
+        for df in pages:
+            data = dict((name, df[name].to_numpy()) for name in TRANSACTION_FLOATS)
+            data['row_index'] = df.row_index.to_numpy()
+            data['timestamp'] = _timestamps(df.index)
+            added += store.append(data)
+        return added
+
+    def trades_frame(self, pair=None):
+        """
+        :return: the stored trades, indexed by timestamp, over memory-mapped columns
+        """
+        df = self.trades(pair).frame(index='timestamp')
+        if self.decimals is not None:
+            df.attrs['decimals'] = dict((name, self.decimals['price' if name == 'price' else 'volume'])
+                                        for name in ('price', 'volume'))
+        return df
+
+    def transactions_frame(self, account_id):
+        """
+        :return: the stored transactions, indexed by timestamp, over memory-mapped columns
+        """
+        df = self.transactions(account_id).frame(index='timestamp')
+        if self.decimals is not None:
+            df.attrs['decimals'] = dict((name, self.decimals['volume']) for name in TRANSACTION_FLOATS)
+        return df
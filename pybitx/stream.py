@@ -0,0 +1,231 @@
+import asyncio
+import json
+import logging
+import random
+from collections import namedtuple
+
+import aiohttp
+
+from pybitx import __version__
+from pybitx.orderbook import LocalOrderBook
+
+
+log = logging.getLogger(__name__)
+
+StreamEvent = namedtuple('StreamEvent', ['kind', 'sequence', 'timestamp', 'data'])
+StreamEvent.__doc__ = """
+A market data event. kind is one of 'snapshot', 'create', 'delete', 'trade', 'status' or 'resync'; data holds the
+corresponding part of the streamed message.
+"""
+
+
+class SequenceGap(Exception):
+    def __init__(self, expected, received):
+        self.expected = expected
+        self.received = received
+
+    def __str__(self):
+        return "Stream sequence gap: expected %d, received %d" % (self.expected, self.received)
+
+
+class StreamError(Exception):
+    """
+    The server sent an error instead of market data, e.g. after bad credentials
+    """
+    def __init__(self, error):
+        self.error = error
+
+    def __str__(self):
+        return "Stream error: %s" % (self.error,)
+
+
+class MarketDataStream:
+    """
+    Subscribes to the exchange's streaming market data feed for one pair.
+
+    Every connection starts with a full order book snapshot, after which each message carries the next sequence number
+    and the orders created, deleted or traded. The stream maintains the order-level state and a LocalOrderBook from
+    them, and delivers StreamEvents through a bounded queue: when a consumer falls behind, the reader waits for room in
+    the queue, which stops it reading from the socket, rather than buffering without limit.
+
+    A missing sequence number means updates were lost, so the connection is dropped and re-established, which delivers
+    a fresh snapshot; consumers see a 'resync' event followed by the new 'snapshot'. Dropped connections are retried
+    with exponential backoff and full jitter, as are messages missing the fields they should have. An error sent by the
+    server (a StreamError) or any other failure ends the stream: get(), and so iteration, raises it once the events
+    received before it have been consumed.
+
+        async with MarketDataStream(key, secret, {'pair': 'XBTZAR'}) as stream:
+            async for event in stream:
+                print(event.kind, stream.book.best_bid, stream.book.best_ask)
+    """
+    def __init__(self, key, secret, options={}):
+        self.options = options
+        self.auth = (key, secret)
+        self.pair = options['pair'] if 'pair' in options else 'XBTZAR'
+        if 'stream_url' in options:
+            self.url = options['stream_url']
+        else:
+            self.url = 'wss://ws.luno.com/api/1/stream/%s' % (self.pair,)
+        self.queue_size = options['queue_size'] if 'queue_size' in options else 1000
+        self.min_backoff = options['min_backoff'] if 'min_backoff' in options else 0.5
+        self.max_backoff = options['max_backoff'] if 'max_backoff' in options else 30
+        self.heartbeat = options['heartbeat'] if 'heartbeat' in options else 30
+        self.book = LocalOrderBook()
+        self.orders = {}
+        self.sequence = None
+        self.reconnects = 0
+        self._queue = asyncio.Queue(maxsize=self.queue_size)
+        self._task = None
+        self._session = None
+        self._error = None
+
+    async def __aenter__(self):
+        self.start()
+        return self
+
+    async def __aexit__(self, *exc_info):
+        await self.close()
+
+    def __aiter__(self):
+        return self
+
+    async def __anext__(self):
+        return await self.get()
+
+    def start(self):
+        if self._task is None:
+            self._task = asyncio.ensure_future(self._run())
+
+    async def get(self):
+        """
+        Wait for the next event
+        :raises: the exception that ended the stream, once every event before it has been consumed
+        """
+        if self._error is not None and self._queue.empty():
+            raise self._error
+        event = await self._queue.get()
+        if event is None:
+            raise self._error
+        return event
+
+    async def close(self):
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        if self._session is not None:
+            await self._session.close()
+            self._session = None
+
+    def backoff(self, attempt):
+        """
+        :return: the delay before the given reconnection attempt -- random, up to an exponentially growing cap
+        """
+        return random.uniform(0, min(self.max_backoff, self.min_backoff * 2 ** attempt))
+
+    async def _run(self):
+        try:
+            await self._read()
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            log.error('Market data stream for %s stopped: %s', self.pair, e)
+            self._error = e
+            # Wakes a consumer waiting in get()
+            await self._queue.put(None)
+
+    async def _read(self):
+        self._session = aiohttp.ClientSession(headers={'User-Agent': 'py-bitx v' + __version__})
+        attempt = 0
+        while True:
+            try:
+                async with self._session.ws_connect(self.url, heartbeat=self.heartbeat) as ws:
+                    await ws.send_json({'api_key_id': self.auth[0], 'api_key_secret': self.auth[1]})
+                    async for msg in ws:
+                        if msg.type != aiohttp.WSMsgType.TEXT:
+                            break
+                        await self._handle(msg.data)
+                        if self.sequence is not None:
+                            attempt = 0
+                log.warning('Market data stream for %s closed', self.pair)
+            except SequenceGap as e:
+                log.warning('%s; resynchronising', e)
+                await self._queue.put(StreamEvent('resync', e.received, None, {'expected': e.expected}))
+            except (aiohttp.ClientError, asyncio.TimeoutError, ValueError, KeyError, TypeError) as e:
+                # KeyError and TypeError come from malformed messages
+                log.warning('Market data stream for %s failed: %s', self.pair, e)
+            self.sequence = None
+            delay = self.backoff(attempt)
+            attempt += 1
+            self.reconnects += 1
+            await asyncio.sleep(delay)
+
+    async def _handle(self, data):
+        if not data.strip():
+            # Keep-alive
+            return
+        msg = json.loads(data)
+        if isinstance(msg, dict) and 'error' in msg:
+            raise StreamError(msg['error'])
+        sequence = int(msg['sequence'])
+        timestamp = msg.get('timestamp')
+        if self.sequence is None:
+            self._reset(msg)
+            self.sequence = sequence
+            await self._queue.put(StreamEvent('snapshot', sequence, timestamp, msg))
+            return
+        if sequence <= self.sequence:
+            return
+        if sequence != self.sequence + 1:
+            raise SequenceGap(self.sequence + 1, sequence)
+        self.sequence = sequence
+        for trade in msg.get('trade_updates') or []:
+            self._fill(trade['maker_order_id'], float(trade['base']))
+            await self._queue.put(StreamEvent('trade', sequence, timestamp, trade))
+        if msg.get('create_update'):
+            order = msg['create_update']
+            side = 'bids' if order['type'] == 'BID' else 'asks'
+            self._add(order['order_id'], side, float(order['price']), float(order['volume']))
+            await self._queue.put(StreamEvent('create', sequence, timestamp, order))
+        if msg.get('delete_update'):
+            order_id = msg['delete_update']['order_id']
+            self._remove(order_id)
+            await self._queue.put(StreamEvent('delete', sequence, timestamp, msg['delete_update']))
+        if msg.get('status_update'):
+            await self._queue.put(StreamEvent('status', sequence, timestamp, msg['status_update']))
+        self.book.timestamp = timestamp
+
+    def _reset(self, snapshot):
+        self.orders = {}
+        for side in ('bids', 'asks'):
+            for order in snapshot[side]:
+                self.orders[order['id']] = [side, float(order['price']), float(order['volume'])]
+        self.book.reset(snapshot)
+
+    def _add(self, order_id, side, price, volume):
+        self.orders[order_id] = [side, price, volume]
+        self._change_level(side, price, volume)
+
+    def _remove(self, order_id):
+        order = self.orders.pop(order_id, None)
+        if order is not None:
+            side, price, volume = order
+            self._change_level(side, price, -volume)
+
+    def _fill(self, order_id, volume):
+        order = self.orders.get(order_id)
+        if order is None:
+            return
+        side, price, remaining = order
+        volume = min(volume, remaining)
+        order[2] = remaining - volume
+        self._change_level(side, price, -volume)
+        if order[2] <= 1e-12:
+            del self.orders[order_id]
+
+    def _change_level(self, side, price, delta):
+        total = self.book.side(side).volume(price) + delta
+        self.book.update(side, price, total if total > 1e-12 else 0.0)
@@ -0,0 +1,162 @@
+import asyncio
+import logging
+import time
+from collections import namedtuple
+
+from pybitx.api import BitXAPIError
+from pybitx.numeric import to_decimal
+
+
+log = logging.getLogger(__name__)
+
+OrderEvent = namedtuple('OrderEvent', ['kind', 'order_id', 'order', 'filled'])
+OrderEvent.__doc__ = """
+A change in a tracked order. kind is 'partial_fill' while the order stays open, or 'fill' or 'cancel' when it
+completes (a completed order that was not fully filled was cancelled or expired). order is the order as last seen, and
+filled is the base volume, as a Decimal, filled since the previous event for the order.
+"""
+
+
+class OrderTracker:
+    """
+    Follows a set of orders and reports fills and cancellations, for either a BitX or an AsyncBitX client.
+
+    Each poll makes a single `listorders` call for the pair's pending orders and diffs it against the previous poll.
+    Orders missing from that list have usually just completed; only those are then fetched one by one, concurrently,
+    so a poll costs one request however many orders are open, plus one per order that completed since the last poll.
+    Completed orders stop being tracked.
+
+        tracker = OrderTracker(api, order_ids)
+        tracker.add_callback(lambda event: print(event.kind, event.order_id, event.filled))
+        for event in tracker.events(interval=2):
+            ...
+    """
+    def __init__(self, api, order_ids=(), pair=None):
+        """
+        :param api: a BitX or AsyncBitX client
+        :param pair: the market the orders are in, if not the client's pair
+        """
+        self.api = api
+        self.pair = pair
+        self.orders = {}
+        self._callbacks = []
+        for order_id in order_ids:
+            self.watch(order_id)
+
+    def __len__(self):
+        return len(self.orders)
+
+    def watch(self, order_id):
+        """
+        Start tracking an order, e.g. the order_id returned by create_limit_order
+        """
+        self.orders.setdefault(order_id, None)
+
+    def unwatch(self, order_id):
+        self.orders.pop(order_id, None)
+
+    def add_callback(self, callback):
+        """
+        :param callback: a function called with each OrderEvent
+        """
+        self._callbacks.append(callback)
+
+    def remove_callback(self, callback):
+        self._callbacks.remove(callback)
+
+    def _pending(self, listing):
+        return dict((order['order_id'], order) for order in listing['orders'] or [] if order['order_id'] in self.orders)
+
+    def _update(self, pending, fetched):
+        """
+        Applies the pending orders listed and the orders fetched individually
+        :return: the resulting events
+        """
+        events = []
+        for order_id, order in list(pending.items()) + list(fetched.items()):
+            previous = self.orders.get(order_id)
+            base = to_decimal(order['base'])
+            filled = base - to_decimal(previous['base']) if previous is not None else base
+            if order['state'] == 'COMPLETE':
+                done = base >= to_decimal(order['limit_volume'])
+                events.append(OrderEvent('fill' if done else 'cancel', order_id, order, filled))
+                del self.orders[order_id]
+            else:
+                if filled > 0:
+                    events.append(OrderEvent('partial_fill', order_id, order, filled))
+                self.orders[order_id] = order
+        for event in events:
+            for callback in self._callbacks:
+                try:
+                    callback(event)
+                except Exception:
+                    log.exception('Order tracker callback %r failed', callback)
+        return events
+
+    @staticmethod
+    def _fetched(order_ids, results):
+        fetched = {}
+        for order_id, result in zip(order_ids, results):
+            if isinstance(result, Exception):
+                log.warning('Could not fetch order %s: %s', order_id, result)
+            else:
+                fetched[order_id] = result
+        return fetched
+
+    def poll(self):
+        """
+        Checks the tracked orders once, with a BitX client
+        :return: the events since the last poll
+        """
+        if not self.orders:
+            return []
+        pending = self._pending(self.api.get_orders(state='PENDING', pair=self.pair))
+        missing = [order_id for order_id in self.orders if order_id not in pending]
+
+        def fetch(order_id):
+            try:
+                return self.api.get_order(order_id)
+            except (BitXAPIError, IOError) as e:
+                return e
+
+        futures = [self.api.submit(fetch, order_id) for order_id in missing]
+        results = [f.result() for f in futures]
+        return self._update(pending, self._fetched(missing, results))
+
+    async def poll_async(self):
+        """
+        Checks the tracked orders once, with an AsyncBitX client
+        :return: the events since the last poll
+        """
+        if not self.orders:
+            return []
+        pending = self._pending(await self.api.get_orders(state='PENDING', pair=self.pair))
+        missing = [order_id for order_id in self.orders if order_id not in pending]
+        results = await asyncio.gather(*[self.api.get_order(order_id) for order_id in missing],
+                                       return_exceptions=True)
+        return self._update(pending, self._fetched(missing, results))
+
+    def events(self, interval=1.0):
+        """
+        Polls every `interval` seconds, with a BitX client, until no orders are left to track
+        :return: a generator of OrderEvents
+        """
+        while self.orders:
+            started = time.monotonic()
+            for event in self.poll():
+                yield event
+            if self.orders:
+                time.sleep(max(0.0, interval - (time.monotonic() - started)))
+
+    async def events_async(self, interval=1.0):
+        """
+        Polls every `interval` seconds, with an AsyncBitX client, until no orders are left to track
+        :return: an async generator of OrderEvents
+        """
+        loop = asyncio.get_running_loop()
+        while self.orders:
+            started = loop.time()
+            for event in await self.poll_async():
+                yield event
+            if self.orders:
+                await asyncio.sleep(max(0.0, interval - (loop.time() - started)))
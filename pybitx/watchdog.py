@@ -0,0 +1,226 @@
+"""
+A dead-man's switch for resting orders.
+
+A Watchdog sits between a BitX client and the network, as its transport, so that it sees every request the client
+makes. It tracks the orders the client places (and forgets those it stops), and cancels all of them, concurrently,
+when the process stops sending heartbeats or when requests take longer than a latency bound -- whether they completed
+slowly or are still waiting for a response.
+
+    with Watchdog(api, heartbeat_timeout=5, max_latency=2) as watchdog:
+        while trading:
+            watchdog.heartbeat()
+            api.create_limit_order('buy', 0.1, 900)
+            ...
+
+The sweep runs on workers started with the watchdog, so that cancelling doesn't wait for threads to be created or for
+the client's own workers, which may be stuck on the slow requests that set it off.
+"""
+import itertools
+import logging
+import threading
+import time
+from collections import namedtuple
+from concurrent.futures import ThreadPoolExecutor
+
+log = logging.getLogger(__name__)
+
+Sweep = namedtuple('Sweep', ['reason', 'time', 'elapsed', 'results'])
+Sweep.__doc__ = """
+A cancel sweep. reason is 'heartbeat', 'latency' or the reason given to sweep(); time is when it started, in Unix
+seconds; elapsed is how long it took to stop every order, in seconds; results is a dict of {'success', 'attempts',
+'error'} for each order_id, as returned by BitX.stop_orders.
+"""
+
+
+class Watchdog:
+    """
+    Cancels a client's resting orders when heartbeats stop or requests become too slow.
+
+    Once it has swept, the watchdog is tripped and doesn't sweep again, for either reason, until reset() is called.
+    Orders that complete normally stay tracked until they are stopped or unwatched; stopping them in a sweep just fails
+    harmlessly.
+    """
+    def __init__(self, api, heartbeat_timeout=None, max_latency=None, check_interval=0.05, concurrency=20, retries=2,
+                 backoff=0.05, on_sweep=None, clock=time.monotonic):
+        """
+        :param api: a BitX client. The watchdog becomes its transport while it runs, wrapping any transport it had
+        :param heartbeat_timeout: sweep if heartbeat() isn't called for this many seconds, or None to disable
+        :param max_latency: sweep if a request takes longer than this many seconds, or None to disable
+        :param check_interval: how often, in seconds, the heartbeat and in-flight requests are checked
+        :param concurrency: the number of stop requests in flight during a sweep
+        :param retries: the number of times a transient failure to stop an order is retried
+        :param backoff: the delay, in seconds, before the first retry. It doubles with each subsequent retry
+        :param on_sweep: a function called with each Sweep
+        """
+        self.api = api
+        self.heartbeat_timeout = heartbeat_timeout
+        self.max_latency = max_latency
+        self.check_interval = check_interval
+        self.concurrency = concurrency
+        self.retries = retries
+        self.backoff = backoff
+        self.on_sweep = on_sweep
+        self._clock = clock
+        self.orders = set()
+        self.sweeps = []
+        self.tripped = None
+        self._in_flight = {}
+        self._tokens = itertools.count()
+        self._sweeping = False
+        self._last_heartbeat = clock()
+        self._inner = None
+        self._lock = threading.Lock()
+        self._sweep_lock = threading.Lock()
+        self._stopping = threading.Event()
+        self._thread = None
+        self._sweeper = None
+        self._executor = None
+
+    def __enter__(self):
+        self.start()
+        return self
+
+    def __exit__(self, *exc_info):
+        self.stop()
+
+    def start(self):
+        """
+        Installs the watchdog as the client's transport and starts the monitoring thread and the sweep workers
+        """
+        if self._thread is not None:
+            return
+        self._inner = self.api.transport
+        self.api.transport = self
+        self._executor = ThreadPoolExecutor(max_workers=self.concurrency)
+        # Start every worker now rather than when the first sweep needs it
+        barrier = threading.Barrier(self.concurrency)
+        for _ in range(self.concurrency):
+            self._executor.submit(barrier.wait, 5)
+        self._last_heartbeat = self._clock()
+        self._stopping.clear()
+        self._thread = threading.Thread(target=self._run, name='pybitx-watchdog', daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        """
+        Stops monitoring and gives the client back its transport. A sweep that is under way is finished first; nothing
+        else is cancelled
+        """
+        if self._thread is None:
+            return
+        self._stopping.set()
+        self._thread.join()
+        self._thread = None
+        if self._sweeper is not None:
+            self._sweeper.join()
+            self._sweeper = None
+        self.api.transport = self._inner
+        with self._sweep_lock:
+            self._executor.shutdown(wait=True)
+            self._executor = None
+
+    def heartbeat(self):
+        self._last_heartbeat = self._clock()
+
+    def watch(self, order_id):
+        """
+        Tracks an order that wasn't placed through the client, e.g. one left from an earlier session
+        """
+        with self._lock:
+            self.orders.add(order_id)
+
+    def unwatch(self, order_id):
+        with self._lock:
+            self.orders.discard(order_id)
+
+    def reset(self):
+        """
+        Re-arms a tripped watchdog
+        """
+        self._last_heartbeat = self._clock()
+        self.tripped = None
+
+    def send(self, api, call, params, kind, http_call):
+        token = next(self._tokens)
+        with self._lock:
+            self._in_flight[token] = self._clock()
+        try:
+            if self._inner is not None:
+                response = self._inner.send(api, call, params, kind, http_call)
+            else:
+                response = api.fetch(call, params, kind, http_call)
+        finally:
+            with self._lock:
+                started = self._in_flight.pop(token)
+        elapsed = self._clock() - started
+        if self.max_latency is not None and elapsed > self.max_latency and not self._sweeping:
+            self._trip('latency', '%s took %.3fs' % (call, elapsed))
+        if response.status_code == 200 and call in ('postorder', 'stoporder'):
+            self._track(api, call, params, response)
+        return response
+
+    def _track(self, api, call, params, response):
+        try:
+            body = api.loads(response.content)
+        except ValueError:
+            return
+        if call == 'stoporder':
+            # An order the exchange refused to stop stays tracked, so the next sweep tries it again
+            if body.get('success'):
+                self.unwatch(params['order_id'])
+        elif body.get('order_id') is not None:
+            self.watch(body['order_id'])
+
+    def _trip(self, reason, detail):
+        """
+        Sweeps on a separate thread, so that a slow request that trips the watchdog isn't held up by the sweep
+        """
+        with self._lock:
+            if self.tripped is not None:
+                return
+            self.tripped = reason
+        log.warning('Watchdog tripped (%s): %s', reason, detail)
+        self._sweeper = threading.Thread(target=self.sweep, args=(reason,), name='pybitx-watchdog-sweep', daemon=True)
+        self._sweeper.start()
+
+    def _run(self):
+        while not self._stopping.wait(self.check_interval):
+            now = self._clock()
+            if self.heartbeat_timeout is not None and now - self._last_heartbeat > self.heartbeat_timeout:
+                self._trip('heartbeat', 'no heartbeat for %.3fs' % (now - self._last_heartbeat,))
+            if self.max_latency is not None and not self._sweeping:
+                with self._lock:
+                    oldest = min(self._in_flight.values(), default=None)
+                if oldest is not None and now - oldest > self.max_latency:
+                    self._trip('latency', 'a request has been waiting for %.3fs' % (now - oldest,))
+
+    def sweep(self, reason='manual'):
+        """
+        Stops every tracked order now, concurrently
+        :return: the Sweep
+        """
+        with self._lock:
+            self.tripped = self.tripped or reason
+            order_ids = list(self.orders)
+        started, start = time.time(), time.perf_counter()
+        # Held until the sweep is done, so that stop() can't shut down the executor under it
+        with self._sweep_lock:
+            self._sweeping = True
+            try:
+                executor = self._executor or ThreadPoolExecutor(max_workers=self.concurrency)
+                results = self.api.stop_orders(order_ids, concurrency=self.concurrency, retries=self.retries,
+                                               backoff=self.backoff, executor=executor)
+                if executor is not self._executor:
+                    executor.shutdown(wait=False)
+            finally:
+                self._sweeping = False
+        result = Sweep(reason, started, time.perf_counter() - start, results)
+        self.sweeps.append(result)
+        log.warning('Watchdog sweep (%s) stopped %d of %d orders in %.3fs', reason,
+                    sum(outcome['success'] for outcome in results.values()), len(order_ids), result.elapsed)
+        if self.on_sweep is not None:
+            try:
+                self.on_sweep(result)
+            except Exception:
+                log.exception('Watchdog sweep callback %r failed', self.on_sweep)
+        return result
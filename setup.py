@@ -20,7 +20,7 @@ version = match.groupdict()['version']
 setup(
     name='pybitx',
     version=version,
-    packages=find_packages(exclude=['tests']),
+    packages=find_packages(exclude=['tests', 'benchmarks']),
     description='A BitX API for Python',
     author='Cayle Sharrock',
     author_email='cayle@nimbustech.biz',
@@ -37,5 +37,9 @@ setup(
     keywords='BitX Bitcoin exchange API',
     classifiers=[],
     test_suite='tests',
-    extras_require={'dev': ['requests-mock>=0.7.0']}
+    extras_require={
+        'dev': ['requests-mock>=0.7.0', 'aiohttp>=3.0'],
+        'async': ['aiohttp>=3.0'],
+        'fast': ['orjson>=3.0']
+    }
 )
@@ -0,0 +1,14 @@
+class FakeClock(object):
+    """
+    A clock for tests that only moves when told to: set or advance `now`, or sleep() on it
+    """
+    def __init__(self, now=0.0):
+        self.now = now
+        self.slept = []
+
+    def __call__(self):
+        return self.now
+
+    def sleep(self, seconds):
+        self.slept.append(seconds)
+        self.now += seconds
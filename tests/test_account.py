@@ -0,0 +1,162 @@
+import time
+import unittest
+from decimal import Decimal
+
+import requests_mock
+
+from pybitx.account import AccountState, StaleAccountState, split_pair
+from pybitx.api import BitX
+from tests.helpers import FakeClock
+
+
+def balance(xbt='1.00', xbt_reserved='0.10', zar='1000.00', zar_reserved='200.00'):
+    return {'balance': [
+        {'account_id': '1', 'asset': 'XBT', 'balance': xbt, 'reserved': xbt_reserved, 'unconfirmed': '0.00'},
+        {'account_id': '2', 'asset': 'ZAR', 'balance': zar, 'reserved': zar_reserved, 'unconfirmed': '0.00'},
+    ]}
+
+
+def order(order_id, order_type='BID', price='1000.00', volume='0.20', base='0.00'):
+    return {'order_id': order_id, 'pair': 'XBTZAR', 'type': order_type, 'state': 'PENDING', 'limit_price': price,
+            'limit_volume': volume, 'base': base, 'counter': '0.00'}
+
+
+class TestAccountState(unittest.TestCase):
+    def setUp(self):
+        self.api = BitX('mykey', 'mysecret', {'hostname': 'api.dummy.com'})
+        self.clock = FakeClock(100.0)
+        self.account = AccountState(self.api, clock=self.clock)
+
+    def mock(self, m, balances=None, orders=None):
+        m.get('https://api.dummy.com/api/1/balance', json=balances or balance())
+        m.get('https://api.dummy.com/api/1/listorders?state=PENDING',
+              json={'orders': [order('A')] if orders is None else orders})
+        for account_id in ('1', '2'):
+            m.get('https://api.dummy.com/api/1/accounts/%s/pending' % (account_id,),
+                  json={'id': account_id, 'pending': []})
+
+    def testSplitPair(self):
+        self.assertEqual(split_pair('XBTZAR'), ('XBT', 'ZAR'))
+        self.assertEqual(split_pair('USDCZAR', {'USDCZAR': ('USDC', 'ZAR')}), ('USDC', 'ZAR'))
+        self.assertRaises(ValueError, split_pair, 'USDCZAR')
+
+    @requests_mock.Mocker()
+    def testRefresh(self, m):
+        self.mock(m)
+        self.assertEqual(self.account.age(), float('inf'))
+        self.account.refresh()
+        self.assertEqual(self.account.available('XBT'), Decimal('0.90'))
+        self.assertEqual(self.account.available('ZAR'), Decimal('800.00'))
+        self.assertEqual(self.account.available('ETH'), 0)
+        self.assertEqual([o['order_id'] for o in self.account.open_orders()], ['A'])
+        self.assertEqual(self.account.pending, {'1': [], '2': []})
+        self.clock.now += 3
+        self.assertEqual(self.account.age(), 3)
+        # Known accounts' pending transactions are fetched alongside the balance from then on
+        self.account.refresh()
+        self.assertEqual(m.call_count, 8)
+
+    @requests_mock.Mocker()
+    def testPendingTransactions(self, m):
+        self.mock(m)
+        m.get('https://api.dummy.com/api/1/accounts/1/pending', json={'id': '1', 'pending': [
+            {'timestamp': 1429908835000, 'balance': 0.03, 'available': 0.03, 'balance_delta': 0.03,
+             'available_delta': 0.03, 'currency': 'XBT', 'description': 'Received Bitcoin - 1 of 3 confirmations'},
+            {'timestamp': 1429908836000, 'balance': -0.2, 'available': -0.2, 'balance_delta': -0.2,
+             'available_delta': -0.2, 'currency': 'XBT', 'description': 'Sent Bitcoin'}]})
+        m.get('https://api.dummy.com/api/1/accounts/2/pending', json={'id': '2', 'pending': [
+            {'timestamp': 1429908837000, 'balance': -50, 'available': -50, 'balance_delta': -50,
+             'available_delta': -50, 'description': 'Withdrawal'}]})
+        self.account.refresh()
+        # Outgoing amounts are not available; incoming ones are not yet
+        self.assertEqual(self.account.available('XBT'), Decimal('0.70'))
+        self.assertEqual(self.account.available('ZAR'), Decimal('750.00'))
+        self.assertFalse(self.account.check('sell', 0.8, 5000))
+        self.assertEqual(self.account.outgoing, {'XBT': Decimal('0.2'), 'ZAR': Decimal('50')})
+
+    @requests_mock.Mocker()
+    def testStaleness(self, m):
+        self.mock(m)
+        account = AccountState(self.api, max_age=5, pending_accounts=(), clock=self.clock)
+        self.assertRaises(StaleAccountState, account.available, 'XBT')
+        account.refresh()
+        self.assertEqual(m.call_count, 2)
+        self.clock.now += 6
+        with self.assertRaises(StaleAccountState) as cm:
+            account.check('buy', 0.1, 1000)
+        self.assertEqual((cm.exception.age, cm.exception.max_age), (6, 5))
+        self.assertTrue(account.check('buy', 0.1, 1000, max_age=10))
+
+    @requests_mock.Mocker()
+    def testCheck(self, m):
+        self.mock(m)
+        self.account.refresh()
+        self.assertTrue(self.account.check('buy', 0.8, 1000))
+        self.assertFalse(self.account.check('buy', 0.81, 1000))
+        self.assertTrue(self.account.check('sell', 0.9, 5000))
+        self.assertFalse(self.account.check('sell', 0.91, 5000))
+        # Rounded as the order would be sent
+        self.api.lot_size = 0.1
+        self.assertTrue(self.account.check('sell', 0.95, 5000))
+
+    @requests_mock.Mocker()
+    def testLocalUpdates(self, m):
+        self.mock(m)
+        m.post('https://api.dummy.com/api/1/postorder', json={'order_id': 'B'})
+        m.post('https://api.dummy.com/api/1/stoporder', json={'success': True})
+        self.account.refresh()
+        self.assertEqual(self.account.create_limit_order('buy', 0.5, 1000), {'order_id': 'B'})
+        self.assertEqual(self.account.available('ZAR'), Decimal('300.00'))
+        self.assertFalse(self.account.check('buy', 0.5, 1000))
+        self.assertEqual(self.account.stop_order('A'), {'success': True})
+        self.assertEqual(self.account.available('ZAR'), Decimal('500.00'))
+        self.assertEqual([o['order_id'] for o in self.account.open_orders()], ['B'])
+        self.account.create_limit_order('sell', 0.25, 2000)
+        self.assertEqual(self.account.available('XBT'), Decimal('0.65'))
+
+    @requests_mock.Mocker()
+    def testLocalUpdatesDuringRefresh(self, m):
+        self.mock(m)
+        m.post('https://api.dummy.com/api/1/postorder', json={'order_id': 'B'})
+        m.post('https://api.dummy.com/api/1/stoporder', json={'success': True})
+        self.account.refresh()
+        self.clock.now += 1
+        self.account.create_limit_order('buy', 0.5, 1000)
+        self.account.stop_order('A')
+        # A refresh that started before these changes, answered without them, keeps them
+        self.account._apply(self.clock.now - 0.5, balance(), {'orders': [order('A')]}, {})
+        self.assertEqual(self.account.available('ZAR'), Decimal('500.00'))
+        self.assertEqual([o['order_id'] for o in self.account.open_orders()], ['B'])
+        # One answered with them doesn't apply them twice
+        self.account._apply(self.clock.now, balance(zar_reserved='500.00'), {'orders': [order('B', volume='0.50')]},
+                            {})
+        self.assertEqual(self.account.available('ZAR'), Decimal('500.00'))
+        # And a later one forgets them
+        self.clock.now += 1
+        self.account._apply(self.clock.now, balance(zar_reserved='0.00'), {'orders': []}, {})
+        self.assertEqual(self.account.available('ZAR'), Decimal('1000.00'))
+        self.assertEqual(self.account.open_orders(), [])
+
+    @requests_mock.Mocker()
+    def testBackgroundRefresh(self, m):
+        self.mock(m)
+        account = AccountState(self.api, interval=0.01, pending_accounts=())
+        with account:
+            deadline = time.monotonic() + 5
+            while account.refreshes < 3 and time.monotonic() < deadline:
+                time.sleep(0.01)
+        self.assertGreaterEqual(account.refreshes, 3)
+        self.assertIsNone(account.last_error)
+        m.get('https://api.dummy.com/api/1/balance', status_code=500, text='Server error')
+        refreshes = account.refreshes
+        account.start()
+        deadline = time.monotonic() + 5
+        while account.last_error is None and time.monotonic() < deadline:
+            time.sleep(0.01)
+        account.stop()
+        self.assertIsNotNone(account.last_error)
+        self.assertEqual(account.refreshes, refreshes)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,123 @@
+import unittest
+
+from aiohttp import web
+from aiohttp.test_utils import TestServer
+
+from pybitx.aio import AsyncBitX
+from pybitx.api import BitXAPIError
+
+
+class MockBitXServer(object):
+    """
+    A tiny local stand-in for the /api/1/* endpoints. Responses are registered per call, and every request is recorded
+    so that tests can inspect query strings, bodies and headers.
+    """
+    def __init__(self):
+        self.responses = {}
+        self.requests = []
+        self.app = web.Application()
+        self.app.router.add_route('*', '/api/1/{call:.*}', self.handle)
+        self.server = TestServer(self.app)
+
+    def add(self, call, json=None, status=200, text=None):
+        self.responses[call] = (json, status, text)
+
+    async def handle(self, request):
+        data = await request.post()
+        self.requests.append((request, dict(data)))
+        call = request.match_info['call']
+        if call not in self.responses:
+            return web.json_response({'error': 'Not found'}, status=404)
+        json, status, text = self.responses[call]
+        if text is not None:
+            return web.Response(text=text, status=status)
+        return web.json_response(json, status=status)
+
+    def options(self):
+        return {'hostname': self.server.host, 'port': self.server.port, 'scheme': 'http'}
+
+
+class TestAsyncBitX(unittest.IsolatedAsyncioTestCase):
+
+    async def asyncSetUp(self):
+        self.mock = MockBitXServer()
+        await self.mock.server.start_server()
+        self.api = AsyncBitX('mykey', 'mysecret', self.mock.options())
+
+    async def asyncTearDown(self):
+        await self.api.close()
+        await self.mock.server.close()
+
+    async def testTicker(self):
+        response = {"ask": "1050.00", "timestamp": 1366224386716, "bid": "924.00",
+                    "rolling_24_hour_volume": "12.52", "last_trade": "950.00"}
+        self.mock.add('ticker', response)
+        result = await self.api.get_ticker()
+        self.assertDictEqual(result, response)
+        request = self.mock.requests[0][0]
+        self.assertEqual(request.query['pair'], 'XBTZAR')
+        self.assertTrue(request.headers['Authorization'].startswith('Basic '))
+        self.assertTrue(request.headers['User-Agent'].startswith('py-bitx v'))
+
+    async def testUnauthenticated(self):
+        self.mock.add('tickers', {'tickers': []})
+        await self.api.get_all_tickers(kind='basic')
+        self.assertNotIn('Authorization', self.mock.requests[0][0].headers)
+
+    async def testErrorPayload(self):
+        self.mock.add('ticker', {"error": "Invalid currency pair.", "error_code": "ErrInvalidPair"})
+        with self.assertRaises(BitXAPIError) as cm:
+            await self.api.get_ticker()
+        self.assertEqual(cm.exception.code, 200)
+        self.assertEqual(cm.exception.url, self.api.construct_url('ticker') + '?pair=XBTZAR')
+
+    async def testErrorStatus(self):
+        self.mock.add('listorders', text='', status=401)
+        with self.assertRaises(BitXAPIError) as cm:
+            await self.api.get_orders(kind='basic')
+        self.assertEqual(cm.exception.code, 401)
+
+    async def testOrderBookLimit(self):
+        response = {"timestamp": 1366305398592,
+                    "bids": [{"volume": "0.10", "price": "1100.00"}, {"volume": "0.10", "price": "1000.00"}],
+                    "asks": [{"volume": "0.10", "price": "1180.00"}, {"volume": "0.10", "price": "2000.00"}]}
+        self.mock.add('orderbook', response)
+        result = await self.api.get_order_book(1)
+        self.assertEqual(result['bids'], response['bids'][:1])
+        self.assertEqual(result['asks'], response['asks'][:1])
+
+    async def testCreateOrder(self):
+        self.mock.add('postorder', {"order_id": "BXMC2CJ7HNB88U4"})
+        result = await self.api.create_limit_order('buy', 0.1, 500)
+        self.assertEqual(result['order_id'], 'BXMC2CJ7HNB88U4')
+        data = self.mock.requests[0][1]
+        self.assertEqual(data, {'pair': 'XBTZAR', 'type': 'BID', 'volume': '0.1', 'price': '500'})
+
+    async def testStopAllOrders(self):
+        self.mock.add('listorders', {'orders': [{'order_id': 'A'}, {'order_id': 'B'}, {'order_id': 'C'}]})
+        self.mock.add('stoporder', {'success': True})
+        result = await self.api.stop_all_orders()
+        self.assertDictEqual(result, {'A': True, 'B': True, 'C': True})
+        stopped = sorted(data['order_id'] for request, data in self.mock.requests if data)
+        self.assertEqual(stopped, ['A', 'B', 'C'])
+
+    async def testMultiplePairs(self):
+        self.mock.add('trades', {'trades': [{'price': '1.5', 'volume': '1', 'timestamp': 1366052621774}]})
+        df = await self.api.get_trades_frames(['XBTZAR', 'ETHXBT'])
+        self.assertEqual(list(df.index.get_level_values('pair')), ['XBTZAR', 'ETHXBT'])
+        pairs = sorted(request.query['pair'] for request, _ in self.mock.requests)
+        self.assertEqual(pairs, ['ETHXBT', 'XBTZAR'])
+
+    async def testTransactionsParams(self):
+        self.mock.add('accounts/319232323/transactions', {"id": "319232323", "transactions": []})
+        await self.api.get_transactions('319232323', 1, 10)
+        query = self.mock.requests[0][0].query
+        self.assertEqual((query['min_row'], query['max_row']), ('1', '10'))
+
+
+def main():
+    unittest.main()
+
+
+if __name__ == '__main__':
+    main()
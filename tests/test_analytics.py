@@ -0,0 +1,92 @@
+import unittest
+
+import numpy as np
+
+from pybitx import analytics
+from pybitx.analytics import to_book, stack, vwap, slippage, impact, imbalance, depth_within, cumulative_depth
+from pybitx.frames import order_book_frame
+from pybitx.orderbook import LocalOrderBook
+
+
+SNAPSHOT = {
+    'asks': [{'price': '101', 'volume': '1'}, {'price': '102', 'volume': '2'}, {'price': '104', 'volume': '4'}],
+    'bids': [{'price': '99', 'volume': '3'}, {'price': '98', 'volume': '1'}]
+}
+
+
+def walk(levels, size):
+    """
+    The average price of filling size from a list of (price, volume), one level at a time
+    """
+    remaining, cost = size, 0.0
+    for price, volume in levels:
+        take = min(remaining, volume)
+        cost += take * price
+        remaining -= take
+        if remaining <= 0:
+            return cost / size
+    return np.nan
+
+
+class TestAnalytics(unittest.TestCase):
+    def testToBook(self):
+        book = to_book(SNAPSHOT)
+        self.assertEqual(list(book.ask_price), [101, 102, 104])
+        self.assertTrue(np.isnan(book.bid_price[2]))
+        self.assertEqual(book.bid_volume[2], 0)
+        for source in (order_book_frame(SNAPSHOT), order_book_frame(SNAPSHOT, {'price': 2, 'volume': 8}),
+                       LocalOrderBook(SNAPSHOT)):
+            other = to_book(source)
+            for field in analytics.Book._fields:
+                np.testing.assert_array_equal(getattr(other, field), getattr(book, field))
+        self.assertEqual(to_book(SNAPSHOT, levels=1).ask_price.tolist(), [101])
+        self.assertRaises(TypeError, to_book, [1, 2])
+
+    def testSnapshotMeasures(self):
+        book = to_book(SNAPSHOT)
+        self.assertEqual(analytics.mid(book), 100)
+        self.assertEqual(analytics.spread(book), 2)
+        self.assertEqual(imbalance(book), (4 - 7) / 11.0)
+        self.assertEqual(imbalance(book, levels=1), 0.5)
+        self.assertEqual(depth_within(book, 0.02), (4, 3))
+        prices, volume, notional = cumulative_depth(book, 'buy')
+        self.assertEqual(volume.tolist(), [1, 3, 7])
+        self.assertEqual(notional.tolist(), [101, 305, 721])
+
+    def testVwap(self):
+        book = to_book(SNAPSHOT)
+        sizes = [0.5, 1, 2, 3, 5, 7, 8]
+        np.testing.assert_allclose(vwap(book, sizes), [walk([(101, 1), (102, 2), (104, 4)], s) for s in sizes])
+        np.testing.assert_allclose(vwap(book, [1, 4, 5], side='sell'), [99, 98.75, np.nan])
+        np.testing.assert_allclose(slippage(book, [1, 3]), [0, (305 / 3.0 - 101) / 101])
+        np.testing.assert_allclose(impact(book, [1, 2, 4], side='sell'), [0.01, 0.01, 0.02])
+        self.assertRaises(ValueError, vwap, book, [1], 'hold')
+
+    def testStackedHistory(self):
+        rng = np.random.RandomState(1)
+        snapshots = []
+        for n in (3, 10, 1, 7):
+            asks = 100 + np.cumsum(rng.rand(n))
+            bids = 100 - np.cumsum(rng.rand(n))
+            snapshots.append({'asks': [{'price': p, 'volume': v} for p, v in zip(asks, rng.rand(n))],
+                              'bids': [{'price': p, 'volume': v} for p, v in zip(bids, rng.rand(n))]})
+        history = stack(snapshots)
+        self.assertEqual(history.ask_price.shape, (4, 10))
+        sizes = np.linspace(0.1, 6, 50)
+        result = vwap(history, sizes)
+        self.assertEqual(result.shape, (4, 50))
+        for i, q in enumerate(snapshots):
+            levels = [(level['price'], level['volume']) for level in q['asks']]
+            np.testing.assert_allclose(result[i], [walk(levels, s) for s in sizes])
+            self.assertAlmostEqual(imbalance(history)[i], imbalance(to_book(q)))
+        self.assertEqual(analytics.mid(history).shape, (4,))
+        self.assertEqual(vwap(stack([], levels=5), sizes).shape, (0, 50))
+
+    def testEmptyBook(self):
+        book = to_book({'asks': [], 'bids': []})
+        self.assertTrue(np.isnan(analytics.mid(book)))
+        self.assertTrue(np.isnan(vwap(book, [1, 2])).all())
+
+
+if __name__ == '__main__':
+    unittest.main()
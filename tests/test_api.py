@@ -1,6 +1,12 @@
 import base64
+import json
+import subprocess
+import sys
+import threading
 import unittest
 import requests_mock
+from concurrent.futures import ThreadPoolExecutor
+from decimal import Decimal
 
 from pybitx import api
 from pybitx.api import BitX, BitXAPIError
@@ -31,6 +37,18 @@ class TestBitX(unittest.TestCase):
         self.assertEqual(api.pair, options['pair'])
         self.assertEqual(api.auth, (key, secret))
 
+    def testMaxWorkers(self):
+        api = BitX('', '', {'max_workers': 12})
+        self.assertEqual(api.max_workers, 12)
+        self.assertEqual(api._executor._max_workers, 12)
+        self.assertEqual(api._requests_session.get_adapter('https://api.mybitx.com')._pool_maxsize, 12)
+        api.close()
+
+    def testLazyImports(self):
+        code = ("import sys, pybitx; pybitx.BitX('', '', {'numeric': 'exact', 'rate_limits': True, 'metrics': True}); "
+                "print(' '.join(m for m in ('numpy', 'pandas') if m in sys.modules))")
+        self.assertEqual(subprocess.check_output([sys.executable, '-c', code]).strip(), b'')
+
     def testConstructURL(self):
         api = BitX('', '')
         url = api.construct_url('test')
@@ -67,7 +85,7 @@ class TestAPICalls(unittest.TestCase):
     @staticmethod
     def make_auth_header(auth):
         s = ':'.join(auth)
-        k = base64.b64encode(s)
+        k = base64.b64encode(s.encode('utf-8')).decode('ascii')
         return 'Basic %s' % (k,)
 
     def setUp(self):
@@ -374,6 +392,42 @@ class TestAPICalls(unittest.TestCase):
         result = self.api.get_transactions('319232323', 2, 2)
         self.assertDictEqual(result, {"id": "319232323", "transactions": [trec[1]]})
 
+    def mockHistory(self, m, n_rows):
+        def transactions(request, context):
+            lo = int(request.qs['min_row'][0])
+            hi = min(int(request.qs['max_row'][0]), n_rows + 1)
+            rows = [{"row_index": i, "timestamp": 1429908701000 + i, "balance": 0.1, "available": 0.1,
+                     "balance_delta": 0.1, "available_delta": 0.1, "currency": "XBT",
+                     "description": "Bought 0.1 BTC"} for i in range(hi - 1, lo - 1, -1)]
+            return {"id": "319232323", "transactions": rows}
+        url = 'https://api.dummy.com/api/1/accounts/319232323/transactions'
+        m.get(url, json=transactions)
+
+    @requests_mock.Mocker()
+    def testIterTransactions(self, m):
+        self.mockHistory(m, 2500)
+        rows = list(self.api.iter_transactions('319232323', page_size=1000, prefetch=2))
+        self.assertEqual([row['row_index'] for row in rows], list(range(1, 2501)))
+        requested = sorted((int(r.qs['min_row'][0]), int(r.qs['max_row'][0])) for r in m.request_history)
+        self.assertEqual(requested[:3], [(1, 1001), (1001, 2001), (2001, 3001)])
+        self.assertTrue(len(requested) <= 4)
+
+    @requests_mock.Mocker()
+    def testIterTransactionsResumeAndBounds(self, m):
+        self.mockHistory(m, 2500)
+        rows = self.api.iter_transactions('319232323', min_row=2401, page_size=50)
+        self.assertEqual([row['row_index'] for row in rows], list(range(2401, 2501)))
+        rows = self.api.iter_transactions('319232323', min_row=10, max_row=95, page_size=20)
+        self.assertEqual([row['row_index'] for row in rows], list(range(10, 95)))
+        self.assertEqual(list(self.api.iter_transactions('319232323', min_row=3000)), [])
+
+    @requests_mock.Mocker()
+    def testIterTransactionsFrames(self, m):
+        self.mockHistory(m, 250)
+        frames = list(self.api.iter_transactions_frames('319232323', page_size=100))
+        self.assertEqual([len(df) for df in frames], [100, 100, 50])
+        self.assertEqual(frames[2].row_index.iloc[-1], 250)
+
     @requests_mock.Mocker()
     def testPending(self, m):
         response = {
@@ -409,6 +463,322 @@ class TestAPICalls(unittest.TestCase):
         self.assertEqual(data['price'], '500')
         self.assertDictEqual(result, response)
 
+    @requests_mock.Mocker()
+    def testSubmit(self, m):
+        m.get('https://api.dummy.com/api/1/ticker?pair=XBTZAR', json={'bid': '924.00'})
+        m.get('https://api.dummy.com/api/1/orderbook', json={'bids': [1, 2], 'asks': [3, 4]})
+        m.get('https://api.dummy.com/api/1/balance', json={'error': 'Unauthorized'})
+        ticker = self.api.submit(self.api.get_ticker)
+        book = self.api.submit('get_order_book', 1)
+        balance = self.api.submit(self.api.get_balance)
+        self.assertDictEqual(ticker.result(), {'bid': '924.00'})
+        self.assertDictEqual(book.result(), {'bids': [1], 'asks': [3]})
+        self.assertRaises(BitXAPIError, balance.result)
+
+    @requests_mock.Mocker()
+    def testPairArgument(self, m):
+        m.get('https://api.dummy.com/api/1/ticker?pair=ETHXBT', json={'bid': '0.03'})
+        m.post('https://api.dummy.com/api/1/postorder', json={'order_id': 'A'})
+        self.assertDictEqual(self.api.get_ticker(pair='ETHXBT'), {'bid': '0.03'})
+        self.api.create_limit_order('sell', 1, '0.04', pair='ETHXBT')
+        self.assertIn('pair=ETHXBT', m.request_history[1].text)
+        self.assertEqual(self.api.pair, 'XBTZAR')
+
+    @requests_mock.Mocker()
+    def testMultiplePairs(self, m):
+        pairs = ['XBTZAR', 'ETHXBT', 'XBTNGN']
+        for i, pair in enumerate(pairs):
+            m.get('https://api.dummy.com/api/1/orderbook?pair=%s' % (pair,), json={
+                'bids': [{'price': str(100 * i + j), 'volume': '1'} for j in range(i + 1)],
+                'asks': [{'price': str(100 * i + 50), 'volume': '2'}]
+            })
+            m.get('https://api.dummy.com/api/1/trades?pair=%s' % (pair,), json={
+                'trades': [{'price': str(i), 'volume': '1', 'timestamp': 1366052621774 + i}]
+            })
+            m.get('https://api.dummy.com/api/1/ticker?pair=%s' % (pair,), json={'pair': pair})
+        df = self.api.get_order_books_frame(pairs)
+        self.assertEqual(list(df.index.names), ['pair', None])
+        self.assertEqual(list(df.loc['XBTNGN'].bids.price), [200, 201, 202])
+        self.assertEqual(len(df.loc['XBTZAR']), 1)
+        df = self.api.get_trades_frames(pairs)
+        self.assertEqual(list(df.index.names), ['pair', 'timestamp'])
+        self.assertEqual(list(df.price), [0, 1, 2])
+        tickers = self.api.get_tickers(pairs)
+        self.assertEqual(dict((pair, t['pair']) for pair, t in tickers.items()), dict(zip(pairs, pairs)))
+
+
+    @requests_mock.Mocker()
+    def testStopAllOrders(self, m):
+        m.get('https://api.dummy.com/api/1/listorders', json={'orders': [{'order_id': 'A'}, {'order_id': 'B'}]})
+        m.post('https://api.dummy.com/api/1/stoporder', json={'success': True})
+        self.assertDictEqual(self.api.stop_all_orders(), {'A': True, 'B': True})
+
+    @requests_mock.Mocker()
+    def testStopAllOrdersParallel(self, m):
+        attempts = {}
+
+        def stop(request, context):
+            order_id = request.text.split('=')[1]
+            attempts[order_id] = attempts.get(order_id, 0) + 1
+            if order_id == 'BUSY' and attempts[order_id] < 3:
+                context.status_code = 503
+                return {'error': 'Service unavailable'}
+            if order_id == 'GONE':
+                context.status_code = 404
+                return {'error': 'Order not found'}
+            return {'success': True}
+
+        orders = [{'order_id': order_id} for order_id in ('A', 'BUSY', 'GONE', 'B', 'C')]
+        m.get('https://api.dummy.com/api/1/listorders', json={'orders': orders})
+        m.post('https://api.dummy.com/api/1/stoporder', json=stop)
+        result = self.api.stop_all_orders(parallel=True, concurrency=2, backoff=0.001)
+        self.assertEqual(list(result), ['A', 'BUSY', 'GONE', 'B', 'C'])
+        for order_id in ('A', 'B', 'C'):
+            self.assertDictEqual(result[order_id], {'success': True, 'attempts': 1, 'error': None})
+        self.assertTrue(result['BUSY']['success'])
+        self.assertEqual(result['BUSY']['attempts'], 3)
+        self.assertFalse(result['GONE']['success'])
+        self.assertEqual(result['GONE']['attempts'], 1)
+        self.assertEqual(result['GONE']['error'].code, 404)
+
+    @requests_mock.Mocker()
+    def testStopOrdersGivesUp(self, m):
+        m.post('https://api.dummy.com/api/1/stoporder', status_code=503, json={'error': 'Service unavailable'})
+        result = self.api.stop_orders(['A'], retries=1, backoff=0.001)
+        self.assertFalse(result['A']['success'])
+        self.assertEqual(result['A']['attempts'], 2)
+        self.assertEqual(result['A']['error'].code, 503)
+
+    @requests_mock.Mocker()
+    def testStopOrdersOnExecutor(self, m):
+        threads = []
+
+        def stop(request, context):
+            threads.append(threading.current_thread().name)
+            return {'success': True}
+
+        m.post('https://api.dummy.com/api/1/stoporder', json=stop)
+        with ThreadPoolExecutor(max_workers=2, thread_name_prefix='sweep') as executor:
+            result = self.api.stop_orders(['A', 'B', 'C'], concurrency=2, executor=executor)
+        self.assertTrue(all(outcome['success'] for outcome in result.values()))
+        self.assertEqual(len(threads), 3)
+        self.assertTrue(all(name.startswith('sweep') for name in threads))
+
+    @requests_mock.Mocker()
+    def testCreateLimitOrders(self, m):
+        def post(request, context):
+            data = dict(s.split('=') for s in request.text.split('&'))
+            if data['price'] == '0':
+                context.status_code = 400
+                return {'error': 'Invalid price'}
+            return {'order_id': 'BX-%s-%s' % (data['type'], data['price'])}
+
+        m.post('https://api.dummy.com/api/1/postorder', json=post)
+        ladder = [('buy', 0.1, 500), ('buy', 0.1, 0), ('sell', 0.2, 700)]
+        result = self.api.create_limit_orders(ladder, concurrency=2)
+        self.assertEqual(list(result.order_id.isnull()), [False, True, False])
+        self.assertEqual(list(result.order_id.dropna()), ['BX-BID-500', 'BX-ASK-700'])
+        self.assertEqual(list(result.attempts), [1, 1, 1])
+        self.assertIsNone(result.error[0])
+        self.assertEqual(result.error[1].code, 400)
+        self.assertEqual(len(m.request_history), 3)
+
+    @requests_mock.Mocker()
+    def testCreateLimitOrdersInputs(self, m):
+        import numpy as np
+        import pandas as pd
+        m.post('https://api.dummy.com/api/1/postorder', json={'order_id': 'BXMC2CJ7HNB88U4'})
+        frame = pd.DataFrame({'type': ['buy', 'sell'], 'volume': [0.1, 0.2], 'price': [500, 700]}, index=[10, 20])
+        result = self.api.create_limit_orders(frame)
+        self.assertEqual(list(result.index), [10, 20])
+        self.assertEqual(list(result.order_type), ['buy', 'sell'])
+        array = np.array([['buy', 0.1, 500], ['sell', 0.2, 700]], dtype=object)
+        result = self.api.create_limit_orders(array)
+        self.assertEqual(list(result.order_id), ['BXMC2CJ7HNB88U4'] * 2)
+        result = self.api.create_limit_orders([{'order_type': 'buy', 'volume': 0.1, 'price': 500}])
+        self.assertEqual(list(result.columns), ['order_type', 'volume', 'price', 'order_id', 'attempts', 'error'])
+        self.assertRaises(ValueError, self.api.create_limit_orders, [{'volume': 0.1, 'price': 500}])
+
+
+class TestCache(unittest.TestCase):
+    def setUp(self):
+        self.api = BitX('mykey', 'mysecret', {'hostname': 'api.dummy.com', 'cache': {'ticker': 60, 'orderbook': 60}})
+
+    @requests_mock.Mocker()
+    def testCachedCalls(self, m):
+        m.get('https://api.dummy.com/api/1/ticker', json={'bid': '924.00'})
+        m.get('https://api.dummy.com/api/1/tickers', json={'tickers': []})
+        for _ in range(3):
+            self.assertEqual(self.api.get_ticker(), {'bid': '924.00'})
+            self.api.get_all_tickers()
+        self.assertEqual(m.call_count, 4)
+        self.api.get_ticker(kind='basic')
+        self.assertEqual(m.call_count, 5)
+
+    @requests_mock.Mocker()
+    def testCachedResponsesAreNotModified(self, m):
+        m.get('https://api.dummy.com/api/1/orderbook', json={'bids': [1, 2, 3], 'asks': [4, 5, 6]})
+        self.assertEqual(self.api.get_order_book(1), {'bids': [1], 'asks': [4]})
+        self.assertEqual(self.api.get_order_book(), {'bids': [1, 2, 3], 'asks': [4, 5, 6]})
+        self.assertEqual(m.call_count, 1)
+
+    @requests_mock.Mocker()
+    def testCoalescedSubmits(self, m):
+        m.get('https://api.dummy.com/api/1/ticker', json={'bid': '924.00'})
+        futures = [self.api.submit(self.api.get_ticker) for _ in range(10)]
+        self.assertTrue(all(f.result() == {'bid': '924.00'} for f in futures))
+        self.assertEqual(m.call_count, 1)
+
+    def testDefaultTTLs(self):
+        api = BitX('', '', {'cache': True})
+        self.assertIn('orderbook', api.cache_ttls)
+        self.assertIsNone(BitX('', '')._cache)
+
+
+class TestThrottling(unittest.TestCase):
+    def setUp(self):
+        options = {
+            'hostname': 'api.dummy.com',
+            'rate_limits': {'public_get': 1000, 'auth_post': 1000},
+            'retries': 2,
+            'backoff': 0.001
+        }
+        self.api = BitX('mykey', 'mysecret', options)
+
+    def testInvalidBudget(self):
+        self.assertRaises(ValueError, BitX, '', '', {'rate_limits': {'auth_put': 1}})
+        self.assertEqual(len(BitX('', '', {'rate_limits': True})._limiters), 4)
+
+    @requests_mock.Mocker()
+    def testGetRetries(self, m):
+        m.get('https://api.dummy.com/api/1/ticker', [
+            {'status_code': 503, 'json': {'error': 'Unavailable'}},
+            {'status_code': 429, 'json': {'error': 'Too many requests'}},
+            {'json': {'bid': '924.00'}}
+        ])
+        self.assertEqual(self.api.get_ticker(kind='basic'), {'bid': '924.00'})
+        self.assertEqual(m.call_count, 3)
+        limiter = self.api._limiters[('public', 'get')]
+        self.assertLess(limiter.rate, limiter.max_rate)
+
+    @requests_mock.Mocker()
+    def testRetriesAreBounded(self, m):
+        m.get('https://api.dummy.com/api/1/balance', status_code=503, json={'error': 'Unavailable'})
+        self.assertRaises(BitXAPIError, self.api.get_balance)
+        self.assertEqual(m.call_count, 3)
+
+    @requests_mock.Mocker()
+    def testPermanentErrorsAndPostsAreNotRetried(self, m):
+        m.get('https://api.dummy.com/api/1/balance', status_code=401, json={'error': 'Unauthorized'})
+        m.post('https://api.dummy.com/api/1/postorder', status_code=503, json={'error': 'Unavailable'})
+        self.assertRaises(BitXAPIError, self.api.get_balance)
+        self.assertRaises(BitXAPIError, self.api.create_limit_order, 'buy', 0.1, 500)
+        self.assertEqual(m.call_count, 2)
+
+    @requests_mock.Mocker()
+    def testRetryAfter(self, m):
+        m.post('https://api.dummy.com/api/1/postorder', status_code=429, headers={'Retry-After': '2'},
+               json={'error': 'Too many requests'})
+        with self.assertRaises(BitXAPIError) as cm:
+            self.api.create_limit_order('buy', 0.1, 500)
+        self.assertEqual(cm.exception.retry_after(), 2.0)
+        limiter = self.api._limiters[('auth', 'post')]
+        self.assertEqual(limiter.rate, 500)
+        self.assertGreater(limiter.delay(), 1.9)
+
+    def testBackoffDelay(self):
+        self.api.backoff, self.api.max_backoff = 1, 4
+        for attempt in range(1, 8):
+            self.assertLessEqual(self.api.backoff_delay(attempt), min(4, 2 ** (attempt - 1)))
+
+
+class TestDecoder(unittest.TestCase):
+    def testDecoderOption(self):
+        from pybitx import decoding
+        self.assertIs(BitX('', '', {'json': 'json'}).loads, decoding.json_loads)
+        self.assertIs(BitX('', '', {}).loads, decoding.get_decoder('auto'))
+        self.assertRaises(ValueError, BitX, '', '', {'json': 'simplejson'})
+
+    @requests_mock.Mocker()
+    def testCustomDecoder(self, m):
+        bodies = []
+
+        def loads(content):
+            bodies.append(content)
+            return json.loads(content)
+
+        api = BitX('', '', {'hostname': 'api.dummy.com', 'json': loads})
+        m.get('https://api.dummy.com/api/1/trades', text='{"trades": [{"price": "1.5", "volume": "2", '
+                                                       '"timestamp": 1366052621774}]}')
+        df = api.get_trades_frame()
+        self.assertEqual(df.price.iloc[0], 1.5)
+        self.assertIsInstance(bodies[0], bytes)
+
+    @requests_mock.Mocker()
+    def testInvalidJson(self, m):
+        m.get('https://api.dummy.com/api/1/ticker', text='<html>Bad gateway</html>')
+        api = BitX('', '', {'hostname': 'api.dummy.com'})
+        with self.assertRaises(BitXAPIError) as cm:
+            api.get_ticker()
+        self.assertIn('Bad gateway', str(cm.exception))
+
+
+class TestExactMode(unittest.TestCase):
+    def setUp(self):
+        options = {
+            'hostname': 'api.dummy.com',
+            'numeric': 'exact',
+            'price_decimals': 2,
+            'tick_size': '1',
+            'lot_size': '0.0001'
+        }
+        self.api = BitX('mykey', 'mysecret', options)
+
+    def testInvalidMode(self):
+        self.assertRaises(ValueError, BitX, '', '', {'numeric': 'double'})
+
+    @requests_mock.Mocker()
+    def testDecimalResponses(self, m):
+        from decimal import Decimal
+        m.get('https://api.dummy.com/api/1/ticker?pair=XBTZAR', json={'bid': '924.00', 'timestamp': 1366224386716})
+        m.get('https://api.dummy.com/api/1/accounts/1/transactions',
+              text='{"transactions": [{"row_index": 1, "timestamp": 1429908701000, "balance": 0.1, "available": 0.1,'
+                   ' "balance_delta": 0.1, "available_delta": 0.1}]}')
+        ticker = self.api.get_ticker()
+        self.assertEqual(ticker['bid'], Decimal('924.00'))
+        self.assertEqual(ticker['timestamp'], 1366224386716)
+        row = self.api.get_transactions('1')['transactions'][0]
+        self.assertEqual(row['balance'], Decimal('0.1'))
+        df = self.api.get_transactions_frame('1')
+        self.assertEqual(df.balance.iloc[0], 10000000)
+
+    @requests_mock.Mocker()
+    def testPlainRequests(self, m):
+        m.get('https://api.dummy.com/api/1/orderbook', json={'bids': [{'price': '924.00', 'volume': '0.5'}],
+                                                             'asks': [{'price': '950.00', 'volume': '1.25'}]})
+        self.assertEqual(self.api.get_order_book()['bids'][0]['price'], Decimal('924.00'))
+        self.assertEqual(self.api.get_order_book(plain=True)['bids'][0]['price'], '924.00')
+        df = self.api.get_order_book_frame()
+        self.assertEqual(df.asks.volume.iloc[0], 125000000)
+
+    @requests_mock.Mocker()
+    def testFixedFrame(self, m):
+        m.get('https://api.dummy.com/api/1/trades', json={'trades': [
+            {'volume': '0.10', 'timestamp': 1366052621774, 'price': '1000.25'}]})
+        df = self.api.get_trades_frame()
+        self.assertEqual(df.price.iloc[0], 100025)
+        self.assertEqual(df.volume.iloc[0], 10000000)
+
+    @requests_mock.Mocker()
+    def testOrderRounding(self, m):
+        m.post('https://api.dummy.com/api/1/postorder', json={'order_id': 'BXMC2CJ7HNB88U4'})
+        self.api.create_limit_order('buy', 0.1 + 0.2, 4900.7)
+        self.api.create_limit_order('sell', '0.12345', 4900.2)
+        buy, sell = [dict(s.split('=') for s in r.text.split('&')) for r in m.request_history]
+        self.assertEqual((buy['volume'], buy['price']), ('0.3000', '4900'))
+        self.assertEqual((sell['volume'], sell['price']), ('0.1234', '4901'))
+
+
 def main():
     unittest.main()
 
@@ -0,0 +1,103 @@
+import threading
+import time
+import unittest
+
+from pybitx.cache import ResponseCache
+from tests.helpers import FakeClock
+
+
+class TestResponseCache(unittest.TestCase):
+    def setUp(self):
+        self.clock = FakeClock()
+        self.cache = ResponseCache(maxsize=2, clock=self.clock)
+        self.calls = []
+
+    def fetcher(self, value):
+        def fetch():
+            self.calls.append(value)
+            return value
+        return fetch
+
+    def testTTL(self):
+        self.assertEqual(self.cache.get('a', 1.0, self.fetcher(1)), 1)
+        self.clock.now = 0.9
+        self.assertEqual(self.cache.get('a', 1.0, self.fetcher(2)), 1)
+        self.clock.now = 1.0
+        self.assertEqual(self.cache.get('a', 1.0, self.fetcher(3)), 3)
+        self.assertEqual(self.calls, [1, 3])
+        self.assertEqual((self.cache.hits, self.cache.misses), (1, 2))
+
+    def testLRUEviction(self):
+        self.cache.get('a', 10, self.fetcher('a'))
+        self.cache.get('b', 10, self.fetcher('b'))
+        self.cache.get('a', 10, self.fetcher('a'))
+        self.cache.get('c', 10, self.fetcher('c'))
+        self.assertEqual(len(self.cache), 2)
+        self.cache.get('a', 10, self.fetcher('a'))
+        self.cache.get('b', 10, self.fetcher('b'))
+        self.assertEqual(self.calls, ['a', 'b', 'c', 'b'])
+
+    def testErrorsAreNotCached(self):
+        def fail():
+            raise ValueError('boom')
+        self.assertRaises(ValueError, self.cache.get, 'a', 10, fail)
+        self.assertEqual(self.cache.get('a', 10, self.fetcher(1)), 1)
+
+    def testCoalescing(self):
+        cache = ResponseCache()
+        started = threading.Event()
+        release = threading.Event()
+
+        def slow():
+            self.calls.append(1)
+            started.set()
+            release.wait(2)
+            return 'value'
+
+        results = []
+        threads = [threading.Thread(target=lambda: results.append(cache.get('k', 10, slow))) for _ in range(8)]
+        threads[0].start()
+        started.wait(2)
+        for t in threads[1:]:
+            t.start()
+        while cache.coalesced < 7:
+            time.sleep(0.001)
+        release.set()
+        for t in threads:
+            t.join()
+        self.assertEqual(results, ['value'] * 8)
+        self.assertEqual(self.calls, [1])
+
+    def testCoalescedErrors(self):
+        cache = ResponseCache()
+        started = threading.Event()
+        release = threading.Event()
+
+        def fail():
+            started.set()
+            release.wait(2)
+            raise ValueError('boom')
+
+        errors = []
+
+        def call():
+            try:
+                cache.get('k', 10, fail)
+            except ValueError as e:
+                errors.append(e)
+
+        threads = [threading.Thread(target=call) for _ in range(3)]
+        threads[0].start()
+        started.wait(2)
+        for t in threads[1:]:
+            t.start()
+        while cache.coalesced < 2:
+            time.sleep(0.001)
+        release.set()
+        for t in threads:
+            t.join()
+        self.assertEqual(len(errors), 3)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,124 @@
+import unittest
+
+import numpy as np
+import pandas as pd
+import requests_mock
+
+from pybitx.api import BitX
+from pybitx.candles import CandleEngine, interval_seconds
+from pybitx.frames import trades_frame
+
+
+def random_trades(n, seed=1, start=1366052400000):
+    rng = np.random.RandomState(seed)
+    timestamps = start + np.cumsum(rng.randint(0, 20000, n))
+    prices = 1000 + np.cumsum(rng.randn(n))
+    volumes = rng.rand(n)
+    return timestamps, prices, volumes
+
+
+def resampled(timestamps, prices, volumes, seconds):
+    df = pd.DataFrame({'price': prices, 'volume': volumes},
+                      index=pd.DatetimeIndex(np.asarray(timestamps).view('datetime64[ms]')))
+    # Bars are aligned to the Unix epoch
+    rule = '%ds' % (seconds,)
+    bars = df.price.resample(rule, origin='epoch').ohlc()
+    bars['volume'] = df.volume.resample(rule, origin='epoch').sum()
+    bars['trades'] = df.price.resample(rule, origin='epoch').count()
+    return bars[bars.trades > 0]
+
+
+class TestCandles(unittest.TestCase):
+    def assertMatchesPandas(self, engine, interval, trades, last=None):
+        expected = resampled(*trades, seconds=interval_seconds(interval))
+        if last is not None:
+            expected = expected.iloc[-last:]
+        candles = engine.candles(interval)
+        self.assertEqual(list(candles.index), list(expected.index))
+        for field in ('open', 'high', 'low', 'close', 'volume'):
+            np.testing.assert_allclose(candles[field].to_numpy(), expected[field].to_numpy())
+        np.testing.assert_array_equal(candles.trades.to_numpy(), expected.trades.to_numpy())
+
+    def testIntervalSeconds(self):
+        self.assertEqual([interval_seconds(i) for i in ('30s', '5m', '1h', '1d', 90)], [30, 300, 3600, 86400, 90])
+
+    def testIncrementalMatchesResample(self):
+        trades = random_trades(5000)
+        engine = CandleEngine(['1m', '5m', '7m', '1h'], capacity=100000)
+        for chunk in np.array_split(np.arange(5000), 37):
+            engine.add(*[values[chunk] for values in trades])
+        for interval in ('1m', '5m', '7m', '1h'):
+            self.assertMatchesPandas(engine, interval, trades)
+
+    def testRingBuffer(self):
+        trades = random_trades(3000)
+        engine = CandleEngine(['1m'], capacity=50)
+        for chunk in np.array_split(np.arange(3000), 10):
+            engine.add(*[values[chunk] for values in trades])
+        self.assertEqual(len(engine.rings[60]), 50)
+        self.assertMatchesPandas(engine, '1m', trades, last=50)
+        current = engine.current('1m')
+        self.assertEqual(current['close'], trades[1][-1])
+        self.assertEqual(current['timestamp'], trades[0][-1] - trades[0][-1] % 60000)
+
+    def testLateTrades(self):
+        engine = CandleEngine(['1m'])
+        self.assertIsNone(engine.current('1m'))
+        engine.add([120000, 60000], [2.0, 1.0], [1, 1])
+        self.assertEqual(engine.candles('1m').open.tolist(), [1.0, 2.0])
+        self.assertEqual(engine.add([90000, 120000], [5.0, 3.0], [1, 1]), 1)
+        self.assertEqual(engine.late, 1)
+        self.assertEqual(engine.current('1m')['close'], 3.0)
+        self.assertRaises(ValueError, engine.candles, '5m')
+
+    def testFrames(self):
+        q = {'trades': [{'price': '1000.50', 'volume': '0.5', 'timestamp': 1366052621774},
+                        {'price': '1001.00', 'volume': '0.25', 'timestamp': 1366052601774}]}
+        for decimals in (None, {'price': 2, 'volume': 8}):
+            engine = CandleEngine(['1m'])
+            engine.update(trades_frame(q, decimals))
+            bar = engine.current('1m')
+            self.assertEqual((bar['open'], bar['close'], bar['volume'], bar['trades']), (1001.0, 1000.5, 0.75, 2))
+
+    def mockTrades(self, m, trades, page=2):
+        def respond(request, context):
+            since = int(request.qs['since'][0]) if 'since' in request.qs else 0
+            newer = [t for t in trades if t['timestamp'] >= since]
+            # Newest first, at most `page` per call
+            return {'trades': sorted(newer, key=lambda t: t['timestamp'])[:page][::-1]}
+        m.get('https://api.dummy.com/api/1/trades', json=respond)
+
+    @requests_mock.Mocker()
+    def testSync(self, m):
+        api = BitX('', '', {'hostname': 'api.dummy.com'})
+        trades = [{'price': '1', 'volume': '1', 'timestamp': 60000},
+                  {'price': '2', 'volume': '1', 'timestamp': 60500},
+                  {'price': '3', 'volume': '1', 'timestamp': 61000}]
+        self.mockTrades(m, trades[:2])
+        engine = CandleEngine(['1m'])
+        self.assertEqual(engine.sync(api), 2)
+        self.mockTrades(m, trades)
+        self.assertEqual(engine.sync(api), 1)
+        self.assertIn('since=60500', m.request_history[2].url)
+        bar = engine.current('1m')
+        self.assertEqual((bar['open'], bar['high'], bar['close'], bar['trades']), (1, 3, 3, 3))
+
+    @requests_mock.Mocker()
+    def testSyncPagesAndKeepsSameMillisecondTrades(self, m):
+        api = BitX('', '', {'hostname': 'api.dummy.com'})
+        trades = [{'price': str(100 + i), 'volume': '1', 'timestamp': 60000 + 100 * i} for i in range(7)]
+        trades += [{'price': '200', 'volume': '1', 'timestamp': 60600},
+                   {'price': '106', 'volume': '1', 'timestamp': 60600}]
+        # Only the first of the trades at 60600 has happened by the first sync
+        self.mockTrades(m, trades[:7], page=3)
+        engine = CandleEngine(['1m'])
+        self.assertEqual(engine.sync(api), 7)
+        self.mockTrades(m, trades, page=3)
+        self.assertEqual(engine.sync(api), 2)
+        self.assertEqual(engine.sync(api), 0)
+        bar = engine.current('1m')
+        self.assertEqual((bar['open'], bar['high'], bar['trades'], bar['volume']), (100, 200, 9, 9))
+        self.assertEqual(engine.late, 0)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,89 @@
+import unittest
+
+import numpy as np
+import pandas as pd
+
+from pybitx.frames import order_book_frame, trades_frame, orders_frame, transactions_frame, records_frame
+
+
+class TestFrames(unittest.TestCase):
+    def testOrderBookFrame(self):
+        q = {
+            "timestamp": 1366305398592,
+            "bids": [{"volume": "0.10", "price": "1100.00"}, {"volume": "0.20", "price": "1000.00"}],
+            "asks": [{"volume": "0.30", "price": "1180.00"}]
+        }
+        df = order_book_frame(q)
+        self.assertEqual(list(df.columns), [('asks', 'price'), ('asks', 'volume'), ('bids', 'price'), ('bids', 'volume')])
+        self.assertTrue((df.dtypes == np.float64).all())
+        self.assertEqual(df['bids', 'price'].tolist(), [1100.0, 1000.0])
+        self.assertEqual(df['asks', 'volume'][0], 0.3)
+        self.assertTrue(np.isnan(df['asks', 'price'][1]))
+
+    def testEmptyOrderBookFrame(self):
+        df = order_book_frame({'bids': [], 'asks': []})
+        self.assertEqual(len(df), 0)
+        self.assertEqual(len(df.columns), 4)
+
+    def testTradesFrame(self):
+        trades = {"trades": [
+            {"volume": "0.10", "timestamp": 1366052621774, "price": "1000.00", "is_buy": False},
+            {"volume": "1.20", "timestamp": 1366052621770, "price": "1020.50", "is_buy": True}
+        ]}
+        df = trades_frame(trades)
+        self.assertEqual(df.index.name, 'timestamp')
+        self.assertEqual(df.index[0], pd.Timestamp('2013-04-15 19:03:41.774'))
+        self.assertNotIn('timestamp', df.columns)
+        self.assertEqual(df.price.dtype, np.float64)
+        self.assertEqual(df.volume.tolist(), [0.1, 1.2])
+        self.assertEqual(df.is_buy.tolist(), [False, True])
+
+    def testOrdersFrame(self):
+        q = {"orders": [
+            {"base": "0.027496", "counter": "81.140696", "creation_timestamp": 1423990327333,
+             "expiration_timestamp": 0, "fee_base": "0.00", "fee_counter": "0.00", "limit_price": "2951.00",
+             "limit_volume": "0.027496", "order_id": "BXF3J88PZAYGXH7", "pair": "XBTZAR", "state": "COMPLETE",
+             "type": "ASK"}
+        ]}
+        df = orders_frame(q)
+        self.assertEqual(df.index.name, 'creation_timestamp')
+        self.assertEqual(df.index[0], pd.Timestamp('2015-02-15 08:52:07.333'))
+        self.assertEqual(df.expiration_timestamp.iloc[0], pd.Timestamp(0))
+        self.assertEqual(df.limit_price.dtype, np.float64)
+        self.assertEqual(df.limit_price.iloc[0], 2951.0)
+        self.assertEqual(df.order_id.iloc[0], 'BXF3J88PZAYGXH7')
+        self.assertEqual(len(orders_frame({'orders': None})), 0)
+
+    def testTransactionsFrame(self):
+        tx = {"id": "319232323", "transactions": [
+            {"row_index": 2, "timestamp": 1429908835000, "balance": 0.08, "available": 0.08, "balance_delta": -0.02,
+             "available_delta": -0.02, "currency": "XBT", "description": "Sold 0.02 BTC"},
+            {"row_index": 1, "timestamp": 1429908701000, "balance": 0.1, "available": 0.1, "balance_delta": 0.1,
+             "available_delta": 0.1, "currency": "XBT", "description": "Bought 0.1 BTC"}
+        ]}
+        df = transactions_frame(tx)
+        self.assertEqual(df.row_index.dtype, np.int64)
+        self.assertEqual(df.balance_delta.tolist(), [-0.02, 0.1])
+        self.assertEqual(df.index[1], pd.Timestamp('2015-04-24 20:51:41'))
+
+    def testRaggedRecords(self):
+        rows = [{'price': '1', 'timestamp': 1000}, {'price': '2', 'timestamp': 2000, 'note': 'x'}, {'note': 'y'}]
+        df = records_frame(rows, floats=('price',), timestamps=('timestamp',))
+        self.assertEqual(list(df.columns), ['price', 'timestamp', 'note'])
+        self.assertTrue(np.isnan(df.price[2]))
+        self.assertTrue(pd.isnull(df.timestamp[2]))
+        self.assertTrue(pd.isnull(df.note[0]))
+
+    def testSameLengthDifferentKeys(self):
+        rows = [{'price': '1', 'volume': '2'}, {'price': '3', 'note': 'x'}]
+        df = records_frame(rows, floats=('price', 'volume'))
+        self.assertEqual(list(df.columns), ['price', 'volume', 'note'])
+        self.assertEqual(df.price.tolist(), [1.0, 3.0])
+        self.assertTrue(np.isnan(df.volume[1]))
+        self.assertTrue(pd.isnull(df.note[0]))
+        fixed = records_frame(rows, fixed={'price': 2, 'volume': 2})
+        self.assertEqual(fixed.volume.tolist(), [200, 0])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,107 @@
+import json
+import threading
+import unittest
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import requests
+import requests_mock
+
+from pybitx.api import BitX
+from pybitx.metrics import Histogram, Metrics, endpoint_name
+
+
+class TickerHandler(BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'
+
+    def log_message(self, format, *args):
+        pass
+
+    def do_GET(self):
+        body = json.dumps({'bid': '924.00'}).encode('utf-8')
+        self.send_response(200)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+
+class TestMetrics(unittest.TestCase):
+    def testEndpointName(self):
+        self.assertEqual(endpoint_name('ticker'), 'ticker')
+        self.assertEqual(endpoint_name('orders/BXMC2CJ7HNB88U4'), 'orders/:id')
+        self.assertEqual(endpoint_name('accounts/319232323/transactions'), 'accounts/:id/transactions')
+
+    def testHistogram(self):
+        h = Histogram()
+        self.assertIsNone(h.percentile(50))
+        for i in range(1, 101):
+            h.add(i / 1000.0)
+        summary = h.summary()
+        self.assertEqual(summary['count'], 100)
+        self.assertAlmostEqual(summary['mean'], 0.0505)
+        self.assertEqual(summary['max'], 0.1)
+        # Bucket bounds are within a factor of two above the true percentile
+        self.assertTrue(0.05 <= summary['p50'] <= 0.1)
+        self.assertTrue(0.099 <= summary['p99'] <= 0.1)
+
+    def testHooks(self):
+        metrics = Metrics()
+        events = []
+        metrics.add_hook(events.append)
+        metrics.add_hook(lambda event: 1 / 0)
+        with self.assertLogs('pybitx.metrics', 'ERROR'):
+            metrics.record('orders/BX1', 'get', 200, 0.01, server=0.008, decode=0.001, size=120)
+        self.assertEqual(events[0].endpoint, 'orders/:id')
+        self.assertEqual(events[0].size, 120)
+        metrics.remove_hook(events.append)
+        metrics.record('orders/BX1', 'get', 500, 0.01, error=True)
+        self.assertEqual(len(events), 1)
+        summary = metrics.summary()['orders/:id']
+        self.assertEqual((summary['requests'], summary['errors'], summary['bytes']), (2, 1, 120))
+        self.assertEqual(summary['server']['count'], 1)
+        metrics.reset()
+        self.assertNotIn('orders/:id', metrics.summary())
+
+    @requests_mock.Mocker()
+    def testClientMetrics(self, m):
+        api = BitX('', '', {'hostname': 'api.dummy.com', 'metrics': True, 'retries': 1, 'backoff': 0})
+        m.get('https://api.dummy.com/api/1/trades', json={'trades': [{'price': '1', 'volume': '1',
+                                                                      'timestamp': 1366052621774}]})
+        m.get('https://api.dummy.com/api/1/ticker', [{'status_code': 503, 'json': {'error': 'Unavailable'}},
+                                                     {'json': {'bid': '924.00'}}])
+        api.get_trades_frame()
+        api.get_ticker()
+        summary = api.metrics.summary()
+        self.assertEqual(summary['trades']['requests'], 1)
+        self.assertEqual(summary['trades']['frame']['count'], 1)
+        self.assertGreater(summary['trades']['bytes'], 0)
+        self.assertEqual((summary['ticker']['requests'], summary['ticker']['errors'], summary['ticker']['retries']),
+                         (2, 1, 1))
+        m.get('https://api.dummy.com/api/1/balance', exc=requests.ConnectTimeout)
+        self.assertRaises(requests.ConnectTimeout, api.get_balance)
+        summary = api.metrics.summary()['balance']
+        self.assertEqual((summary['requests'], summary['errors'], summary['retries']), (2, 2, 1))
+        self.assertNotIn('server', summary)
+
+    def testConnectionReuse(self):
+        server = ThreadingHTTPServer(('127.0.0.1', 0), TickerHandler)
+        server.daemon_threads = True
+        thread = threading.Thread(target=server.serve_forever)
+        thread.daemon = True
+        thread.start()
+        try:
+            api = BitX('', '', {'hostname': '127.0.0.1', 'port': server.server_address[1], 'scheme': 'http',
+                                'metrics': True})
+            for _ in range(4):
+                api.get_ticker(kind='basic')
+            connections = api.metrics.summary()['connections']
+            self.assertEqual((connections['opened'], connections['requests']), (1, 4))
+            self.assertEqual(connections['reuse_rate'], 0.75)
+            api.close()
+        finally:
+            server.shutdown()
+            server.server_close()
+
+
+if __name__ == '__main__':
+    unittest.main()
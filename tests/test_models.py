@@ -0,0 +1,67 @@
+import pickle
+import sys
+import unittest
+from decimal import Decimal
+
+from pybitx.models import (ModelList, Order, Ticker, Trade, parse_order_book, parse_orders, parse_ticker,
+                           parse_trades, parse_transactions)
+
+
+TRADES = {'trades': [{'volume': '0.10', 'timestamp': 1366052621774, 'price': '1000.50', 'is_buy': True},
+                     {'volume': '0.25', 'timestamp': 1366052621770, 'price': '1000.00', 'is_buy': False}]}
+
+
+class TestModels(unittest.TestCase):
+    def testTrade(self):
+        trade = Trade.from_dict(TRADES['trades'][0])
+        self.assertEqual((trade.timestamp, trade.price, trade.volume, trade.is_buy), (1366052621774, 1000.5, 0.1, True))
+        self.assertIsNone(trade.extra)
+        self.assertFalse(hasattr(trade, '__dict__'))
+        self.assertRaises(AttributeError, setattr, trade, 'fee', 1)
+        exact = Trade.from_dict(TRADES['trades'][0], exact=True)
+        self.assertEqual((exact.price, exact.volume), (Decimal('1000.50'), Decimal('0.10')))
+        self.assertEqual(trade, Trade(1366052621774, 1000.5, 0.1, True))
+        self.assertEqual(pickle.loads(pickle.dumps(trade)), trade)
+        self.assertEqual(repr(Trade(1, 2.0)), 'Trade(timestamp=1, price=2.0, volume=None, is_buy=None)')
+
+    def testUnknownAndMissingFields(self):
+        order = Order.from_dict({'order_id': 'BX1', 'state': 'PENDING', 'limit_price': '1000', 'side': 'new'})
+        self.assertEqual(order.extra, {'side': 'new'})
+        self.assertIsNone(order.base)
+        self.assertEqual(order.to_dict()['side'], 'new')
+        self.assertEqual(Order(order_id='BX2', side='new').extra, {'side': 'new'})
+
+    def testInterning(self):
+        pair = ''.join(['XBT', 'ZAR'])
+        ticker = parse_ticker({'pair': pair, 'timestamp': 1, 'bid': '1', 'ask': '2', 'last_trade': '1',
+                               'rolling_24_hour_volume': '3'})
+        self.assertIs(ticker.pair, sys.intern('XBTZAR'))
+        self.assertIsInstance(ticker, Ticker)
+
+    def testLazyList(self):
+        raw = [dict(row) for row in TRADES['trades']]
+        trades = parse_trades({'trades': raw})
+        self.assertEqual(len(trades), 2)
+        self.assertIsInstance(trades._items[1], dict)
+        self.assertEqual(trades[-1].price, 1000.0)
+        self.assertIsInstance(trades._items[1], Trade)
+        self.assertIsInstance(trades._items[0], dict)
+        self.assertEqual([t.volume for t in trades[:1]], [0.1])
+        self.assertEqual([t.volume for t in trades.materialize()], [0.1, 0.25])
+        # The response's own list is left alone
+        self.assertIsInstance(raw[0], dict)
+
+    def testParsers(self):
+        bids, asks = parse_order_book({'timestamp': 1, 'bids': [{'price': '99', 'volume': '1'}],
+                                       'asks': [{'price': '101', 'volume': '2'}]})
+        self.assertEqual((bids[0].price, asks[0].volume), (99.0, 2.0))
+        self.assertEqual(len(parse_orders({'orders': None})), 0)
+        transactions = parse_transactions({'transactions': [
+            {'row_index': 2, 'timestamp': 1429908701000, 'balance': 0.08, 'available': 0.08, 'balance_delta': -0.02,
+             'available_delta': -0.02, 'currency': 'XBT', 'description': 'Withdrawal'}]}, exact=True)
+        self.assertEqual(transactions[0].balance_delta, Decimal('-0.02'))
+        self.assertIsInstance(transactions, ModelList)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,68 @@
+import unittest
+from decimal import Decimal, ROUND_DOWN, ROUND_CEILING
+
+import numpy as np
+
+from pybitx.frames import order_book_frame, trades_frame, transactions_frame
+from pybitx.numeric import format_number, to_exact, fixed_column, from_fixed
+
+
+class TestNumeric(unittest.TestCase):
+    def testFormatNumber(self):
+        self.assertEqual(format_number(0.1), '0.1')
+        self.assertEqual(format_number(500), '500')
+        self.assertEqual(format_number(0.1 + 0.2, '0.0001'), '0.3000')
+        self.assertEqual(format_number(1e-7), '0.0000001')
+        self.assertEqual(format_number(np.float64(0.1)), '0.1')
+        self.assertEqual(format_number('0.123456', '0.001', ROUND_DOWN), '0.123')
+        self.assertEqual(format_number(Decimal('4900.01'), 1, ROUND_CEILING), '4901')
+        self.assertEqual(format_number(4905, 10, ROUND_DOWN), '4900')
+
+    def testToExact(self):
+        result = to_exact({'ticker': {'bid': '924.00', 'pair': 'XBTZAR', 'timestamp': 1366224386716},
+                           'transactions': [{'balance': 0.08, 'row_index': 2}]})
+        self.assertEqual(result['ticker']['bid'], Decimal('924.00'))
+        self.assertEqual(result['ticker']['pair'], 'XBTZAR')
+        self.assertEqual(result['ticker']['timestamp'], 1366224386716)
+        self.assertEqual(result['transactions'][0]['balance'], Decimal('0.08'))
+        self.assertEqual(result['transactions'][0]['row_index'], 2)
+
+    def testFixedColumn(self):
+        column = fixed_column(['0.1', Decimal('0.2'), '92233720368.54775807', '0.000000005'], 8, 4)
+        self.assertEqual(column.dtype, np.int64)
+        self.assertEqual(column.tolist(), [10000000, 20000000, 9223372036854775807, 0])
+        self.assertEqual(column[:2].sum(), 30000000)
+        self.assertEqual(from_fixed(column[:2], 8).tolist(), [0.1, 0.2])
+
+    def testFixedColumnMatchesDecimal(self):
+        import random
+        from decimal import ROUND_HALF_EVEN
+        rng = random.Random(3)
+        values = ['%.*f' % (rng.randint(0, 12), rng.uniform(-1e7, 1e7)) for _ in range(20000)]
+        values += ['0.125', '0.135', '-0.125', '2.675', '1e-7', '123456789012.345678']
+        column = fixed_column(values, 2, len(values))
+        expected = [int(Decimal(v).quantize(Decimal('0.01'), ROUND_HALF_EVEN).scaleb(2)) for v in values]
+        self.assertEqual(column.tolist(), expected)
+
+    def testFixedFrames(self):
+        decimals = {'price': 2, 'volume': 8}
+        q = {"bids": [{"volume": "0.10", "price": "1100.00"}, {"volume": "0.20", "price": "1000.00"}],
+             "asks": [{"volume": "0.30", "price": "1180.01"}]}
+        df = order_book_frame(q, decimals)
+        self.assertEqual(df['asks', 'price'].tolist(), [118001, 0])
+        self.assertEqual(df['bids', 'volume'].tolist(), [10000000, 20000000])
+        self.assertEqual(df.attrs['decimals'], {'price': 2, 'volume': 8})
+        trades = {"trades": [{"volume": Decimal("0.1"), "timestamp": 1366052621774, "price": Decimal("1000.5")}]}
+        df = trades_frame(trades, decimals)
+        self.assertEqual(df.price.dtype, np.int64)
+        self.assertEqual(df.price.iloc[0], 100050)
+        self.assertEqual(df.attrs['decimals'], {'price': 2, 'volume': 8})
+        tx = {"transactions": [{"row_index": 1, "timestamp": 1429908701000, "balance": Decimal("0.1"),
+                                "available": Decimal("0.1"), "balance_delta": Decimal("0.1"),
+                                "available_delta": Decimal("0.1"), "currency": "XBT"}]}
+        df = transactions_frame(tx, decimals)
+        self.assertEqual(df.balance.iloc[0], 10000000)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,101 @@
+import random
+import unittest
+
+import requests_mock
+
+from pybitx.api import BitX
+from pybitx.orderbook import LocalOrderBook
+
+
+SNAPSHOT = {
+    "timestamp": 1366305398592,
+    "bids": [
+        {"volume": "0.10", "price": "1100.00"},
+        {"volume": "0.25", "price": "1000.00"},
+        {"volume": "0.50", "price": "1000.00"},
+        {"volume": "0.10", "price": "900.00"}
+    ],
+    "asks": [
+        {"volume": "0.10", "price": "1180.00"},
+        {"volume": "0.30", "price": "2000.00"}
+    ]
+}
+
+
+def levels(book, side):
+    prices, volumes = book.depth(side)
+    return list(zip(prices.tolist(), volumes.tolist()))
+
+
+class TestLocalOrderBook(unittest.TestCase):
+    def setUp(self):
+        self.book = LocalOrderBook(SNAPSHOT)
+
+    def testSeed(self):
+        self.assertEqual(self.book.timestamp, 1366305398592)
+        self.assertEqual(levels(self.book, 'bids'), [(1100.0, 0.1), (1000.0, 0.75), (900.0, 0.1)])
+        self.assertEqual(levels(self.book, 'asks'), [(1180.0, 0.1), (2000.0, 0.3)])
+        self.assertEqual(self.book.best_bid, 1100.0)
+        self.assertEqual(self.book.best_ask, 1180.0)
+        self.assertEqual(self.book.spread, 80.0)
+        self.assertEqual(self.book.mid, 1140.0)
+
+    def testUpdates(self):
+        self.book.apply([('bids', '1100.00', 0), ('asks', '1150.00', '0.5'), ('bid', 950, 1)], timestamp=1)
+        self.assertEqual(self.book.best_bid, 1000.0)
+        self.assertEqual(self.book.best_ask, 1150.0)
+        self.assertEqual(levels(self.book, 'bids'), [(1000.0, 0.75), (950.0, 1.0), (900.0, 0.1)])
+        self.assertEqual(self.book.timestamp, 1)
+        self.assertRaises(ValueError, self.book.update, 'middle', 1, 1)
+
+    def testEmptySide(self):
+        book = LocalOrderBook({'bids': [], 'asks': [{'price': '10', 'volume': '1'}]})
+        self.assertIsNone(book.best_bid)
+        self.assertIsNone(book.spread)
+        self.assertEqual(len(book.depth('bids')[0]), 0)
+
+    def testCumulativeVolume(self):
+        prices, cumulative = self.book.cumulative_volume('bids', 2)
+        self.assertEqual(prices.tolist(), [1100.0, 1000.0])
+        self.assertAlmostEqual(cumulative[-1], 0.85)
+        self.assertAlmostEqual(self.book.volume_to('bids', 1000), 0.85)
+        self.assertAlmostEqual(self.book.volume_to('asks', 1500), 0.1)
+
+    def testSyncOnlyTouchesChanges(self):
+        snapshot = {
+            "timestamp": 1366305399000,
+            "bids": [{"volume": "0.10", "price": "1100.00"}, {"volume": "0.50", "price": "1000.00"}],
+            "asks": [{"volume": "0.10", "price": "1180.00"}, {"volume": "0.30", "price": "2000.00"}]
+        }
+        updates = self.book.sync(snapshot)
+        self.assertEqual(sorted(updates), [('bids', 900.0, 0.0), ('bids', 1000.0, 0.5)])
+        self.assertEqual(self.book.timestamp, 1366305399000)
+        self.assertEqual(self.book.sync(snapshot), [])
+
+    def testRandomUpdatesMatchNaiveBook(self):
+        rng = random.Random(7)
+        naive = {'bids': {}, 'asks': {}}
+        book = LocalOrderBook()
+        for _ in range(5000):
+            side = rng.choice(['bids', 'asks'])
+            price = float(rng.randint(1, 200))
+            volume = rng.choice([0.0, float(rng.randint(1, 10))])
+            book.update(side, price, volume)
+            if volume:
+                naive[side][price] = volume
+            else:
+                naive[side].pop(price, None)
+        self.assertEqual(levels(book, 'bids'), sorted(naive['bids'].items(), reverse=True))
+        self.assertEqual(levels(book, 'asks'), sorted(naive['asks'].items()))
+
+    @requests_mock.Mocker()
+    def testRefresh(self, m):
+        api = BitX('key', 'secret', {'hostname': 'api.dummy.com'})
+        m.get('https://api.dummy.com/api/1/orderbook', json={'bids': [], 'asks': SNAPSHOT['asks']})
+        updates = self.book.refresh(api)
+        self.assertEqual(len(updates), 3)
+        self.assertIsNone(self.book.best_bid)
+
+
+if __name__ == '__main__':
+    unittest.main()
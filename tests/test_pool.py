@@ -0,0 +1,105 @@
+import base64
+import threading
+import unittest
+from http.server import ThreadingHTTPServer
+
+import requests_mock
+
+from pybitx.api import BitXAPIError
+from pybitx.pool import ClientPool
+from tests.test_metrics import TickerHandler
+
+
+def auth_header(key, secret):
+    return 'Basic ' + base64.b64encode(('%s:%s' % (key, secret)).encode('utf-8')).decode('utf-8')
+
+
+def balance(account_id, asset, amount):
+    return {'balance': [{'account_id': account_id, 'asset': asset, 'balance': amount, 'reserved': '0.00',
+                         'unconfirmed': '0.00', 'name': asset}]}
+
+
+class TestClientPool(unittest.TestCase):
+    def setUp(self):
+        self.pool = ClientPool({'a': ('key1', 'secret1'), 'b': ('key2', 'secret2')},
+                               {'hostname': 'api.dummy.com', 'rate_limits': True, 'max_workers': 4})
+
+    def tearDown(self):
+        self.pool.close()
+
+    def mockBalances(self, m):
+        m.get('https://api.dummy.com/api/1/balance', request_headers={'Authorization': auth_header('key1', 'secret1')},
+              json=balance('1', 'XBT', '1.50'))
+        m.get('https://api.dummy.com/api/1/balance', request_headers={'Authorization': auth_header('key2', 'secret2')},
+              json=balance('2', 'ZAR', '100.00'))
+
+    def testSharedResources(self):
+        a, b = self.pool['a'], self.pool['b']
+        self.assertEqual(list(self.pool), ['a', 'b'])
+        self.assertIs(a._requests_session, b._requests_session)
+        self.assertIs(a._executor, b._executor)
+        self.assertEqual(a.max_workers, 4)
+        self.assertIs(a._limiters[('public', 'get')], b._limiters[('public', 'get')])
+        self.assertIsNot(a._limiters[('auth', 'get')], b._limiters[('auth', 'get')])
+        # Closing one client leaves the pool's workers running
+        a.close()
+        self.assertEqual(b.submit(lambda: 1).result(), 1)
+
+    def testCredentialList(self):
+        with ClientPool([('key1', 'secret1')], {'pair': 'ETHXBT'}) as pool:
+            pool.add('other', 'key2', 'secret2', {'pair': 'XBTZAR'})
+            self.assertEqual((pool['key1'].auth, pool['key1'].pair), (('key1', 'secret1'), 'ETHXBT'))
+            self.assertEqual(pool['other'].pair, 'XBTZAR')
+            pool.remove('key1')
+            self.assertEqual(len(pool), 1)
+
+    @requests_mock.Mocker()
+    def testMap(self, m):
+        self.mockBalances(m)
+        results = self.pool.map('get_balance')
+        self.assertEqual(results['a']['balance'][0]['asset'], 'XBT')
+        self.assertEqual(results['b']['balance'][0]['asset'], 'ZAR')
+        m.get('https://api.dummy.com/api/1/listorders', request_headers={'Authorization': auth_header('key2', 'secret2')},
+              status_code=401, json={'error': 'Unauthorized'})
+        m.get('https://api.dummy.com/api/1/listorders', request_headers={'Authorization': auth_header('key1', 'secret1')},
+              json={'orders': []})
+        self.assertRaises(BitXAPIError, self.pool.map, 'get_orders', kwargs={'state': 'PENDING'})
+        results = self.pool.map('get_orders', kwargs={'state': 'PENDING'}, return_exceptions=True)
+        self.assertEqual(results['a'], {'orders': []})
+        self.assertIsInstance(results['b'], BitXAPIError)
+        self.assertEqual(list(self.pool.map('get_orders', names=['a'])), ['a'])
+
+    @requests_mock.Mocker()
+    def testBalancesFrame(self, m):
+        self.mockBalances(m)
+        df = self.pool.get_balances_frame()
+        self.assertEqual(df.index.names, ['account', None])
+        self.assertEqual(df.loc['a'].asset.tolist(), ['XBT'])
+        self.assertEqual(df.balance.tolist(), [1.5, 100.0])
+        with ClientPool({'a': ('key1', 'secret1')}, {'hostname': 'api.dummy.com', 'numeric': 'exact'}) as pool:
+            df = pool.get_balances_frame()
+            self.assertEqual(df.balance.tolist(), [150000000])
+            self.assertEqual(df.attrs['decimals']['balance'], 8)
+
+    def testSharedConnections(self):
+        server = ThreadingHTTPServer(('127.0.0.1', 0), TickerHandler)
+        server.daemon_threads = True
+        thread = threading.Thread(target=server.serve_forever)
+        thread.daemon = True
+        thread.start()
+        try:
+            credentials = dict(('k%d' % i, ('k%d' % i, 's')) for i in range(20))
+            with ClientPool(credentials, {'hostname': '127.0.0.1', 'port': server.server_address[1],
+                                          'scheme': 'http', 'metrics': True, 'max_workers': 2}) as pool:
+                self.assertIs(pool['k0'].metrics, pool['k19'].metrics)
+                pool.map('get_ticker')
+                connections = pool.metrics.summary()['connections']
+                self.assertEqual(connections['requests'], 20)
+                self.assertLessEqual(connections['opened'], 2)
+        finally:
+            server.shutdown()
+            server.server_close()
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,65 @@
+import unittest
+
+from pybitx.ratelimit import RateLimiter
+from tests.helpers import FakeClock
+
+
+class TestRateLimiter(unittest.TestCase):
+    def testUnlimited(self):
+        limiter = RateLimiter()
+        for _ in range(1000):
+            self.assertEqual(limiter.acquire(), 0)
+
+    def testBurstThenRate(self):
+        clock = FakeClock()
+        limiter = RateLimiter(rate=10, burst=2, clock=clock, sleep=clock.sleep)
+        self.assertEqual(limiter.acquire(), 0)
+        self.assertEqual(limiter.acquire(), 0)
+        self.assertAlmostEqual(limiter.acquire(), 0.1)
+        self.assertAlmostEqual(limiter.acquire(), 0.1)
+        self.assertAlmostEqual(clock.now, 0.2)
+
+    def testRefillCapsAtBurst(self):
+        clock = FakeClock()
+        limiter = RateLimiter(rate=10, burst=3, clock=clock, sleep=clock.sleep)
+        clock.now = 100.0
+        for _ in range(3):
+            self.assertEqual(limiter.acquire(), 0)
+        self.assertAlmostEqual(limiter.acquire(), 0.1)
+
+    def testQueuedDelays(self):
+        clock = FakeClock()
+        limiter = RateLimiter(rate=4, burst=1, clock=clock)
+        delays = [limiter.delay() for _ in range(4)]
+        self.assertEqual(delays[0], 0)
+        self.assertAlmostEqual(delays[1], 0.25)
+        self.assertAlmostEqual(delays[2], 0.5)
+        self.assertAlmostEqual(delays[3], 0.75)
+
+    def testAdaptiveRate(self):
+        clock = FakeClock()
+        limiter = RateLimiter(rate=16, burst=1, clock=clock)
+        limiter.slow_down()
+        self.assertEqual(limiter.rate, 8)
+        for _ in range(10):
+            limiter.slow_down()
+        self.assertEqual(limiter.rate, 1)
+        for _ in range(100):
+            limiter.speed_up()
+        self.assertEqual(limiter.rate, 16)
+
+    def testPause(self):
+        clock = FakeClock()
+        limiter = RateLimiter(rate=10, burst=5, clock=clock)
+        limiter.slow_down(factor=1, pause=3)
+        self.assertAlmostEqual(limiter.delay(), 3.1)
+
+    def testUnlimitedIgnoresAdaptation(self):
+        limiter = RateLimiter()
+        limiter.slow_down(pause=5)
+        limiter.speed_up()
+        self.assertEqual(limiter.delay(), 0)
+
+
+if __name__ == '__main__':
+    unittest.main()
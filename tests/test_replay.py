@@ -0,0 +1,99 @@
+import os
+import shutil
+import tempfile
+import unittest
+
+import requests_mock
+
+from pybitx.api import BitX, BitXAPIError
+from pybitx.replay import Recorder, Replayer, ReplayMiss
+from tests.helpers import FakeClock
+
+
+class TestReplay(unittest.TestCase):
+    def setUp(self):
+        self.root = tempfile.mkdtemp()
+        self.path = os.path.join(self.root, 'session.log')
+
+    def tearDown(self):
+        shutil.rmtree(self.root)
+
+    def record(self):
+        clock = FakeClock(1000.0)
+        with requests_mock.Mocker() as m, Recorder(self.path, clock=clock) as recorder:
+            m.get('https://api.dummy.com/api/1/ticker', [{'json': {'bid': str(bid)}} for bid in (100, 101, 102)])
+            m.get('https://api.dummy.com/api/1/balance', status_code=401, json={'error': 'Unauthorized'})
+            m.post('https://api.dummy.com/api/1/postorder', json={'order_id': 'BX1'})
+            api = BitX('mykey', 'mysecret', {'hostname': 'api.dummy.com', 'transport': recorder})
+            for seconds in (0, 10, 20):
+                clock.now = 1000.0 + seconds
+                api.get_ticker()
+            self.assertRaises(BitXAPIError, api.get_balance)
+            api.create_limit_order('buy', 0.1, 500)
+        return api
+
+    def testReplayInOrder(self):
+        self.record()
+        with Replayer(self.path) as replayer:
+            self.assertEqual(len(replayer), 5)
+            api = BitX('mykey', 'mysecret', {'hostname': 'api.dummy.com', 'transport': replayer})
+            self.assertEqual([api.get_ticker()['bid'] for _ in range(4)], ['100', '101', '102', '102'])
+            with self.assertRaises(BitXAPIError) as cm:
+                api.get_balance()
+            self.assertEqual(cm.exception.code, 401)
+            self.assertIn('Unauthorized', str(cm.exception))
+            self.assertEqual(api.create_limit_order('buy', 0.1, 500), {'order_id': 'BX1'})
+            self.assertRaises(ReplayMiss, api.create_limit_order, 'buy', 0.2, 500)
+            self.assertRaises(ReplayMiss, api.get_ticker, pair='ETHXBT')
+
+    def testReplayInTime(self):
+        self.record()
+        clock = FakeClock(0)
+        replayer = Replayer(self.path, speed=10, clock=clock)
+        api = BitX('mykey', 'mysecret', {'hostname': 'api.dummy.com', 'transport': replayer})
+        self.assertEqual(api.get_ticker()['bid'], '100')
+        self.assertEqual(replayer.now(), 1000.0)
+        clock.now = 1.5
+        self.assertEqual(api.get_ticker()['bid'], '101')
+        clock.now = 100
+        self.assertEqual(api.get_ticker()['bid'], '102')
+        replayer.close()
+
+    def testTruncatedLog(self):
+        self.record()
+        with open(self.path, 'ab') as f:
+            f.write(b'\x00' * 10)
+        with open(self.path, 'r+b') as f:
+            f.truncate(os.path.getsize(self.path) - 15)
+        with Replayer(self.path) as replayer:
+            self.assertEqual(len(replayer), 4)
+        with open(self.path, 'r+b') as f:
+            f.write(b'NOTALOG!')
+        self.assertRaises(ValueError, Replayer, self.path)
+
+    def testAppends(self):
+        self.record()
+        self.record()
+        with Replayer(self.path) as replayer:
+            self.assertEqual(len(replayer), 10)
+
+    def testAppendsAfterTruncatedRecord(self):
+        self.record()
+        # A crash in the middle of writing the last (postorder) record
+        with open(self.path, 'r+b') as f:
+            f.truncate(os.path.getsize(self.path) - 5)
+        self.record()
+        with Replayer(self.path) as replayer:
+            self.assertEqual(len(replayer), 9)
+            api = BitX('mykey', 'mysecret', {'hostname': 'api.dummy.com', 'transport': replayer})
+            self.assertEqual([api.get_ticker()['bid'] for _ in range(6)], ['100', '101', '102'] * 2)
+            self.assertEqual(api.create_limit_order('buy', 0.1, 500), {'order_id': 'BX1'})
+
+    def testRecorderRejectsOtherFiles(self):
+        with open(self.path, 'wb') as f:
+            f.write(b'NOTALOG!')
+        self.assertRaises(ValueError, Recorder, self.path)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,136 @@
+import mmap
+import os
+import shutil
+import tempfile
+import unittest
+
+import numpy as np
+import requests_mock
+
+from pybitx.api import BitX
+from pybitx.store import ColumnStore, LocalStore
+
+
+def is_mapped(array):
+    while array is not None and not isinstance(array, mmap.mmap):
+        array = getattr(array, 'base', None)
+    return array is not None
+
+
+class TestColumnStore(unittest.TestCase):
+    def setUp(self):
+        self.root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.root)
+        self.columns = [('timestamp', 'i8'), ('price', 'f8')]
+
+    def testAppendAndReopen(self):
+        store = ColumnStore(self.root, self.columns)
+        self.assertEqual(len(store), 0)
+        self.assertIsNone(store.last('timestamp'))
+        self.assertEqual(len(store.frame(index='timestamp')), 0)
+        store.append({'timestamp': [1000, 2000], 'price': [1.5, 2.5]})
+        store.append({'timestamp': [3000], 'price': [3.5]})
+        store = ColumnStore(self.root, self.columns)
+        self.assertEqual(len(store), 3)
+        self.assertEqual(store.last('timestamp'), 3000)
+        df = store.frame(index='timestamp')
+        self.assertEqual(df.price.tolist(), [1.5, 2.5, 3.5])
+        self.assertEqual(df.index[2], np.datetime64(3000, 'ms'))
+        self.assertTrue(is_mapped(df.price.to_numpy()))
+
+    def testSchemaMismatch(self):
+        ColumnStore(self.root, self.columns)
+        self.assertRaises(ValueError, ColumnStore, self.root, [('timestamp', 'i8'), ('price', 'i8')])
+        self.assertRaises(ValueError, ColumnStore, self.root, self.columns, {'decimals': {'price': 2}})
+
+    def testInterruptedAppend(self):
+        store = ColumnStore(self.root, self.columns)
+        store.append({'timestamp': [1000], 'price': [1.5]})
+        with open(os.path.join(self.root, 'price.col'), 'ab') as f:
+            f.write(b'\x00' * 12)
+        store = ColumnStore(self.root, self.columns)
+        self.assertEqual(store.column('price').tolist(), [1.5])
+        store.append({'timestamp': [2000], 'price': [2.5]})
+        self.assertEqual(store.column('price').tolist(), [1.5, 2.5])
+
+    def testRaggedAppend(self):
+        store = ColumnStore(self.root, self.columns)
+        self.assertRaises(ValueError, store.append, {'timestamp': [1, 2], 'price': [1.0]})
+
+
+class TestLocalStore(unittest.TestCase):
+    def setUp(self):
+        self.root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.root)
+        self.api = BitX('key', 'secret', {'hostname': 'api.dummy.com'})
+        self.store = LocalStore(self.root, self.api)
+
+    def mockTrades(self, m, trades):
+        def respond(request, context):
+            since = int(request.qs['since'][0]) if 'since' in request.qs else 0
+            newer = [t for t in trades if t['timestamp'] >= since]
+            # Newest first, at most 3 per call
+            return {'trades': sorted(newer, key=lambda t: t['timestamp'])[:3][::-1]}
+        m.get('https://api.dummy.com/api/1/trades', json=respond)
+
+    @requests_mock.Mocker()
+    def testSyncTrades(self, m):
+        trades = [{'timestamp': 1000 + i, 'price': '%d.00' % (5000 + i), 'volume': '0.01'} for i in range(7)]
+        self.mockTrades(m, trades[:4])
+        self.assertEqual(self.store.sync_trades(), 4)
+        self.mockTrades(m, trades)
+        self.assertEqual(self.store.sync_trades(), 3)
+        self.assertEqual(self.store.sync_trades(), 0)
+        self.assertEqual(m.last_request.qs['since'], ['1006'])
+        df = self.store.trades_frame()
+        self.assertEqual(df.price.tolist(), [5000.0 + i for i in range(7)])
+        self.assertTrue(df.index.is_monotonic_increasing)
+
+    @requests_mock.Mocker()
+    def testSyncTradesInOneMillisecond(self, m):
+        trades = [{'timestamp': 1000, 'price': '5000.00', 'volume': '0.01'},
+                  {'timestamp': 1001, 'price': '5001.00', 'volume': '0.01'},
+                  {'timestamp': 1001, 'price': '5002.00', 'volume': '0.01'},
+                  {'timestamp': 1002, 'price': '5003.00', 'volume': '0.01'},
+                  {'timestamp': 1002, 'price': '5003.00', 'volume': '0.01'}]
+        self.mockTrades(m, trades[:2])
+        self.assertEqual(self.store.sync_trades(), 2)
+        # The second trade at 1001 arrives after the first was stored, as does a repeat of an identical trade
+        self.mockTrades(m, trades[:4])
+        self.assertEqual(self.store.sync_trades(), 2)
+        self.mockTrades(m, trades)
+        self.assertEqual(self.store.sync_trades(), 1)
+        self.assertEqual(self.store.sync_trades(), 0)
+        df = self.store.trades_frame()
+        self.assertEqual(df.price.tolist(), [5000.0, 5001.0, 5002.0, 5003.0, 5003.0])
+
+    @requests_mock.Mocker()
+    def testSyncTransactions(self, m):
+        history = [{"row_index": i, "timestamp": 1429908701000 + i, "balance": float(i), "available": float(i),
+                    "balance_delta": 1.0, "available_delta": 1.0, "currency": "XBT", "description": "Deposit"}
+                   for i in range(1, 251)]
+        n_rows = [120]
+
+        def respond(request, context):
+            lo, hi = int(request.qs['min_row'][0]), int(request.qs['max_row'][0])
+            return {'transactions': [row for row in history[:n_rows[0]] if lo <= row['row_index'] < hi]}
+
+        m.get('https://api.dummy.com/api/1/accounts/42/transactions', json=respond)
+        self.assertEqual(self.store.sync_transactions('42', page_size=50), 120)
+        n_rows[0] = 250
+        first = m.call_count
+        self.assertEqual(self.store.sync_transactions('42', page_size=50), 130)
+        self.assertEqual(min(int(r.qs['min_row'][0]) for r in m.request_history[first:]), 121)
+        df = self.store.transactions_frame('42')
+        self.assertEqual(df.row_index.tolist(), list(range(1, 251)))
+        self.assertEqual(df.balance.iloc[-1], 250.0)
+
+    def testExactModeSchema(self):
+        api = BitX('key', 'secret', {'numeric': 'exact'})
+        store = LocalStore(self.root, api)
+        self.assertEqual(dict(store.trades().columns)['price'], np.dtype('i8').str)
+        self.assertRaises(ValueError, self.store.trades)
+
+
+if __name__ == '__main__':
+    unittest.main()
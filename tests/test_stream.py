@@ -0,0 +1,151 @@
+import asyncio
+import json
+import unittest
+
+from aiohttp import web
+from aiohttp.test_utils import TestServer
+
+from pybitx.stream import MarketDataStream, StreamError
+
+
+def snapshot(sequence):
+    return {
+        "sequence": str(sequence),
+        "asks": [{"id": "A1", "price": "1180.00", "volume": "0.50"}, {"id": "A2", "price": "1180.00", "volume": "0.25"}],
+        "bids": [{"id": "B1", "price": "1100.00", "volume": "1.00"}],
+        "status": "ACTIVE",
+        "timestamp": 1528884331021
+    }
+
+
+def update(sequence, **kwargs):
+    msg = {"sequence": str(sequence), "trade_updates": None, "create_update": None, "delete_update": None,
+           "status_update": None, "timestamp": 1528884331100 + sequence}
+    msg.update(kwargs)
+    return msg
+
+
+class MockStreamServer(object):
+    """
+    A local websocket stand-in for the streaming API. Each connection replays the next script of messages and then
+    either stays open or, if the script ends with None, disconnects.
+    """
+    def __init__(self, scripts):
+        self.scripts = list(scripts)
+        self.credentials = []
+        self.connections = 0
+        self.app = web.Application()
+        self.app.router.add_get('/api/1/stream/{pair}', self.handle)
+        self.server = TestServer(self.app)
+
+    async def handle(self, request):
+        ws = web.WebSocketResponse()
+        await ws.prepare(request)
+        self.credentials.append(await ws.receive_json())
+        self.connections += 1
+        script = self.scripts.pop(0) if self.scripts else []
+        for msg in script:
+            if msg is None:
+                await ws.close()
+                return ws
+            await ws.send_str(msg if isinstance(msg, str) else json.dumps(msg))
+        await ws.receive()
+        return ws
+
+    def options(self, **kwargs):
+        options = {'stream_url': 'http://%s:%d/api/1/stream/XBTZAR' % (self.server.host, self.server.port),
+                   'min_backoff': 0.01, 'max_backoff': 0.02}
+        options.update(kwargs)
+        return options
+
+
+class TestMarketDataStream(unittest.IsolatedAsyncioTestCase):
+
+    async def stream(self, scripts, **options):
+        self.mock = MockStreamServer(scripts)
+        await self.mock.server.start_server()
+        self.addAsyncCleanup(self.mock.server.close)
+        stream = MarketDataStream('mykey', 'mysecret', self.mock.options(**options))
+        self.addAsyncCleanup(stream.close)
+        stream.start()
+        return stream
+
+    async def events(self, stream, n):
+        return [await asyncio.wait_for(stream.get(), 2) for _ in range(n)]
+
+    async def testSnapshotAndUpdates(self):
+        stream = await self.stream([[
+            snapshot(10),
+            '',
+            update(11, create_update={"order_id": "B2", "type": "BID", "price": "1150.00", "volume": "2.00"}),
+            update(12, trade_updates=[{"base": "0.50", "counter": "590.00", "maker_order_id": "A1",
+                                       "taker_order_id": "B9"}]),
+            update(13, delete_update={"order_id": "B1"}),
+            update(13, delete_update={"order_id": "B2"}),
+        ]])
+        events = await self.events(stream, 4)
+        self.assertEqual([e.kind for e in events], ['snapshot', 'create', 'trade', 'delete'])
+        self.assertEqual([e.sequence for e in events], [10, 11, 12, 13])
+        self.assertEqual(self.mock.credentials, [{'api_key_id': 'mykey', 'api_key_secret': 'mysecret'}])
+        self.assertEqual(stream.book.best_bid, 1150.0)
+        self.assertEqual(stream.book.best_ask, 1180.0)
+        self.assertAlmostEqual(stream.book.asks.volume(1180.0), 0.25)
+        self.assertEqual(sorted(stream.orders), ['A2', 'B2'])
+
+    async def testSequenceGapResyncs(self):
+        stream = await self.stream([
+            [snapshot(10), update(11, delete_update={"order_id": "B1"}), update(13, delete_update={"order_id": "A1"})],
+            [snapshot(20)]
+        ])
+        events = await self.events(stream, 4)
+        self.assertEqual([e.kind for e in events], ['snapshot', 'delete', 'resync', 'snapshot'])
+        self.assertEqual(events[2].data, {'expected': 12})
+        self.assertEqual(stream.sequence, 20)
+        self.assertEqual(stream.book.best_bid, 1100.0)
+        self.assertEqual(self.mock.connections, 2)
+
+    async def testReconnectsAfterDisconnect(self):
+        stream = await self.stream([[snapshot(10), None], [snapshot(30)]])
+        events = await self.events(stream, 2)
+        self.assertEqual([e.sequence for e in events], [10, 30])
+        self.assertEqual(stream.reconnects, 1)
+
+    async def testBackpressure(self):
+        script = [snapshot(1)] + [update(i, status_update={"status": "ACTIVE"}) for i in range(2, 50)]
+        stream = await self.stream([script], queue_size=5)
+        await asyncio.sleep(0.2)
+        self.assertEqual(stream._queue.qsize(), 5)
+        self.assertEqual(stream.sequence, 6)
+        events = await self.events(stream, 49)
+        self.assertEqual([e.sequence for e in events], list(range(1, 50)))
+
+    async def testMalformedMessageReconnects(self):
+        stream = await self.stream([
+            [snapshot(10), update(11, create_update={"order_id": "B2", "price": "1150.00", "volume": "2.00"})],
+            [{"asks": [], "bids": []}],
+            [snapshot(20)]
+        ])
+        events = await self.events(stream, 2)
+        self.assertEqual([(e.kind, e.sequence) for e in events], [('snapshot', 10), ('snapshot', 20)])
+        self.assertEqual(stream.reconnects, 2)
+        self.assertNotIn('B2', stream.orders)
+
+    async def testErrorFrameEndsStream(self):
+        stream = await self.stream([[snapshot(10), {"error": "Invalid API key", "error_code": "ErrUnauthorised"}]])
+        self.assertEqual((await self.events(stream, 1))[0].kind, 'snapshot')
+        with self.assertRaises(StreamError) as cm:
+            await asyncio.wait_for(stream.get(), 2)
+        self.assertEqual(cm.exception.error, 'Invalid API key')
+        with self.assertRaises(StreamError):
+            async for _ in stream:
+                pass
+        self.assertEqual(self.mock.connections, 1)
+
+    def testBackoffIsBounded(self):
+        stream = MarketDataStream('', '', {'min_backoff': 1, 'max_backoff': 8})
+        for attempt in range(10):
+            self.assertLessEqual(stream.backoff(attempt), min(8, 2 ** attempt))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,117 @@
+import unittest
+from concurrent.futures import ThreadPoolExecutor
+from decimal import Decimal
+
+import requests_mock
+
+from pybitx.api import BitX, BitXAPIError
+from pybitx.tracker import OrderTracker
+
+
+def order(order_id, base, state='PENDING', limit_volume='1.00'):
+    return {'order_id': order_id, 'base': base, 'counter': '0.00', 'limit_price': '1000.00',
+            'limit_volume': limit_volume, 'state': state, 'type': 'BID', 'pair': 'XBTZAR'}
+
+
+class FakeAsyncAPI(object):
+    def __init__(self, pending, orders):
+        self.pending = pending
+        self.orders = orders
+        self.calls = []
+
+    async def get_orders(self, state=None, kind='auth', pair=None):
+        self.calls.append(('listorders', state))
+        return {'orders': self.pending}
+
+    async def get_order(self, order_id):
+        self.calls.append(('orders', order_id))
+        if order_id not in self.orders:
+            raise BitXAPIError(type('Response', (), {'url': order_id, 'status_code': 404, 'text': 'Not found'}))
+        return self.orders[order_id]
+
+
+class TestOrderTracker(unittest.TestCase):
+    def setUp(self):
+        self.api = BitX('mykey', 'mysecret', {'hostname': 'api.dummy.com'})
+        self.listorders = 'https://api.dummy.com/api/1/listorders?state=PENDING'
+
+    @requests_mock.Mocker()
+    def testPollsOneListWhileOrdersAreOpen(self, m):
+        m.get(self.listorders, [
+            {'json': {'orders': [order('A', '0.00'), order('B', '0.00'), order('X', '0.50')]}},
+            {'json': {'orders': [order('A', '0.25'), order('B', '0.00')]}},
+        ])
+        tracker = OrderTracker(self.api, ['A', 'B'])
+        events = []
+        tracker.add_callback(events.append)
+        self.assertEqual(tracker.poll(), [])
+        self.assertEqual(m.call_count, 1)
+        result = tracker.poll()
+        self.assertEqual(m.call_count, 2)
+        self.assertEqual([(e.kind, e.order_id, e.filled) for e in result], [('partial_fill', 'A', Decimal('0.25'))])
+        self.assertEqual(events, result)
+
+    @requests_mock.Mocker()
+    def testCompletedOrdersAreFetched(self, m):
+        m.get(self.listorders, [
+            {'json': {'orders': [order('A', '0.40'), order('B', '0.00'), order('C', '0.00')]}},
+            {'json': {'orders': [order('C', '0.00')]}},
+        ])
+        m.get('https://api.dummy.com/api/1/orders/A', json=order('A', '1.00', 'COMPLETE'))
+        m.get('https://api.dummy.com/api/1/orders/B', json=order('B', '0.10', 'COMPLETE'))
+        tracker = OrderTracker(self.api, ['A', 'B', 'C'])
+        self.assertEqual([(e.kind, e.order_id) for e in tracker.poll()], [('partial_fill', 'A')])
+        events = sorted((e.kind, e.order_id, e.filled) for e in tracker.poll())
+        self.assertEqual(events, [('cancel', 'B', Decimal('0.10')), ('fill', 'A', Decimal('0.60'))])
+        self.assertEqual(list(tracker.orders), ['C'])
+        self.assertEqual(m.call_count, 4)
+
+    @requests_mock.Mocker()
+    def testFailedFetchesAreRetriedNextPoll(self, m):
+        m.get(self.listorders, json={'orders': []})
+        m.get('https://api.dummy.com/api/1/orders/A', [
+            {'status_code': 500, 'json': {'error': 'Internal error'}},
+            {'json': order('A', '1.00', 'COMPLETE')},
+        ])
+        tracker = OrderTracker(self.api, ['A'])
+        with self.assertLogs('pybitx.tracker', 'WARNING'):
+            self.assertEqual(tracker.poll(), [])
+        self.assertEqual([e.kind for e in tracker.events(interval=0)], ['fill'])
+        self.assertEqual(len(tracker), 0)
+        self.assertEqual(tracker.poll(), [])
+
+    def testPooledClient(self):
+        # Any client with the public get_orders, get_order and submit methods will do, e.g. one from a ClientPool
+        class PooledAPI(object):
+            executor = ThreadPoolExecutor(max_workers=2)
+
+            def get_orders(self, state=None, kind='auth', pair=None):
+                return {'orders': []}
+
+            def get_order(self, order_id):
+                return order(order_id, '1.00', 'COMPLETE')
+
+            def submit(self, method, *args, **kwargs):
+                return self.executor.submit(method, *args, **kwargs)
+
+        tracker = OrderTracker(PooledAPI(), ['A', 'B'])
+        self.assertEqual(sorted(e.order_id for e in tracker.poll()), ['A', 'B'])
+        PooledAPI.executor.shutdown()
+
+
+class TestAsyncOrderTracker(unittest.IsolatedAsyncioTestCase):
+    async def testEvents(self):
+        api = FakeAsyncAPI([order('A', '0.50')], {'B': order('B', '0.00', 'COMPLETE')})
+        tracker = OrderTracker(api, ['A', 'B'])
+        events = []
+        async for event in tracker.events_async(interval=0):
+            events.append((event.kind, event.order_id))
+            if event.order_id == 'A':
+                api.pending = []
+                api.orders['A'] = order('A', '1.00', 'COMPLETE')
+        self.assertEqual(events, [('partial_fill', 'A'), ('cancel', 'B'), ('fill', 'A')])
+        self.assertEqual(api.calls[0], ('listorders', 'PENDING'))
+
+
+if __name__ == '__main__':
+    unittest.main()
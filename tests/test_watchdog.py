@@ -0,0 +1,133 @@
+import itertools
+import threading
+import time
+import unittest
+
+from pybitx.api import BitX
+from pybitx.watchdog import Watchdog
+from benchmarks.stub_server import StubServer
+
+
+def wait_for(condition, timeout=5):
+    deadline = time.monotonic() + timeout
+    while not condition() and time.monotonic() < deadline:
+        time.sleep(0.005)
+    return condition()
+
+
+class TestWatchdog(unittest.TestCase):
+    def setUp(self):
+        ids = itertools.count()
+        self.stopped = []
+        self.server = StubServer({
+            'ticker': {'bid': '100'},
+            'postorder': lambda query: {'order_id': 'BX%d' % (next(ids),)},
+            'stoporder': lambda query: self.stopped.append(1) or {'success': True},
+        })
+        self.server.__enter__()
+        self.api = BitX('key', 'secret', self.server.options())
+
+    def tearDown(self):
+        self.api.close()
+        self.server.__exit__()
+
+    def place(self, n):
+        return [self.api.create_limit_order('buy', 0.1, 900)['order_id'] for _ in range(n)]
+
+    def testTracksOrders(self):
+        with Watchdog(self.api) as watchdog:
+            self.assertIs(self.api.transport, watchdog)
+            placed = self.place(3)
+            self.api.stop_order(placed[0])
+            watchdog.watch('OLD')
+            self.assertEqual(watchdog.orders, set(placed[1:] + ['OLD']))
+            watchdog.unwatch('OLD')
+        self.assertIsNone(self.api.transport)
+        self.assertIsNone(watchdog.tripped)
+
+    def testRefusedStopStaysTracked(self):
+        with Watchdog(self.api) as watchdog:
+            placed = self.place(2)
+            self.server.responses['stoporder'] = {'success': False}
+            self.api.stop_order(placed[0])
+            self.assertEqual(watchdog.orders, set(placed))
+
+    def testHeartbeat(self):
+        sweeps = []
+        with Watchdog(self.api, heartbeat_timeout=0.2, check_interval=0.01, on_sweep=sweeps.append) as watchdog:
+            placed = self.place(5)
+            for _ in range(5):
+                watchdog.heartbeat()
+                time.sleep(0.02)
+            self.assertEqual(sweeps, [])
+            self.assertTrue(wait_for(lambda: sweeps))
+        sweep = sweeps[0]
+        self.assertEqual(sweep.reason, 'heartbeat')
+        self.assertEqual(sorted(sweep.results), sorted(placed))
+        self.assertTrue(all(outcome['success'] for outcome in sweep.results.values()))
+        self.assertEqual((len(self.stopped), watchdog.orders), (5, set()))
+        self.assertEqual(watchdog.tripped, 'heartbeat')
+        self.assertEqual(len(watchdog.sweeps), 1)
+
+    def testSlowResponse(self):
+        with Watchdog(self.api, max_latency=0.1, check_interval=0.01) as watchdog:
+            self.place(2)
+            self.server.delays['ticker'] = 0.15
+            self.api.get_ticker()
+            self.assertTrue(wait_for(lambda: watchdog.sweeps))
+        self.assertEqual(watchdog.sweeps[0].reason, 'latency')
+        self.assertEqual(len(self.stopped), 2)
+
+    def testStalledRequest(self):
+        with Watchdog(self.api, max_latency=0.1, check_interval=0.01) as watchdog:
+            self.place(10)
+            self.server.delays['ticker'] = 1.0
+            start = time.monotonic()
+            stalled = threading.Thread(target=self.api.get_ticker)
+            stalled.start()
+            self.assertTrue(wait_for(lambda: watchdog.sweeps))
+            # Every order was stopped while the ticker request was still waiting
+            self.assertLess(time.monotonic() - start, 1.0)
+            self.assertTrue(stalled.is_alive())
+            stalled.join()
+        self.assertEqual(len(self.stopped), 10)
+        self.assertLess(watchdog.sweeps[0].elapsed, 0.5)
+
+    def testTrippedUntilReset(self):
+        with Watchdog(self.api, heartbeat_timeout=0.05, check_interval=0.01) as watchdog:
+            self.assertTrue(wait_for(lambda: watchdog.sweeps))
+            self.place(2)
+            time.sleep(0.1)
+            self.assertEqual(len(watchdog.sweeps), 1)
+            watchdog.reset()
+            self.assertTrue(wait_for(lambda: len(watchdog.sweeps) == 2))
+        self.assertEqual(len(watchdog.sweeps[1].results), 2)
+
+    def testStopWaitsForSweep(self):
+        watchdog = Watchdog(self.api, check_interval=0.01, concurrency=2)
+        watchdog.start()
+        placed = self.place(6)
+        self.server.delays['stoporder'] = 0.05
+        watchdog.heartbeat_timeout = 0.01
+        self.assertTrue(wait_for(lambda: watchdog.tripped))
+        time.sleep(0.02)
+        # Stopping in the middle of the sweep lets it finish on its workers
+        watchdog.stop()
+        self.assertEqual(len(watchdog.sweeps), 1)
+        self.assertEqual(sorted(watchdog.sweeps[0].results), sorted(placed))
+        self.assertTrue(all(outcome['success'] for outcome in watchdog.sweeps[0].results.values()))
+        self.assertEqual((len(self.stopped), watchdog.orders), (6, set()))
+
+    def testManualSweepReportsFailures(self):
+        watchdog = Watchdog(self.api, retries=1, backoff=0.01)
+        self.server.responses['stoporder'] = {'error': 'Order not found'}
+        watchdog.watch('BX1')
+        sweep = watchdog.sweep()
+        self.assertEqual(sweep.reason, 'manual')
+        self.assertFalse(sweep.results['BX1']['success'])
+        self.assertEqual(sweep.results['BX1']['attempts'], 1)
+        self.assertEqual(watchdog.orders, set(['BX1']))
+
+
+if __name__ == '__main__':
+    unittest.main()